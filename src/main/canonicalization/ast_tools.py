@@ -16,12 +16,17 @@ log = logging.getLogger(consts.LOGGER_NAME)
 
 class AstStructure:
     _nodes_to_count = {ast.If, ast.For, ast.While}
+    # Order of the counts in the tuple of counts
+    _counted_nodes_order = (ast.If, ast.For, ast.While)
 
     def __init__(self, counted_nodes: Dict[Type[ast.AST], int], nodes_number: Optional[int] = None):
         if counted_nodes.keys() != AstStructure._nodes_to_count:
             log_and_raise_error('Incorrect structure dict passed to the AstStructure, keys should be'
                                 ' equal to _nodes_to_count', log)
         self._counted_nodes = counted_nodes
+        # Structures are compared for each candidate, so the counts are also kept in a tuple to compare them
+        # without dict lookups
+        self._counts = tuple(counted_nodes[n] for n in AstStructure._counted_nodes_order)
         self._nodes_number = nodes_number
 
     @property
@@ -49,11 +54,11 @@ class AstStructure:
         return nodes_number
 
     def eq_counted_nodes(self, other: AstStructure) -> bool:
-        return all([self._counted_nodes[n] == other._counted_nodes[n] for n in self._nodes_to_count])
+        return self._counts == other._counts
 
     # Note, it doesn't consider nodes number in AST
     def __sub__(self, other: AstStructure) -> int:
-        return sum([abs(self._counted_nodes[n] - other._counted_nodes[n]) for n in self._nodes_to_count])
+        return sum(abs(count - other_count) for count, other_count in zip(self._counts, other._counts))
 
     def __str__(self) -> str:
         return '/n'.join([f'{n.__name__}: {self._counted_nodes[n]}' for n in self._nodes_to_count])
@@ -942,6 +947,126 @@ def depthOfAST(a):
     return m + 1
 
 
+# The tables below are built once instead of on each call of compareASTs, which is called for each pair of nodes
+# Here is a brief ordering of types that we care about
+COMPARED_BLEH_TYPES = {ast.Load, ast.Store, ast.Del, ast.AugLoad, ast.AugStore, ast.Param}
+COMPARED_TYPES = [ast.Module, ast.Interactive, ast.Expression, ast.Suite,
+
+                  ast.Break, ast.Continue, ast.Pass, ast.Global,
+                  ast.Expr, ast.Assign, ast.AugAssign, ast.Return,
+                  ast.Assert, ast.Delete, ast.If, ast.For, ast.While,
+                  ast.With, ast.Import, ast.ImportFrom, ast.Raise,
+                  ast.Try, ast.FunctionDef,
+                  ast.ClassDef,
+
+                  ast.BinOp, ast.BoolOp, ast.Compare, ast.UnaryOp,
+                  ast.DictComp, ast.ListComp, ast.SetComp, ast.GeneratorExp,
+                  ast.Yield, ast.Lambda, ast.IfExp, ast.Call, ast.Subscript,
+                  ast.Attribute, ast.Dict, ast.List, ast.Tuple,
+                  ast.Set, ast.Name, ast.Str, ast.Bytes, ast.Num,
+                  ast.NameConstant, ast.Starred,
+
+                  ast.Ellipsis, ast.Index, ast.Slice, ast.ExtSlice,
+
+                  ast.And, ast.Or, ast.Add, ast.Sub, ast.Mult, ast.Div,
+                  ast.Mod, ast.Pow, ast.LShift, ast.RShift, ast.BitOr,
+                  ast.BitXor, ast.BitAnd, ast.FloorDiv, ast.Invert, ast.Not,
+                  ast.UAdd, ast.USub, ast.Eq, ast.NotEq, ast.Lt, ast.LtE,
+                  ast.Gt, ast.GtE, ast.Is, ast.IsNot, ast.In, ast.NotIn,
+
+                  ast.alias, ast.keyword, ast.arguments, ast.arg, ast.comprehension,
+                  ast.ExceptHandler, ast.withitem
+                  ]
+# Indices of the types above, so the order of two types is found without searching them in the list
+COMPARED_TYPE_INDEX = {t: i for i, t in enumerate(COMPARED_TYPES)}
+
+# Operations and attributes are all ok
+COMPARED_EQUAL_TYPES = {ast.And, ast.Or, ast.Add, ast.Sub, ast.Mult, ast.Div,
+                        ast.Mod, ast.Pow, ast.LShift, ast.RShift, ast.BitOr,
+                        ast.BitXor, ast.BitAnd, ast.FloorDiv, ast.Invert,
+                        ast.Not, ast.UAdd, ast.USub, ast.Eq, ast.NotEq, ast.Lt,
+                        ast.LtE, ast.Gt, ast.GtE, ast.Is, ast.IsNot, ast.In,
+                        ast.NotIn, ast.Load, ast.Store, ast.Del, ast.AugLoad,
+                        ast.AugStore, ast.Param, ast.Ellipsis, ast.Pass,
+                        ast.Break, ast.Continue
+                        }
+
+# Attributes to compare in the identical types
+COMPARED_ATTR_MAP = {ast.Module: ["body"], ast.Interactive: ["body"],
+                     ast.Expression: ["body"], ast.Suite: ["body"],
+
+                     ast.FunctionDef: ["name", "args", "body", "decorator_list", "returns"],
+                     ast.ClassDef: ["name", "bases", "keywords", "body", "decorator_list"],
+                     ast.Return: ["value"],
+                     ast.Delete: ["targets"],
+                     ast.Assign: ["targets", "value"],
+                     ast.AugAssign: ["target", "op", "value"],
+                     ast.For: ["target", "iter", "body", "orelse"],
+                     ast.While: ["test", "body", "orelse"],
+                     ast.If: ["test", "body", "orelse"],
+                     ast.With: ["items", "body"],
+                     ast.Raise: ["exc", "cause"],
+                     ast.Try: ["body", "handlers", "orelse", "finalbody"],
+                     ast.Assert: ["test", "msg"],
+                     ast.Import: ["names"],
+                     ast.ImportFrom: ["module", "names", "level"],
+                     ast.Global: ["names"],
+                     ast.Expr: ["value"],
+
+                     ast.BoolOp: ["op", "values"],
+                     ast.BinOp: ["left", "op", "right"],
+                     ast.UnaryOp: ["op", "operand"],
+                     ast.Lambda: ["args", "body"],
+                     ast.IfExp: ["test", "body", "orelse"],
+                     ast.Dict: ["keys", "values"],
+                     ast.Set: ["elts"],
+                     ast.ListComp: ["elt", "generators"],
+                     ast.SetComp: ["elt", "generators"],
+                     ast.DictComp: ["key", "value", "generators"],
+                     ast.GeneratorExp: ["elt", "generators"],
+                     ast.Yield: ["value"],
+                     ast.Compare: ["left", "ops", "comparators"],
+                     ast.Call: ["func", "args", "keywords"],
+                     ast.Num: ["n"],
+                     ast.Str: ["s"],
+                     ast.Bytes: ["s"],
+                     ast.NameConstant: ["value"],
+                     ast.Constant: ["value"],
+                     ast.Attribute: ["value", "attr"],
+                     ast.Subscript: ["value", "slice"],
+                     ast.List: ["elts"],
+                     ast.Tuple: ["elts"],
+                     ast.Starred: ["value"],
+
+                     ast.Slice: ["lower", "upper", "step"],
+                     ast.ExtSlice: ["dims"],
+                     ast.Index: ["value"],
+
+                     ast.comprehension: ["target", "iter", "ifs"],
+                     ast.ExceptHandler: ["type", "name", "body"],
+                     ast.arguments: ["args", "vararg", "kwonlyargs", "kw_defaults", "kwarg", "defaults"],
+                     ast.arg: ["arg", "annotation"],
+                     ast.keyword: ["arg", "value"],
+                     ast.alias: ["name", "asname"],
+                     ast.withitem: ["context_expr", "optional_vars"]}
+
+
+def getComparedType(a):
+    """The type of a node for compareASTs and hashAST. Python 3.8+ parses all literals as ast.Constant,
+       so a constant is compared as the literal node which older versions create for its value"""
+    if type(a) != ast.Constant:
+        return type(a)
+    if a.value is None or type(a.value) == bool:
+        return ast.NameConstant
+    if a.value is Ellipsis:
+        return ast.Ellipsis
+    if type(a.value) == str:
+        return ast.Str
+    if type(a.value) == bytes:
+        return ast.Bytes
+    return ast.Num
+
+
 def compareASTs(a, b, checkEquality=False):
     """A comparison function for ASTs"""
     # None before others
@@ -971,45 +1096,18 @@ def compareASTs(a, b, checkEquality=False):
         return -1 if isinstance(a, ast.AST) else 1
 
     # Order by differing types
-    if type(a) != type(b):
-        # Here is a brief ordering of types that we care about
-        blehTypes = [ast.Load, ast.Store, ast.Del, ast.AugLoad, ast.AugStore, ast.Param]
-        if type(a) in blehTypes and type(b) in blehTypes:
+    a_type, b_type = getComparedType(a), getComparedType(b)
+    if a_type != b_type:
+        if a_type in COMPARED_BLEH_TYPES and b_type in COMPARED_BLEH_TYPES:
             return 0
-        elif type(a) in blehTypes or type(b) in blehTypes:
-            return -1 if type(a) in blehTypes else 1
-
-        types = [ast.Module, ast.Interactive, ast.Expression, ast.Suite,
-
-                 ast.Break, ast.Continue, ast.Pass, ast.Global,
-                 ast.Expr, ast.Assign, ast.AugAssign, ast.Return,
-                 ast.Assert, ast.Delete, ast.If, ast.For, ast.While,
-                 ast.With, ast.Import, ast.ImportFrom, ast.Raise,
-                 ast.Try, ast.FunctionDef,
-                 ast.ClassDef,
-
-                 ast.BinOp, ast.BoolOp, ast.Compare, ast.UnaryOp,
-                 ast.DictComp, ast.ListComp, ast.SetComp, ast.GeneratorExp,
-                 ast.Yield, ast.Lambda, ast.IfExp, ast.Call, ast.Subscript,
-                 ast.Attribute, ast.Dict, ast.List, ast.Tuple,
-                 ast.Set, ast.Name, ast.Str, ast.Bytes, ast.Num,
-                 ast.NameConstant, ast.Starred,
-
-                 ast.Ellipsis, ast.Index, ast.Slice, ast.ExtSlice,
-
-                 ast.And, ast.Or, ast.Add, ast.Sub, ast.Mult, ast.Div,
-                 ast.Mod, ast.Pow, ast.LShift, ast.RShift, ast.BitOr,
-                 ast.BitXor, ast.BitAnd, ast.FloorDiv, ast.Invert, ast.Not,
-                 ast.UAdd, ast.USub, ast.Eq, ast.NotEq, ast.Lt, ast.LtE,
-                 ast.Gt, ast.GtE, ast.Is, ast.IsNot, ast.In, ast.NotIn,
-
-                 ast.alias, ast.keyword, ast.arguments, ast.arg, ast.comprehension,
-                 ast.ExceptHandler, ast.withitem
-                 ]
-        if (type(a) not in types) or (type(b) not in types):
-            log.info(f'astTools\tcompareASTs\tmissing type: {str(type(a))}, {str(type(b))}, bug')
+        elif a_type in COMPARED_BLEH_TYPES or b_type in COMPARED_BLEH_TYPES:
+            return -1 if a_type in COMPARED_BLEH_TYPES else 1
+
+        a_index, b_index = COMPARED_TYPE_INDEX.get(a_type), COMPARED_TYPE_INDEX.get(b_type)
+        if a_index is None or b_index is None:
+            log.info(f'astTools\tcompareASTs\tmissing type: {str(a_type)}, {str(b_type)}, bug')
             return 0
-        return types.index(type(a)) - types.index(type(b))
+        return a_index - b_index
 
     # Then, more complex expressions- but don't bother with this if we're just checking equality
     if not checkEquality:
@@ -1019,87 +1117,22 @@ def compareASTs(a, b, checkEquality=False):
             return bd - ad
 
     # NameConstants are special
-    if type(a) == ast.NameConstant:
+    if a_type == ast.NameConstant:
         if a.value == None or b.value == None:
             return 1 if a.value != None else (0 if b.value == None else -1)  # short and works
 
         if a.value in [True, False] or b.value in [True, False]:
             return 1 if a.value not in [True, False] else (cmp(a.value, b.value) if b.value in [True, False] else -1)
 
-    if type(a) == ast.Name:
+    if a_type == ast.Name:
         return cmp(a.id, b.id)
 
     # Operations and attributes are all ok
-    elif type(a) in [ast.And, ast.Or, ast.Add, ast.Sub, ast.Mult, ast.Div,
-                     ast.Mod, ast.Pow, ast.LShift, ast.RShift, ast.BitOr,
-                     ast.BitXor, ast.BitAnd, ast.FloorDiv, ast.Invert,
-                     ast.Not, ast.UAdd, ast.USub, ast.Eq, ast.NotEq, ast.Lt,
-                     ast.LtE, ast.Gt, ast.GtE, ast.Is, ast.IsNot, ast.In,
-                     ast.NotIn, ast.Load, ast.Store, ast.Del, ast.AugLoad,
-                     ast.AugStore, ast.Param, ast.Ellipsis, ast.Pass,
-                     ast.Break, ast.Continue
-                     ]:
+    elif a_type in COMPARED_EQUAL_TYPES:
         return 0
 
     # Now compare based on the attributes in the identical types
-    attrMap = {ast.Module: ["body"], ast.Interactive: ["body"],
-               ast.Expression: ["body"], ast.Suite: ["body"],
-
-               ast.FunctionDef: ["name", "args", "body", "decorator_list", "returns"],
-               ast.ClassDef: ["name", "bases", "keywords", "body", "decorator_list"],
-               ast.Return: ["value"],
-               ast.Delete: ["targets"],
-               ast.Assign: ["targets", "value"],
-               ast.AugAssign: ["target", "op", "value"],
-               ast.For: ["target", "iter", "body", "orelse"],
-               ast.While: ["test", "body", "orelse"],
-               ast.If: ["test", "body", "orelse"],
-               ast.With: ["items", "body"],
-               ast.Raise: ["exc", "cause"],
-               ast.Try: ["body", "handlers", "orelse", "finalbody"],
-               ast.Assert: ["test", "msg"],
-               ast.Import: ["names"],
-               ast.ImportFrom: ["module", "names", "level"],
-               ast.Global: ["names"],
-               ast.Expr: ["value"],
-
-               ast.BoolOp: ["op", "values"],
-               ast.BinOp: ["left", "op", "right"],
-               ast.UnaryOp: ["op", "operand"],
-               ast.Lambda: ["args", "body"],
-               ast.IfExp: ["test", "body", "orelse"],
-               ast.Dict: ["keys", "values"],
-               ast.Set: ["elts"],
-               ast.ListComp: ["elt", "generators"],
-               ast.SetComp: ["elt", "generators"],
-               ast.DictComp: ["key", "value", "generators"],
-               ast.GeneratorExp: ["elt", "generators"],
-               ast.Yield: ["value"],
-               ast.Compare: ["left", "ops", "comparators"],
-               ast.Call: ["func", "args", "keywords"],
-               ast.Num: ["n"],
-               ast.Str: ["s"],
-               ast.Bytes: ["s"],
-               ast.NameConstant: ["value"],
-               ast.Attribute: ["value", "attr"],
-               ast.Subscript: ["value", "slice"],
-               ast.List: ["elts"],
-               ast.Tuple: ["elts"],
-               ast.Starred: ["value"],
-
-               ast.Slice: ["lower", "upper", "step"],
-               ast.ExtSlice: ["dims"],
-               ast.Index: ["value"],
-
-               ast.comprehension: ["target", "iter", "ifs"],
-               ast.ExceptHandler: ["type", "name", "body"],
-               ast.arguments: ["args", "vararg", "kwonlyargs", "kw_defaults", "kwarg", "defaults"],
-               ast.arg: ["arg", "annotation"],
-               ast.keyword: ["arg", "value"],
-               ast.alias: ["name", "asname"],
-               ast.withitem: ["context_expr", "optional_vars"]}
-
-    for attr in attrMap[type(a)]:
+    for attr in COMPARED_ATTR_MAP[type(a)]:
         r = compareASTs(getattr(a, attr), getattr(b, attr), checkEquality=checkEquality)
         if r != 0:
             return r
@@ -1107,6 +1140,40 @@ def compareASTs(a, b, checkEquality=False):
     return 0
 
 
+def hashAST(a):
+    """A hash for ASTs, which is the same for ASTs equal by compareASTs, so ASTs with different hashes are not equal.
+       None is returned if the AST has a node of a type missing in compareASTs (or a nan), since compareASTs considers
+       it equal to any other node. So an AST with the None hash can be equal to ASTs with any hashes, and it should be
+       compared with all of them. Use get_possibly_equal_indexes from canonicalization to look for ASTs by hashes"""
+    if a is None:
+        return hash(None)
+
+    if type(a) == list:
+        hashes = tuple(map(hashAST, a))
+        return None if None in hashes else hash((list, hashes))
+
+    if not isinstance(a, ast.AST):
+        # Complex numbers are compared only by the real part, and nan is equal to any other float
+        if type(a) == complex:
+            return hash((complex, a.real))
+        if type(a) == float and a != a:
+            return None
+        return hash((type(a), a))
+
+    a_type = getComparedType(a)
+    if a_type in COMPARED_BLEH_TYPES:
+        return hash(ast.Load)
+    if a_type not in COMPARED_TYPE_INDEX:
+        return None
+    if a_type == ast.Name:
+        return hash((ast.Name, a.id))
+    if a_type in COMPARED_EQUAL_TYPES:
+        return hash(a_type)
+
+    hashes = tuple(hashAST(getattr(a, attr)) for attr in COMPARED_ATTR_MAP[type(a)])
+    return None if None in hashes else hash((a_type, hashes))
+
+
 def deepcopyList(l):
     """Deepcopy of a list"""
     if l == None:
@@ -1,12 +1,14 @@
 # Copyright (c) 2017 Kelly Rivers
 # Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
 
+import heapq
+
 from src.main.canonicalization.consts import TREE_TYPE
 from src.main.util.log_util import log_and_raise_error
 from src.main.canonicalization.transformations import *
 from src.main.canonicalization.display import printFunction
 from src.main.canonicalization.preprocessing_tree import runGiveIds
-from src.main.canonicalization.ast_tools import getAllImports, getAllImportStatements
+from src.main.canonicalization.ast_tools import getAllImports, getAllImportStatements, hashAST
 
 log = logging.getLogger(consts.LOGGER_NAME)
 
@@ -18,8 +20,38 @@ def get_ast(source: str) -> ast.AST:
         log.error(e)
 
 
+# The same tree can be shared by different objects (for example, by codes with the same canon tree),
+# so the trees are compared only if they are different objects
 def are_asts_equal(ast_1: ast.AST, ast_2: ast.AST) -> bool:
-    return compareASTs(ast_1, ast_2) == 0
+    return ast_1 is ast_2 or compareASTs(ast_1, ast_2) == 0
+
+
+# The hash is the same for equal trees, so it can be compared before the trees. It is None if the tree
+# cannot be hashed, and such a tree can be equal to trees with any hashes (see hashAST)
+def get_ast_hash(tree: ast.AST) -> Optional[int]:
+    return hashAST(tree)
+
+
+# If trees are grouped by their hashes, a tree can be equal only to trees from the group with the same hash or from
+# the None group, and a tree with the None hash can be equal to trees from all groups. Indexes in each group should
+# be sorted, so the indexes of the trees, which can be equal to the tree with the given hash, are merged in the sorted
+# (or reversed sorted) order. Thus, the trees are checked in the same order as if all of them were checked
+def get_possibly_equal_indexes(indexes_by_hash: Dict[Optional[int], List[int]], tree_hash: Optional[int],
+                               to_reverse: bool = False) -> Iterable[int]:
+    if tree_hash is None:
+        groups = list(indexes_by_hash.values())
+    else:
+        groups = [indexes_by_hash.get(tree_hash, []), indexes_by_hash.get(None, [])]
+    if to_reverse:
+        return heapq.merge(*map(reversed, groups), reverse=True)
+    return heapq.merge(*groups)
+
+
+# Trees with different hashes are not equal, so they are compared only if the hashes are the same or unknown
+def are_hashed_asts_equal(ast_1: ast.AST, hash_1: Optional[int], ast_2: ast.AST, hash_2: Optional[int]) -> bool:
+    if hash_1 is not None and hash_2 is not None and hash_1 != hash_2:
+        return False
+    return are_asts_equal(ast_1, ast_2)
 
 
 # Get code without extra spaces, comments and others (by calling printFunction from Kelly Rivers code)
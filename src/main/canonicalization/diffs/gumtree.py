@@ -1,9 +1,13 @@
 # Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
 
+import os
 import ast
+import hashlib
 import logging
 import tempfile
-from typing import Tuple
+from functools import lru_cache
+from typing import List, Tuple, Callable, TypeVar
+from concurrent.futures import ThreadPoolExecutor
 from subprocess import check_output, CalledProcessError, STDOUT
 
 from src.main.util import consts
@@ -13,31 +17,59 @@ from src.main.canonicalization.canonicalization import get_code_from_tree
 
 log = logging.getLogger(consts.LOGGER_NAME)
 
+Diffs = TypeVar('Diffs')
+
+
+# Running of GumTreeDiff takes much more time than anything else in path finding, and the same pairs of tree files
+# are compared many times, so the output is cached until the files are changed
+@lru_cache(maxsize=65536)
+def __get_gumtree_output(command: str, src_file: str, src_digest: str, dst_file: str, dst_digest: str) -> str:
+    log.info(f'Calling GumTreeDiff. Src file {src_file}, dst file: {dst_file}')
+    try:
+        args = [consts.GUMTREE_PATH, command, src_file, dst_file]
+        return check_output(args, text=True, stderr=STDOUT).strip('\n')
+    except CalledProcessError as e:
+        log_and_raise_error(f'Error during GumTreeDiff running: {e}, src: {src_file}, dst: {dst_file}', log)
+        exit(1)
+
+
+# Tree files are often deleted and created again at the same paths, so they can have the same modification time
+# and size, but different contents. Thus, the cached output is found by the contents of the files
+def __get_file_digest(file: str) -> str:
+    with open(file, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def get_gumtree_output(command: str, src_file: str, dst_file: str) -> str:
+    return __get_gumtree_output(command, src_file, __get_file_digest(src_file), dst_file, __get_file_digest(dst_file))
+
 
 # Using GumTreeDiff: https://github.com/GumTreeDiff/gumtree/tree/master
 class GumTreeDiff:
 
     @staticmethod
     def get_diffs_number(src_file: str, dst_file: str) -> int:
-        log.info('Calling GumTreeDiff')
-        try:
-            args = [consts.GUMTREE_PATH, 'diffn', src_file, dst_file]
-            output = check_output(args, text=True, stderr=STDOUT).strip('\n')
-            return int(output)
-        except CalledProcessError as e:
-            log_and_raise_error(f'Error during GumTreeDiff running: {e}, src: {src_file}, dst: {dst_file}', log)
-            exit(1)
+        return int(get_gumtree_output('diffn', src_file, dst_file))
 
     @staticmethod
     def get_diffs_and_delete_edits_numbers(src_file: str, dst_file: str) -> Tuple[int, int]:
-        log.info(f'Calling GumTreeDiff. Src file {src_file}, dst file: {dst_file}')
-        try:
-            args = [consts.GUMTREE_PATH, 'deln', src_file, dst_file]
-            delete_edits, diffs = check_output(args, text=True, stderr=STDOUT).strip('\n').split()
-            return int(diffs), int(delete_edits)
-        except CalledProcessError as e:
-            log_and_raise_error(f'Error during GumTreeDiff running: {e}, src: {src_file}, dst: {dst_file}', log)
-            exit(1)
+        delete_edits, diffs = get_gumtree_output('deln', src_file, dst_file).split()
+        return int(diffs), int(delete_edits)
+
+    # Each GumTreeDiff run starts a new JVM, so runs for many pairs are made in parallel. The threads only wait for
+    # the processes, and the results are cached, so the next calls for the same pairs return them at once
+    @staticmethod
+    def __get_for_pairs(get_diffs: Callable[[str, str], Diffs], files_pairs: List[Tuple[str, str]]) -> List[Diffs]:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            return list(executor.map(lambda files: get_diffs(*files), files_pairs))
+
+    @staticmethod
+    def get_diffs_numbers_for_pairs(files_pairs: List[Tuple[str, str]]) -> List[int]:
+        return GumTreeDiff.__get_for_pairs(GumTreeDiff.get_diffs_number, files_pairs)
+
+    @staticmethod
+    def get_diffs_and_delete_edits_numbers_for_pairs(files_pairs: List[Tuple[str, str]]) -> List[Tuple[int, int]]:
+        return GumTreeDiff.__get_for_pairs(GumTreeDiff.get_diffs_and_delete_edits_numbers, files_pairs)
 
     @staticmethod
     def create_tmp_files_and_get_diffs_number(src_tree: ast.AST, dst_tree: ast.AST) -> int:
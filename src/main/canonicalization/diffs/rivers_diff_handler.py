@@ -40,13 +40,22 @@ class RiversDiffHandler:
     def canon_tree(self) -> ast.AST:
         return self._canon_tree
 
-    def get_diffs(self, anon_dst_tree: ast.AST, canon_dst_tree: ast.AST) -> Tuple[List[ChangeVector], TREE_TYPE]:
+    # Anonymized trees are selected if they have no more diffs than canonicalized ones, so diffs between
+    # canonicalized trees are not found (None is returned instead of them) if anonymized trees are equal
+    def __find_diffs(self, anon_dst_tree: ast.AST,
+                     canon_dst_tree: ast.AST) -> Tuple[List[ChangeVector], Optional[List[ChangeVector]]]:
         anon_diffs = diffAsts(self._anon_tree, anon_dst_tree)
+        if len(anon_diffs) == 0:
+            log.info('Anonymized trees are equal')
+            return anon_diffs, None
         canon_diffs = diffAsts(self._canon_tree, canon_dst_tree)
         log.info(f'Number of diffs between anonymized trees is {len(anon_diffs)}\n'
                  f'Number of diffs between canonicalized trees is {len(canon_diffs)}')
+        return anon_diffs, canon_diffs
 
-        if len(anon_diffs) <= len(canon_diffs):
+    def get_diffs(self, anon_dst_tree: ast.AST, canon_dst_tree: ast.AST) -> Tuple[List[ChangeVector], TREE_TYPE]:
+        anon_diffs, canon_diffs = self.__find_diffs(anon_dst_tree, canon_dst_tree)
+        if canon_diffs is None or len(anon_diffs) <= len(canon_diffs):
             log.info(f'Anonymized trees were selected')
             anon_diffs, _ = updateChangeVectors(anon_diffs, self._anon_tree, self._anon_tree)
             return anon_diffs, TREE_TYPE.ANON
@@ -57,11 +66,15 @@ class RiversDiffHandler:
     def get_diffs_from_diff_handler(self, diff_handler: RiversDiffHandler) -> Tuple[List[ChangeVector], TREE_TYPE]:
         return self.get_diffs(diff_handler.anon_tree, diff_handler._canon_tree)
 
+    # Updating of change vectors does not change their number, so it is skipped here
     def get_diffs_number(self, anon_dst_tree: Optional[ast.AST], canon_dst_tree: Optional[ast.AST]) -> int:
         if anon_dst_tree is None or canon_dst_tree is None:
             log_and_raise_error(f'Trees can not be empty!\nAnon tree:\n{get_code_from_tree(anon_dst_tree)}\n'
                                 f'Canon tree:\n{get_code_from_tree(canon_dst_tree)}', log)
-        return len(self.get_diffs(anon_dst_tree, canon_dst_tree)[0])
+        anon_diffs, canon_diffs = self.__find_diffs(anon_dst_tree, canon_dst_tree)
+        if canon_diffs is None:
+            return len(anon_diffs)
+        return min(len(anon_diffs), len(canon_diffs))
 
     def apply_diffs(self, diffs: List[ChangeVector], tree_type: TREE_TYPE = TREE_TYPE.CANON) -> ast.AST:
         source_tree = deepcopy(self._orig_tree)
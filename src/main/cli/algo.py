@@ -31,6 +31,7 @@ class AlgoCli(ICli):
         self._task = None
         self._graph = None
         self._to_get_nodes_number_statistics = False
+        self._processes = 1
 
     def configure_args(self) -> None:
         note_message = f'Note: if you want to deserialize the graph, you should use param ' \
@@ -62,10 +63,13 @@ class AlgoCli(ICli):
         self._parser.add_argument(ALGO_PARAMS.NOD_NUM_STAT.value, type=self.str_to_bool, nargs='?', const=True,
                                   default=False,
                                   help='to visualize the number of nodes statistics (for each vertex and in general)')
+        self._parser.add_argument(ALGO_PARAMS.PROCESSES.value, type=int, nargs='?', const=1, default=1,
+                                  help='the number of processes to construct graph, files are handled in parallel '
+                                       'if it is more than 1')
 
     def __construct_graph(self) -> None:
         if self._to_construct:
-            self._graph = construct_solution_graph(self._path, self._task)
+            self._graph = construct_solution_graph(self._path, self._task, processes=self._processes)
             self._log.info('Graph was constructed')
         elif self._to_deserialize:
             self._graph = SolutionSpaceSerializer.deserialize(self._path)
@@ -104,6 +108,7 @@ class AlgoCli(ICli):
         self._path = self.handle_path(args.path[0], self._to_construct)
         self._level = self.str_to_algo_level(args.level)
         self._task = self.str_to_task(args.task)
+        self._processes = args.processes
 
     # Todo: implement it
     def __get_hint(self) -> None:
@@ -108,6 +108,7 @@ class ALGO_PARAMS(Enum):
     NOD_NUM_STAT = '--nod_num_stat'
     TASK = '--task'
     LEVEL = '--level'
+    PROCESSES = '--processes'
     PATH = 'path'
 
     @classmethod
@@ -117,6 +118,7 @@ class ALGO_PARAMS(Enum):
 
 class PREPROCESSING_PARAMS(Enum):
     LEVEL = '--level'
+    PROCESSES = '--processes'
     PATH = 'path'
 
     @classmethod
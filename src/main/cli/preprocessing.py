@@ -2,6 +2,7 @@
 
 import sys
 import logging
+from functools import partial
 
 sys.path.append('.')
 from src.main.util import consts
@@ -20,17 +21,22 @@ class PreprocessingCli(ICli):
         super().__init__()
         self._path = None
         self._level = None
+        self._processes = 1
 
     def configure_args(self) -> None:
         self._parser.add_argument(PREPROCESSING_PARAMS.PATH.value, type=str, nargs=1, help='data path')
         self._parser.add_argument(PREPROCESSING_PARAMS.LEVEL.value, nargs='?', const=PREPROCESSING_LEVEL.max_value(),
                                   default=PREPROCESSING_LEVEL.max_value(),
                                   help=PREPROCESSING_LEVEL.description())
+        self._parser.add_argument(PREPROCESSING_PARAMS.PROCESSES.value, type=int, nargs='?', const=1, default=1,
+                                  help=f'the number of processes for the level {PREPROCESSING_LEVEL.MERGE.value}, '
+                                       f'folders are handled in parallel if it is more than 1')
 
     def parse_args(self) -> None:
         args = self._parser.parse_args()
         self._path = self.handle_path(args.path[0])
         self._level = self.str_to_preprocessing_level(args.level)
+        self._processes = args.processes
 
     def main(self) -> None:
         self.parse_args()
@@ -39,8 +45,11 @@ class PreprocessingCli(ICli):
             current_level = PREPROCESSING_LEVEL(level_index)
             self._log.info(f'Current action is {current_level.level_handler()}')
             new_paths = []
+            level_handler = current_level.level_handler()
+            if current_level == PREPROCESSING_LEVEL.MERGE:
+                level_handler = partial(level_handler, processes=self._processes)
             for path in paths:
-                path = current_level.level_handler()(path)
+                path = level_handler(path)
                 if current_level == PREPROCESSING_LEVEL.TESTS_RESULTS:
                     # Get all sub folders
                     new_paths += get_all_file_system_items(path, language_item_condition, FILE_SYSTEM_ITEM.SUBDIR)
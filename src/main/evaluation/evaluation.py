@@ -17,8 +17,7 @@ from src.main.solution_space.measured_tree.measured_tree import IMeasuredTree
 from src.main.solution_space.measured_tree.measured_tree_v_7 import MeasuredTreeV7
 from src.main.evaluation.pseudo_solutions_sampling import sample_n_correct_test_inputs
 from src.main.solution_space.consts import TEST_INPUT, EVALUATION_PATH, EVALUATION_FRAGMENT_PATH
-from src.main.canonicalization.canonicalization import get_canon_tree_from_anon_tree, get_imports, are_asts_equal, \
-    get_code_from_tree
+from src.main.canonicalization.canonicalization import get_canon_tree_from_anon_tree, get_imports, are_asts_equal
 from src.main.util.file_util import get_content_from_file, create_file, deserialize_data_from_file, \
     serialize_data_and_write_to_file
 
@@ -82,7 +81,7 @@ class Evaluation:
             # Keep getting hints until reaching the full solution or getting the same tree again (it means that
             # there is a loop, so we cannot lead to the full solution)
             while anon_tree.rate != TEST_RESULT.FULL_SOLUTION.value and not same_tree_in_loop:
-                log.info(f'step: {steps_n}, anon tree:\n {get_code_from_tree(anon_tree.tree)}')
+                log.info(f'step: {steps_n}, anon tree:\n {anon_tree.code}')
                 anon_tree = self._path_finder.find_next_anon_tree(anon_tree, canon_tree,
                                                                   f'test_result_{i}_step_{steps_n}')
                 canon_tree = get_canon_tree_from_anon_tree(anon_tree.tree, get_imports(anon_tree.tree))
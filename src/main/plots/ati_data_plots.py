@@ -18,12 +18,19 @@ log = logging.getLogger(consts.LOGGER_NAME)
 
 AtiEvent = Union[ATI_RUN_EVENT, ATI_EDITOR_EVENT]
 
+# Only these columns are needed for the plot, so other ones are not read at all
+ATI_DATA_PLOT_COLUMNS = [TIMESTAMP_COL, FRAGMENT_COL, EVENT_DATA_COL]
+ATI_DATA_PLOT_DTYPES = {EVENT_DATA_COL: 'category'}
+
 
 def __create_ati_events_plot(ax: plt.axes, df: pd.DataFrame, event_data: List[AtiEvent],
-                             event_colors: Dict[AtiEvent, str], title: str) -> None:
+                             event_colors: Dict[AtiEvent, str], title: str,
+                             event_data_groups: Dict[str, pd.DataFrame]) -> None:
     add_fragments_length_plot(ax, df)
+    # Events without any rows are added too, to have all of them in the legend
+    empty_df = df.iloc[0:0]
     for event in event_data:
-        event_df = df.loc[df[EVENT_DATA_COL] == event.value]
+        event_df = event_data_groups.get(event.value, empty_df)
         add_fragments_length_plot(ax, event_df, event_colors[event], LARGE_SIZE, event.value)
     add_legend_to_the_right(ax)
     ax.set_ylabel(FRAGMENT_LENGTH_COL)
@@ -33,14 +40,19 @@ def __create_ati_events_plot(ax: plt.axes, df: pd.DataFrame, event_data: List[At
 
 # Create plots with different event types (running events and editor events), taken from ati data
 def create_ati_data_plot(path: str, folder_to_save: str = None, to_show: bool = False) -> None:
-    data = pd.read_csv(path, encoding=consts.ISO_ENCODING)
-    data[FRAGMENT_LENGTH_COL] = data[FRAGMENT_COL].fillna('').str.len()
+    data = pd.read_csv(path, encoding=consts.ISO_ENCODING, usecols=ATI_DATA_PLOT_COLUMNS, dtype=ATI_DATA_PLOT_DTYPES,
+                       low_memory=False)
+    data[FRAGMENT_LENGTH_COL] = data[FRAGMENT_COL].fillna('').str.len().astype('int32')
+    # Split data by events once instead of filtering the whole data for each event
+    event_data_groups = dict(list(data.groupby(EVENT_DATA_COL, sort=False, observed=True)))
 
     fig, (ax_run, ax_editor) = plt.subplots(2, 1, figsize=(20, 10))
     run_title = f'Run events in {get_short_name(path)}'
-    __create_ati_events_plot(ax_run, data, ATI_RUN_EVENT.get_events(), ATI_RUN_EVENT_COLOR_DICT, run_title)
+    __create_ati_events_plot(ax_run, data, ATI_RUN_EVENT.get_events(), ATI_RUN_EVENT_COLOR_DICT, run_title,
+                             event_data_groups)
 
     editor_title = f'Editor events in {get_short_name(path)}'
-    __create_ati_events_plot(ax_editor, data, ATI_EDITOR_EVENT.get_events(), ATI_EDITOR_EVENT_COLOR_DICT, editor_title)
+    __create_ati_events_plot(ax_editor, data, ATI_EDITOR_EVENT.get_events(), ATI_EDITOR_EVENT_COLOR_DICT,
+                             editor_title, event_data_groups)
 
     save_and_show_if_needed(folder_to_save, to_show, fig, data_path=path, name_prefix='ati_events')
@@ -14,6 +14,10 @@ from src.main.statistics_gathering.statistics_gathering import get_tasks_statist
 
 log = logging.getLogger(consts.LOGGER_NAME)
 
+# At the end of the palette we have more dark colours.
+# The reversed copy is made once, since reversing the palette in place changes it for all the next plots
+BAR_COLORWAY = list(reversed(plot_consts.BAR_PALETTE))
+
 
 def __get_tasks_with_freq(language_dict: Dict[consts.TASK, int]) -> Tuple[List[str], List[int]]:
     tasks = []
@@ -33,13 +37,6 @@ def __get_bars_for_plot(statistics_dict: TaskStatistics) -> List[go.Bar]:
     return bars
 
 
-def __get_colors() -> List[str]:
-    colors = plot_consts.BAR_PALETTE
-    # At the end of the list we have more dark colours
-    colors.reverse()
-    return colors
-
-
 def __plot_bar_chart(bars: List[go.Bar], path: str, plot_name: str = 'bar_plot',
                      format: consts.EXTENSION = consts.EXTENSION.HTML, auto_open: bool = False) -> None:
     fig = go.Figure(data=bars)
@@ -53,7 +50,7 @@ def __plot_bar_chart(bars: List[go.Bar], path: str, plot_name: str = 'bar_plot',
         xaxis=dict(
             title_text='Task'
         ),
-        colorway=__get_colors()
+        colorway=BAR_COLORWAY
     )
     save_plot(fig, path, plot_consts.CHART_TYPE.BAR, plot_name, format, auto_open)
 
@@ -1,8 +1,12 @@
 # Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
 
+import os
+import ast
 import logging
 import tempfile
 import subprocess
+from typing import Any, Dict, List, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 
@@ -15,27 +19,81 @@ log = logging.getLogger(LOGGER_NAME)
 
 
 FRAGMENT = consts.CODE_TRACKER_COLUMN.FRAGMENT.value
+# Pylint startup takes much more time than checking of a small fragment, so fragments are checked in chunks
+PYLINT_CHUNK_SIZE = 64
 
 
-def __has_inefficient_statements(source: str) -> bool:
+def __get_source(fragment: Any) -> Optional[str]:
     # If the source is nan we don't need to check code
-    if consts.DEFAULT_VALUE.FRAGMENT.is_equal(source):
-        return False
+    if consts.DEFAULT_VALUE.FRAGMENT.is_equal(fragment):
+        return None
+    return str(fragment)
+
+
+# Returns names of the modules, which have inefficient statements
+def __run_pylint(pylint_args: List[str], input: Optional[str] = None) -> Set[str]:
+    args = ['pylint', '--msg-template={module}:{msg}', *pylint_args]
+    stdin = None if input is None else subprocess.PIPE
+    p = subprocess.Popen(args, stdin=stdin, stdout=subprocess.PIPE)
+    output = p.communicate(None if input is None else input.encode(consts.UTF_ENCODING))[0]
+    p.kill()
+
+    modules = set()
+    for line in output.decode(consts.UTF_ENCODING).split('\n'):
+        module, _, msg = line.partition(':')
+        if contains_any_of_substrings(msg, consts.PYLINT_KEY_WORDS):
+            modules.add(module)
+    return modules
+
+
+def __has_inefficient_statements(source: str) -> bool:
+    module = 'fragment'
+    return module in __run_pylint(['--from-stdin', module + consts.EXTENSION.PY.value], source)
+
+
+# Pylint reports 'Statement seems to have no effect' only for expression statements, so if the source does not
+# have any expression statements except calls, there is no need to run pylint. If the source cannot be parsed,
+# it is checked by pylint as before
+def __may_have_inefficient_statements(source: str) -> bool:
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return True
+    effective_expressions = (ast.Call, ast.Yield, ast.YieldFrom, ast.Await)
+    return any(isinstance(node, ast.Expr) and not isinstance(node.value, effective_expressions)
+               for node in ast.walk(tree))
+
+
+def __find_inefficient_sources(sources: Set[str]) -> Set[str]:
+    sources = set(filter(__may_have_inefficient_statements, sources))
+    # A single source does not need any files, since pylint can read it from stdin
+    if len(sources) <= 1:
+        return set(filter(__has_inefficient_statements, sources))
 
-    with tempfile.NamedTemporaryFile() as tmp:
-        tmp.write(bytes(str(source), encoding=consts.UTF_ENCODING))
-        tmp.seek(0)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        module_to_source: Dict[str, str] = {}
+        files = []
+        for i, source in enumerate(sources):
+            module = f'fragment_{i}'
+            file = os.path.join(tmp_dir, module + consts.EXTENSION.PY.value)
+            with open(file, 'w', encoding=consts.UTF_ENCODING) as f:
+                f.write(source)
+            module_to_source[module] = source
+            files.append(file)
 
-        args = ['pylint', tmp.name]
-        p = subprocess.Popen(args, stdout=subprocess.PIPE)
-        output = p.communicate()[0].decode(consts.UTF_ENCODING)
-        p.kill()
+        chunks = [files[i:i + PYLINT_CHUNK_SIZE] for i in range(0, len(files), PYLINT_CHUNK_SIZE)]
+        log.info(f'Run pylint on {len(files)} unique fragments in {len(chunks)} chunks')
+        # Pylint is run in a subprocess, so threads are enough to run the chunks in parallel
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            modules = set().union(*executor.map(__run_pylint, chunks))
 
-        return contains_any_of_substrings(output, consts.PYLINT_KEY_WORDS)
+    return {module_to_source[m] for m in modules if m in module_to_source}
 
 
 def remove_inefficient_statements_from_df(df: pd.DataFrame) -> pd.DataFrame:
-    return df[df.apply(lambda row: not __has_inefficient_statements(row[FRAGMENT]), axis=1)]
+    sources = df[FRAGMENT].map(__get_source)
+    inefficient_sources = __find_inefficient_sources(set(sources.dropna()))
+    return df[~sources.isin(inefficient_sources)]
 
 def remove_inefficient_statements(path: str, output_directory_prefix: str = 'remove_inefficient_statements') -> str:
     return handle_folder(path, output_directory_prefix, remove_inefficient_statements_from_df)
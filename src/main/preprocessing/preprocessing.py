@@ -1,13 +1,16 @@
 # Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
 
+import os
 import csv
 import logging
+from multiprocessing import Pool
+from functools import lru_cache, partial
 from typing import List, Tuple, Optional
 
 import pandas as pd
 
 from src.main.util import consts
-from src.main.util.log_util import log_and_raise_error
+from src.main.util.log_util import log_and_raise_error, configure_pool_process_logger, get_log_file
 from src.main.preprocessing import activity_tracker_handler as ath
 from src.main.preprocessing.code_tracker_handler import handle_ct_file
 from src.main.preprocessing.activity_tracker_handler import handle_ati_file, get_ct_name_from_ati_data, \
@@ -17,28 +20,33 @@ from src.main.util.file_util import get_original_file_name, get_all_file_system_
 
 log = logging.getLogger(consts.LOGGER_NAME)
 
+FOLDERS_CHUNK_SIZE = 16
 
-def is_ct_file(csv_file: str, column: consts.CODE_TRACKER_COLUMN = consts.CODE_TRACKER_COLUMN.CHOSEN_TASK) -> bool:
+
+# The header is cached by the file path and its stat values, so the same file is not read twice
+# until it is changed
+@lru_cache(maxsize=4096)
+def __get_csv_header(csv_file: str, mtime_ns: int, size: int) -> Tuple[str, ...]:
     with open(csv_file, encoding=consts.ISO_ENCODING) as f:
         reader = csv.reader(f)
         try:
-            if column.value in next(reader):
-                return True
+            return tuple(next(reader))
         except StopIteration:
-            return False
-    return False
+            return ()
+
+
+def is_ct_file(csv_file: str, column: consts.CODE_TRACKER_COLUMN = consts.CODE_TRACKER_COLUMN.CHOSEN_TASK) -> bool:
+    stat = os.stat(csv_file)
+    return column.value in __get_csv_header(csv_file, stat.st_mtime_ns, stat.st_size)
 
 
 def __get_real_ati_file_index(files: List[str]) -> int:
-    count_ati = 0
-    ati_index = -1
-    for i, f in enumerate(files):
-        if consts.ACTIVITY_TRACKER_FILE_NAME in f and not is_ct_file(f):
-            count_ati += 1
-            ati_index = i
-            if count_ati >= 2:
-                log_and_raise_error('The number of activity tracker files is more than 1', log)
-    return ati_index
+    # Only files with the activity tracker name can be real ati files, so headers are read only for them
+    ati_candidates_indices = [i for i, f in enumerate(files) if consts.ACTIVITY_TRACKER_FILE_NAME in f]
+    ati_indices = [i for i in ati_candidates_indices if not is_ct_file(files[i])]
+    if len(ati_indices) >= 2:
+        log_and_raise_error('The number of activity tracker files is more than 1', log)
+    return ati_indices[0] if ati_indices else -1
 
 
 def __has_files_with_same_names(files: List[str]) -> bool:
@@ -50,8 +58,7 @@ def __separate_ati_and_other_files(files: List[str]) -> Tuple[List[str], Optiona
     ati_file_index = __get_real_ati_file_index(files)
     ati_file = None
     if ati_file_index != -1:
-        ati_file = files[ati_file_index]
-        del files[ati_file_index]
+        ati_file = files.pop(ati_file_index)
     if __has_files_with_same_names(files):
         log.info('The number of the code tracker files with the same names is more than 1')
         ati_file = None
@@ -79,25 +86,39 @@ def handle_ct_and_at(ct_file: str, ct_df: pd.DataFrame, ati_file: str, ati_df: p
     return ct_df
 
 
-def preprocess_data(path: str) -> str:
-    output_directory = get_output_directory(path, consts.PREPROCESSING_OUTPUT_DIRECTORY)
-    folders = get_all_file_system_items(path, data_subdirs_condition, consts.FILE_SYSTEM_ITEM.SUBDIR)
-    for folder in folders:
-        log.info(f'Start handling the folder {folder}')
-        files = get_all_file_system_items(folder, extension_file_condition(consts.EXTENSION.CSV))
-        try:
-            ct_files, ati_file = __separate_ati_and_other_files(files)
-        # Drop the current folder
-        except ValueError:
-            continue
+def __handle_folder(output_directory: str, path: str, folder: str) -> None:
+    log.info(f'Start handling the folder {folder}')
+    files = get_all_file_system_items(folder, extension_file_condition(consts.EXTENSION.CSV))
+    try:
+        ct_files, ati_file = __separate_ati_and_other_files(files)
+    # Drop the current folder
+    except ValueError:
+        return
+
+    ati_df = handle_ati_file(ati_file)
 
-        ati_df = handle_ati_file(ati_file)
+    for ct_file in ct_files:
+        ct_df, language = handle_ct_file(ct_file)
+        ct_df = handle_ct_and_at(ct_file, ct_df, ati_file, ati_df, language)
 
-        for ct_file in ct_files:
-            ct_df, language = handle_ct_file(ct_file)
-            ct_df = handle_ct_and_at(ct_file, ct_df, ati_file, ati_df, language)
+        write_result(output_directory, path, ct_file, ct_df)
 
-            write_result(output_directory, path, ct_file, ct_df)
+    log.info(f'Finish handling the folder {folder}')
 
-        log.info(f'Finish handling the folder {folder}')
+
+# All folders are independent, so they can be handled in parallel by a pool of processes. The pool is opt-in, since
+# each process keeps data of its folders in memory, and it is not bigger than the number of folders
+def preprocess_data(path: str, processes: int = 1) -> str:
+    output_directory = get_output_directory(path, consts.PREPROCESSING_OUTPUT_DIRECTORY)
+    folders = get_all_file_system_items(path, data_subdirs_condition, consts.FILE_SYSTEM_ITEM.SUBDIR)
+    handle_folder = partial(__handle_folder, output_directory, path)
+    processes = min(processes, len(folders))
+    if processes <= 1:
+        for folder in folders:
+            handle_folder(folder)
+        return output_directory
+
+    with Pool(processes=processes, initializer=configure_pool_process_logger, initargs=(get_log_file(),)) as pool:
+        for i, _ in enumerate(pool.imap_unordered(handle_folder, folders, chunksize=FOLDERS_CHUNK_SIZE)):
+            log.info(f'Handled folders: {i + 1}/{len(folders)}')
     return output_directory
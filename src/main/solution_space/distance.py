@@ -7,7 +7,7 @@ import itertools
 from queue import Queue
 from threading import Thread
 from abc import ABCMeta, abstractmethod
-from typing import TypeVar, List, Generic, Dict, Union
+from typing import TypeVar, List, Generic, Dict, Union, Optional
 
 from src.main.util.consts import LOGGER_NAME
 from src.main.util.log_util import log_and_raise_error
@@ -52,6 +52,8 @@ class IDistanceMatrix(Generic[Item, Upd], metaclass=ABCMeta):
     def __init__(self, to_store_dist: bool = True):
         self._dist: Dict[Item, Dict[Item, int]] = {}
         self._to_store_dist = to_store_dist
+        # The sorted matrix is found once until the distances are changed
+        self._dist_matrix: Optional[List[List[int]]] = None
 
     @property
     def to_store_dist(self) -> bool:
@@ -81,6 +83,7 @@ class IDistanceMatrix(Generic[Item, Upd], metaclass=ABCMeta):
         # If we don't store dist, we don't fill self._dist[new_item],
         # but we add an empty dict to be able to fill self._dist later
         self._dist[new_item] = {}
+        self._dist_matrix = None
         if not self._to_store_dist:
             log.info('The param to_store_dist is False. We don\'t fill distance matrix')
             return False
@@ -99,6 +102,7 @@ class IDistanceMatrix(Generic[Item, Upd], metaclass=ABCMeta):
         if upd_item not in self._dist.keys():
             log.info('This item doesn\'t exist, so dist cannot be updated')
             return False
+        self._dist_matrix = None
         for item in self._dist.keys():
             # We can not get a distance less than 0
             if self._dist[item][upd_item] == 0:
@@ -128,13 +132,17 @@ class IDistanceMatrix(Generic[Item, Upd], metaclass=ABCMeta):
         for src_item, dst_item in itertools.combinations(self._dist.keys(), 2):
             queue.put((src_item, dst_item))
         queue.join()
+        self._dist_matrix = None
 
-    # Get matrix sorted according vertex ids
+    # Get matrix sorted according vertex ids.
+    # The matrix is cached until the dist is changed, so a copy is returned to keep the cached matrix unchanged
     def __get_dist_matrix(self) -> List[List[int]]:
-        matrix = []
-        for _, dst_vertices in sorted(self._dist.items(), key=(lambda item: item[0].id)):
-            matrix.append([dist for _, dist in sorted(dst_vertices.items(), key=(lambda item: item[0].id))])
-        return matrix
+        if self._dist_matrix is None:
+            self._dist_matrix = []
+            for _, dst_vertices in sorted(self._dist.items(), key=(lambda item: item[0].id)):
+                self._dist_matrix.append([dist for _, dist in sorted(dst_vertices.items(),
+                                                                     key=(lambda item: item[0].id))])
+        return [list(row) for row in self._dist_matrix]
 
 
 # We update 'Vertex' by adding new anon_file, so update type is 'str'
@@ -2,23 +2,27 @@
 
 from __future__ import annotations
 
-from typing import Tuple
+from typing import Tuple, Union, Callable
 from abc import ABCMeta, abstractmethod
 
 from src.main.util.consts import TASK
 from src.main.solution_space.serialized_code import AnonTree
 from src.main.canonicalization.diffs.gumtree import GumTreeDiff
 
+# Distance info can be returned as a function, which builds it, if it takes time to build it
+DistanceInfo = Union[str, Callable[[], str]]
+
 
 class IMeasuredTree(object, metaclass=ABCMeta):
 
     def __init__(self, user_tree: AnonTree, candidate_tree: AnonTree, task: TASK):
         self._user_tree = user_tree
         self._candidate_tree = candidate_tree
+        # The task is used for calculating the distance, so it should be set before
+        self._task = task
         self.__init_diffs_number_and_rollback_probability()
-        self._users_count = len(candidate_tree.get_unique_users())
+        self._users_count = candidate_tree.unique_users_number
         self._distance_to_user, self._distance_info = self.__calculate_distance_to_user()
-        self._task = TASK
 
     @abstractmethod
     def __init_diffs_number_and_rollback_probability(self) -> None:
@@ -32,6 +36,8 @@ class IMeasuredTree(object, metaclass=ABCMeta):
 
     @property
     def distance_info(self) -> str:
+        if callable(self._distance_info):
+            self._distance_info = self._distance_info()
         return self._distance_info
 
     @property
@@ -56,7 +62,7 @@ class IMeasuredTree(object, metaclass=ABCMeta):
 
     # Together with distance (float) we want to get distance info (str) to know how distance was count
     @abstractmethod
-    def __calculate_distance_to_user(self) -> Tuple[float, str]:
+    def __calculate_distance_to_user(self) -> Tuple[float, DistanceInfo]:
         raise NotImplementedError
 
     @abstractmethod
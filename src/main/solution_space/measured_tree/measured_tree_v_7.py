@@ -11,8 +11,8 @@ from src.main.solution_space.serialized_code import AnonTree
 from src.main.canonicalization.diffs.gumtree import GumTreeDiff
 from src.main.solution_space.path_finder.path_finder import log
 from src.main.solution_space.path_finder_test_system import doc_param
-from src.main.canonicalization.canonicalization import are_asts_equal
-from src.main.solution_space.measured_tree.measured_tree import IMeasuredTree
+from src.main.canonicalization.canonicalization import are_hashed_asts_equal
+from src.main.solution_space.measured_tree.measured_tree import IMeasuredTree, DistanceInfo
 
 
 class MeasuredTreeV7(IMeasuredTree):
@@ -30,17 +30,18 @@ class MeasuredTreeV7(IMeasuredTree):
     #     self._rollback_probability = delete_edits
 
     def _IMeasuredTree__init_diffs_number_and_rollback_probability(self) -> None:
-        if are_asts_equal(self._user_tree.tree, self._candidate_tree.tree):
+        if are_hashed_asts_equal(self._user_tree.tree, self._user_tree.tree_hash,
+                                 self._candidate_tree.tree, self._candidate_tree.tree_hash):
             self._diffs_number = math.inf
             self._rollback_probability = 0
         else:
             diffs_number, delete_edits = GumTreeDiff \
                 .get_diffs_and_delete_edits_numbers(self.user_tree.tree_file, self.candidate_tree.tree_file)
-            self._diffs_number = diffs_number if diffs_number != 0 else math.inf
-            self._rollback_probability = 0 if diffs_number == 0 else delete_edits / diffs_number
+            self._diffs_number = diffs_number or math.inf
+            self._rollback_probability = delete_edits / diffs_number if diffs_number else 0
 
     @doc_param(_diffs_w, _users_w, _rate_w, _rollback_w, _age_w, _exp_w, _structure_w)
-    def _IMeasuredTree__calculate_distance_to_user(self) -> Tuple[float, str]:
+    def _IMeasuredTree__calculate_distance_to_user(self) -> Tuple[float, DistanceInfo]:
         """
         Finds distance as weighted sum of:
         1. diffs_number, weight: {0}
@@ -51,26 +52,41 @@ class MeasuredTreeV7(IMeasuredTree):
         6. (if possible) abs difference between age, weight: {4}
         7. (if possible) abs difference between exp, weight: {5}
         """
+        # Each term is found once and used both for the distance and for the distance info
+        user_tree, candidate_tree = self._user_tree, self._candidate_tree
+        task_users_number = USERS_NUMBER[self._task]
+        rates = user_tree.rate, candidate_tree.rate
+        structure_diff = user_tree.ast_structure - candidate_tree.ast_structure
         distance = self._diffs_w * self._diffs_number \
-                   + self._users_w * self.users_number / USERS_NUMBER[self._task] \
-                   + self._rate_w * (self.user_tree.rate - self.candidate_tree.rate) \
-                   + self._rollback_w * self.rollback_probability \
-                   + self._structure_w * (self.user_tree.ast_structure - self.candidate_tree.ast_structure)
-        distance_info = f'(diffs: {self._diffs_w} * {self._diffs_number}) + ' \
-                        f'(users: {self._users_w} * {self.users_number} / {USERS_NUMBER[self._task]}) + ' \
-                        f'(rate: {self._rate_w} * ({self.user_tree.rate} - {self.candidate_tree.rate})) + ' \
-                        f'(rollback: {self._rollback_w} * {self.rollback_probability}) + ' \
-                        f'(structure: {self._structure_w} * {self.user_tree.ast_structure - self.candidate_tree.ast_structure})'
+                   + self._users_w * self._users_count / task_users_number \
+                   + self._rate_w * (rates[0] - rates[1]) \
+                   + self._rollback_w * self._rollback_probability \
+                   + self._structure_w * structure_diff
 
-        trees = [self.user_tree, self.candidate_tree]
+        trees = [user_tree, candidate_tree]
+        age_medians, exp_medians = None, None
         if AnonTree.have_non_empty_attr('_age_median', trees):
-            distance += self._age_w * abs(self.user_tree.age_median - self.candidate_tree.age_median)
-            distance_info += f' + (age: {self._age_w} * |{self.user_tree.age_median} - {self.candidate_tree.age_median}|)'
+            age_medians = user_tree.age_median, candidate_tree.age_median
+            distance += self._age_w * abs(age_medians[0] - age_medians[1])
         if AnonTree.have_non_empty_attr('_experience_median', trees):
-            distance += self._exp_w * abs(self.user_tree.experience_median - self.candidate_tree.experience_median)
-            distance_info += f' + (exp: {self._exp_w} * |{self.user_tree.experience_median} - {self.candidate_tree.experience_median}|)'
+            exp_medians = user_tree.experience_median, candidate_tree.experience_median
+            distance += self._exp_w * abs(exp_medians[0] - exp_medians[1])
 
-        return distance, distance_info
+        # The distance info is needed only for the candidates info files, so it is built when it is gotten.
+        # Medians can be found again later, so the values used for the distance are kept here
+        def get_distance_info() -> str:
+            distance_info = f'(diffs: {self._diffs_w} * {self._diffs_number}) + ' \
+                            f'(users: {self._users_w} * {self.users_number} / {task_users_number}) + ' \
+                            f'(rate: {self._rate_w} * ({rates[0]} - {rates[1]})) + ' \
+                            f'(rollback: {self._rollback_w} * {self.rollback_probability}) + ' \
+                            f'(structure: {self._structure_w} * {structure_diff})'
+            if age_medians is not None:
+                distance_info += f' + (age: {self._age_w} * |{age_medians[0]} - {age_medians[1]}|)'
+            if exp_medians is not None:
+                distance_info += f' + (exp: {self._exp_w} * |{exp_medians[0]} - {exp_medians[1]}|)'
+            return distance_info
+
+        return distance, get_distance_info
 
     def __lt__(self, o: object):
         """
@@ -11,8 +11,8 @@ from abc import ABCMeta, abstractmethod
 from src.main.util import consts
 from src.main.util.file_util import create_file
 from src.main.solution_space.serialized_code import AnonTree
+from src.main.canonicalization.diffs.gumtree import GumTreeDiff
 from src.main.solution_space.solution_graph import SolutionGraph
-from src.main.canonicalization.canonicalization import get_code_from_tree
 from src.main.solution_space.measured_tree.measured_tree import IMeasuredTree
 
 log = logging.getLogger(consts.LOGGER_NAME)
@@ -35,6 +35,17 @@ class IPathFinder(object, metaclass=ABCMeta):
     def get_measured_tree(self, user_tree: AnonTree, candidate_tree: AnonTree) -> IMeasuredTree:
         return self._measured_vertex_subclass(user_tree, candidate_tree, self._graph.task)
 
+    # Measured trees find diffs with GumTreeDiff one by one, so the diffs for all candidates are found in parallel
+    # before, and the measured trees get them from the GumTreeDiff cache.
+    # Trees with the same hash are almost always equal, and some measured trees don't run GumTreeDiff for equal trees,
+    # so such candidates are skipped here
+    def get_measured_trees(self, user_tree: AnonTree, candidate_trees: List[AnonTree]) -> List[IMeasuredTree]:
+        GumTreeDiff.get_diffs_and_delete_edits_numbers_for_pairs([(user_tree.tree_file, candidate_tree.tree_file)
+                                                                  for candidate_tree in candidate_trees
+                                                                  if user_tree.tree_hash is None
+                                                                  or user_tree.tree_hash != candidate_tree.tree_hash])
+        return [self.get_measured_tree(user_tree, candidate_tree) for candidate_tree in candidate_trees]
+
     # Find the next anon tree
     # Make sure code_info_list from user_anon_tree contains one code_info
     @abstractmethod
@@ -45,11 +56,11 @@ class IPathFinder(object, metaclass=ABCMeta):
     def write_candidates_info_to_file(self, user_tree: AnonTree, candidates: List[IMeasuredTree],
                                       file_prefix: str = 'candidates', path: Optional[str] = None) -> str:
         user_info = f'profile: {user_tree.code_info_list[0].user.profile},\n\n' \
-                    f'{get_code_from_tree(user_tree.tree)}\n\n\n\n\n'
+                    f'{user_tree.code}\n\n\n\n\n'
         candidates_info = ''.join([f'Tree id: {candidate.candidate_tree.id},\n'
                                    f'Distance to user: {candidate.distance_to_user}\n'
                                    f'Distance info: {candidate.distance_info}\n\n\n'
-                                   f'{get_code_from_tree(candidate.candidate_tree.tree)}\n\n\n'
+                                   f'{candidate.candidate_tree.code}\n\n\n'
                                    for candidate in candidates])
         if path is None:
             path = os.path.join(self.graph.graph_directory, 'candidates_info')
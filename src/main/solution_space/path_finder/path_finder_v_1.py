@@ -1,11 +1,13 @@
 # Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
 
+import os
 from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
 
 from src.main.solution_space.solution_graph import Vertex
 from src.main.solution_space.path_finder_test_system import skip
 from src.main.solution_space.path_finder.path_finder import IPathFinder, log
-from src.main.canonicalization.canonicalization import get_code_from_tree, are_asts_equal
+from src.main.canonicalization.canonicalization import are_hashed_asts_equal
 from src.main.solution_space.consts import DISTANCE_TO_GRAPH_THRESHOLD, DIFFS_PERCENT_TO_GO_DIRECTLY
 
 
@@ -21,7 +23,7 @@ class PathFinderV1(IPathFinder):
 
         log.info(f'{self.__class__.__name__}\n'
                  f'Start finding the next code state for '
-                 f'the user code:\n{get_code_from_tree(user_vertex.serialized_code.anon_trees[0])}\nand '
+                 f'the user code:\n{user_vertex.serialized_code.anon_trees[0].code}\nand '
                  f'the user:\n{user_vertex.code_info_list[0].user}')
         goal = self.__find_closest_goal(user_vertex)
         log.info(f'Chosen goal is vertex {goal.id}')
@@ -37,16 +39,16 @@ class PathFinderV1(IPathFinder):
 
     def __choose_best_vertex(self, user_vertex: Vertex, vertices: List[Vertex]) -> Optional[Vertex]:
         """
-        1. Sort candidates using MeasuredVertex
-        2. Return the first candidate
+        1. Find the best candidate using MeasuredVertex
+        2. Return the best candidate
         """
         log.info(f'Number of candidates: {len(vertices)}\nCandidates ids are {([vertex.id for vertex in vertices])}')
         if len(vertices) == 0:
             return None
-        candidates = list(map(lambda vertex: self.get_measured_tree(user_vertex, vertex), vertices))
-        candidates.sort()
-        log.info(f'The best vertex id is {candidates[0].vertex.id}')
-        return candidates[0].vertex
+        # Only the best candidate is needed, so candidates are not sorted and not even stored
+        best_candidate = min(self.get_measured_tree(user_vertex, vertex) for vertex in vertices)
+        log.info(f'The best vertex id is {best_candidate.vertex.id}')
+        return best_candidate.vertex
 
     # Note: A goal is a vertex, which has the rate equals 1 and it connects to the end vertex
     def __find_closest_goal(self, user_vertex: Vertex) -> Vertex:
@@ -69,20 +71,18 @@ class PathFinderV1(IPathFinder):
         """
         user_diffs_to_goal = goal.get_dist(user_vertex)
         log.info(f'User diff to goal is {user_diffs_to_goal}')
-        candidates = []
-        for vertex in self._graph.get_traversal():
-            # We don't want to add to result the same vertex
-            if are_asts_equal(user_vertex.serialized_code.canon_tree, vertex.serialized_code.canon_tree):
-                continue
-            if not to_add_empty and self._graph.is_empty_vertex(vertex):
-                continue
+        # We don't want to add to result the same vertex
+        vertices = [vertex for vertex in self._graph.get_traversal()
+                    if not are_hashed_asts_equal(user_vertex.canon_tree, user_vertex.canon_tree_hash,
+                                                 vertex.canon_tree, vertex.canon_tree_hash)
+                    and (to_add_empty or not self._graph.is_empty_vertex(vertex))]
 
-            # Todo: calculate diffs to the nearest goal from each vertex or not???
-            # Todo: think about empty tree
-            diffs = self._graph.get_dist_between_vertices(vertex, goal)
-
-            if diffs <= user_diffs_to_goal:
-                candidates.append(vertex)
+        # Todo: calculate diffs to the nearest goal from each vertex or not???
+        # Todo: think about empty tree
+        # Each dist is found by running GumTreeDiff, so the dists of all vertices are found in parallel
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            vertices_diffs = list(executor.map(goal.get_dist, vertices))
+        candidates = [vertex for vertex, diffs in zip(vertices, vertices_diffs) if diffs <= user_diffs_to_goal]
         return self.__choose_best_vertex(user_vertex, candidates)
 
     @staticmethod
@@ -1,11 +1,9 @@
 # Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
 
-import ast
-from typing import List, Optional
+from typing import List, Optional, Set
 
 from src.main.solution_space.solution_graph import Vertex
 from src.main.solution_space.path_finder_test_system import skip
-from src.main.canonicalization.canonicalization import get_code_from_tree
 from src.main.solution_space.path_finder.path_finder import IPathFinder, log
 from src.main.solution_space.consts import DIFFS_PERCENT_TO_GO_DIRECTLY, DISTANCE_TO_GRAPH_THRESHOLD, \
     ROLLBACK_PROBABILITY
@@ -23,7 +21,7 @@ class PathFinderV2(IPathFinder):
 
         log.info(f'{self.__class__.__name__}\n'
                  f'Start finding the next code state for '
-                 f'the user code:\n{get_code_from_tree(user_vertex.serialized_code.anon_trees[0])}\nand '
+                 f'the user code:\n{user_vertex.serialized_code.anon_trees[0].code}\nand '
                  f'the user:\n{user_vertex.code_info_list[0].user}')
         goal = self.__find_closest_goal(user_vertex)
         log.info(f'Chosen goal is vertex {goal.id}')
@@ -39,16 +37,16 @@ class PathFinderV2(IPathFinder):
 
     def __choose_best_vertex(self, user_vertex: Vertex, vertices: List[Vertex]) -> Optional[Vertex]:
         """
-        1. Sort candidates using MeasuredVertex
-        2. Return the first candidate
+        1. Find the best candidate using MeasuredVertex
+        2. Return the best candidate
         """
         log.info(f'Number of candidates: {len(vertices)}\nCandidates ids are {([vertex.id for vertex in vertices])}')
         if len(vertices) == 0:
             return None
-        candidates = list(map(lambda vertex: self.get_measured_tree(user_vertex, vertex), vertices))
-        candidates.sort()
-        log.info(f'The best vertex id is {candidates[0].vertex.id}')
-        return candidates[0].vertex
+        # Only the best candidate is needed, so candidates are not sorted and not even stored
+        best_candidate = min(self.get_measured_tree(user_vertex, vertex) for vertex in vertices)
+        log.info(f'The best vertex id is {best_candidate.vertex.id}')
+        return best_candidate.vertex
 
     # Note: A goal is a vertex, which has the rate equals 1 and it connects to the end vertex
     def __find_closest_goal(self, user_vertex: Vertex) -> Vertex:
@@ -75,8 +73,10 @@ class PathFinderV2(IPathFinder):
             return self.__choose_best_vertex(user_vertex, vertex_in_graph.children)
 
         candidates = []
+        # User code lines are the same for all vertices, so they are found once
+        user_code_lines = set(self.__get_code_lines(user_vertex))
         for vertex in self._graph.get_traversal():
-            if self.__get_rollback_probability(user_vertex.canon_tree, vertex.canon_tree) <= ROLLBACK_PROBABILITY:
+            if self.__get_rollback_probability(user_code_lines, vertex) <= ROLLBACK_PROBABILITY:
                 candidates.append(vertex)
             #
             # diffs = self._graph.get_diffs_number_between_vertexes(vertex, goal)
@@ -86,17 +86,17 @@ class PathFinderV2(IPathFinder):
         return self.__choose_best_vertex(user_vertex, candidates)
 
     @staticmethod
-    def __get_rollback_probability(user_canon_tree: ast.AST, vertex_canon_tree: ast.AST) -> float:
+    def __get_code_lines(vertex: Vertex) -> List[str]:
+        return vertex.serialized_code.canon_code.strip('\n').split('\n')
+
+    @staticmethod
+    def __get_rollback_probability(user_code_lines: Set[str], vertex: Vertex) -> float:
         """
         1. Get rollback probability by counting percentage of the same lines
         """
         # Todo: use AST comparing or other measure
-        included_lines_count = 0
-        vertex_code_lines = get_code_from_tree(vertex_canon_tree).strip('\n').split('\n')
-        user_code = get_code_from_tree(user_canon_tree)
-        for line in vertex_code_lines:
-            if line in user_code:
-                included_lines_count += 1
+        vertex_code_lines = PathFinderV2.__get_code_lines(vertex)
+        included_lines_count = sum(line in user_code_lines for line in vertex_code_lines)
         return included_lines_count / len(vertex_code_lines)
 
     @staticmethod
@@ -10,7 +10,7 @@ from src.main.solution_space.serialized_code import AnonTree
 from src.main.canonicalization.diffs.gumtree import GumTreeDiff
 from src.main.solution_space.path_finder_test_system import doc_param, skip
 from src.main.solution_space.path_finder.path_finder import IPathFinder, log
-from src.main.canonicalization.canonicalization import get_code_from_tree, AstStructure
+from src.main.canonicalization.canonicalization import AstStructure
 
 
 @skip('Doesn\'t consider fragments structure')
@@ -49,13 +49,13 @@ class PathFinderV4(IPathFinder):
 
         log.info(f'{self.__class__.__name__}\n'
                  f'Start finding the next code state for '
-                 f'the user code:\n{get_code_from_tree(user_anon_tree.tree)}\nand '
+                 f'the user code:\n{user_anon_tree.code}\nand '
                  f'the user:\n{user_anon_tree.code_info_list[0].user}')
 
         self.candidates_file_prefix = f'{self.get_file_prefix_by_user_tree(candidates_file_id)}'
         same_tree = self.__find_same_tree_in_graph(user_anon_tree, user_canon_tree)
         if same_tree is not None:
-            log.info(f'Found the same tree. Chosen anon tree:\n{get_code_from_tree(same_tree.tree)}')
+            log.info(f'Found the same tree. Chosen anon tree:\n{same_tree.code}')
             return same_tree
 
         log.info('Same tree not found')
@@ -68,13 +68,13 @@ class PathFinderV4(IPathFinder):
                                                    candidates_file_name='graph_candidates')
         # We can have graph_anon_tree = None
         if graph_anon_tree:
-            log.info(f'Chosen anon tree in graph:\n{get_code_from_tree(graph_anon_tree.tree)}')
+            log.info(f'Chosen anon tree in graph:\n{graph_anon_tree.code}')
             if not self._is_close_to_goals(graph_anon_tree):
                 log.info(f'The most of path is not done. Go through graph')
                 return graph_anon_tree
 
         goal_anon_tree = self.__find_closest_goal_tree(user_anon_tree, canon_nodes_number)
-        log.info(f'Chosen goal anon tree:\n{get_code_from_tree(goal_anon_tree.tree)}')
+        log.info(f'Chosen goal anon tree:\n{goal_anon_tree.code}')
 
         # We can have graph_anon_tree = None
         if graph_anon_tree and self.__go_through_graph(user_anon_tree, graph_anon_tree, goal_anon_tree):
@@ -93,7 +93,8 @@ class PathFinderV4(IPathFinder):
         """
         graph_vertex = self._graph.find_vertex(user_canon_tree)
         if graph_vertex:
-            graph_anon_tree = graph_vertex.serialized_code.find_anon_tree(user_anon_tree.tree)
+            graph_anon_tree = graph_vertex.serialized_code.find_anon_tree(user_anon_tree.tree,
+                                                                          user_anon_tree.nodes_number)
             if graph_anon_tree:
                 next_anon_trees = [AnonTree.get_item_by_id(id) for id in graph_anon_tree.next_anon_trees_ids]
                 next_anon_trees = [tree for tree in next_anon_trees if tree.nodes_number >= user_anon_tree.nodes_number]
@@ -213,19 +214,20 @@ class PathFinderV4(IPathFinder):
     def __choose_best_anon_tree(self, user_anon_tree: AnonTree, anon_trees: List[AnonTree],
                                 candidates_file_name: str) -> Optional[AnonTree]:
         """
-        1. Sort candidates using MeasuredTree
-        2. Return the first candidate
+        1. Find the best candidate using MeasuredTree
+        2. Return the best candidate
         """
         log.info(f'Number of candidates: {len(anon_trees)}\nCandidates ids are {([a_t.id for a_t in anon_trees])}')
         if len(anon_trees) == 0:
             return None
-        candidates = list(map(lambda anon_tree: self.get_measured_tree(user_anon_tree, anon_tree), anon_trees))
+        candidates = self.get_measured_trees(user_anon_tree, anon_trees)
 
         self.write_candidates_info_to_file(user_anon_tree, candidates,  f'{self.candidates_file_prefix}_{candidates_file_name}')
 
-        candidates.sort()
-        log.info(f'The best vertex id is {candidates[0].candidate_tree.id}')
-        return candidates[0].candidate_tree
+        # Only the best candidate is needed, so candidates are not sorted
+        best_candidate = min(candidates)
+        log.info(f'The best vertex id is {best_candidate.candidate_tree.id}')
+        return best_candidate.candidate_tree
 
     @staticmethod
     @doc_param(diffs_percent_far_from_graph)
@@ -256,8 +258,9 @@ class PathFinderV4(IPathFinder):
         2. Return not __is_far_from_graph
         """
         empty_anon = self._graph.empty_vertex.serialized_code.anon_trees[0]
-        diffs_from_empty_to_user = GumTreeDiff.get_diffs_number(empty_anon.tree_file, user_anon.tree_file)
-        diffs_from_user_to_goal = GumTreeDiff.get_diffs_number(user_anon.tree_file, goal_anon.tree_file)
+        # Both diffs are always needed, so they are found in parallel
+        diffs_from_empty_to_user, diffs_from_user_to_goal = GumTreeDiff.get_diffs_numbers_for_pairs(
+            [(empty_anon.tree_file, user_anon.tree_file), (user_anon.tree_file, goal_anon.tree_file)])
 
         if self.__is_most_of_path_is_done(diffs_from_empty_to_user + diffs_from_user_to_goal,
                                           diffs_from_user_to_goal):
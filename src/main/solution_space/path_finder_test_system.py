@@ -23,7 +23,6 @@ from src.main.solution_space.data_classes import Profile
 from src.main.solution_space.serialized_code import AnonTree
 from src.main.solution_space.solution_graph import SolutionGraph
 from src.main.solution_space.path_finder.path_finder import IPathFinder
-from src.main.canonicalization.canonicalization import get_code_from_tree
 from src.main.util.consts import LOGGER_NAME, INT_EXPERIENCE, TASK, EXTENSION
 from src.main.solution_space.measured_tree.measured_tree import IMeasuredTree
 from src.main.solution_space.solution_space_serializer import SolutionSpaceSerializer
@@ -145,7 +144,7 @@ class TestSystem:
             user_anon_tree, user_canon_tree = self.create_user_trees(self._hint_handler, test_input)
             # TODO: REWRITE IT!
             row = [test_input[TEST_INPUT.INDEX]] +\
-                  [f'{test_input[TEST_INPUT.SOURCE_CODE]}\n\nanon tree:\n{get_code_from_tree(user_anon_tree.tree)}'] + \
+                  [f'{test_input[TEST_INPUT.SOURCE_CODE]}\n\nanon tree:\n{user_anon_tree.code}'] + \
                   [test_input[TEST_INPUT.RATE]] + \
                   [test_input[TEST_INPUT.AGE]] +\
                   [test_input[TEST_INPUT.INT_EXPERIENCE].get_short_str()]
@@ -155,7 +154,7 @@ class TestSystem:
                 hint = HintHandler.get_hint_by_anon_tree(test_input[TEST_INPUT.SOURCE_CODE], next_anon_tree)
                 row.append(f'time: {time}'
                            f'\n\nnext anon tree id: {next_anon_tree.id}'
-                           f'\n\nanon code:\n{get_code_from_tree(next_anon_tree.tree)}'
+                           f'\n\nanon code:\n{next_anon_tree.code}'
                            f'\n\napply diffs:\n{hint.recommended_code}')
             table.add_row(row)
 
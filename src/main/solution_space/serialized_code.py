@@ -5,6 +5,8 @@ from __future__ import annotations
 import os
 import ast
 import logging
+from operator import attrgetter
+from collections import defaultdict
 from typing import List, Callable, Optional, Set
 
 from src.main.util import consts
@@ -19,7 +21,8 @@ from src.main.util.language_util import get_extension_by_language
 from src.main.util.helper_classes.pretty_string import PrettyString
 from src.main.splitting.tasks_tests_handler import check_tasks, create_in_and_out_dict
 from src.main.util.file_util import create_file, is_file, add_suffix_to_file, remove_directory, create_directory
-from src.main.canonicalization.canonicalization import are_asts_equal, get_code_from_tree, get_trees, AstStructure
+from src.main.canonicalization.canonicalization import get_code_from_tree, get_trees, AstStructure, get_ast_hash, \
+    are_hashed_asts_equal, get_possibly_equal_indexes
 
 log = logging.getLogger(consts.LOGGER_NAME)
 
@@ -59,6 +62,8 @@ class ISerializedObject:
 class SerializedTree:
     def __init__(self, file_path: str, tree: ast.AST, tree_id: int, to_create_file: bool = True):
         self._tree = tree
+        self._tree_hash = get_ast_hash(tree)
+        self._code = None
         self._tree_file = add_suffix_to_file(file_path, str(tree_id))
         if to_create_file:
             self.create_file_for_tree(to_overwrite=True)
@@ -75,30 +80,52 @@ class SerializedTree:
     def tree(self) -> ast.AST:
         return self._tree
 
+    @property
+    def tree_hash(self) -> Optional[int]:
+        return self._tree_hash
+
+    # Getting code from a tree takes time, and the code of the same tree is needed many times (for example,
+    # for each candidates info file), so it is found once
+    @property
+    def code(self) -> str:
+        if self._code is None:
+            self._code = get_code_from_tree(self._tree)
+        return self._code
+
+    # Trees serialized before their hashes and codes were kept do not have them
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        if '_tree_hash' not in state:
+            self._tree_hash = get_ast_hash(self._tree)
+        self.__dict__.setdefault('_code', None)
+
     def create_file_for_tree(self, to_overwrite: bool = False) -> str:
         if self._tree_file is not None and not to_overwrite:
-            log_and_raise_error(f'File for tree {get_code_from_tree(self.tree)} already exists in files dict', log)
+            log_and_raise_error(f'File for tree {self.code} already exists in files dict', log)
 
         if not is_file(self.tree_file):
-            code = get_code_from_tree(self.tree)
-            create_file(code, self.tree_file)
-
-        self._tree_file = self.tree_file
+            create_file(self.code, self.tree_file)
         return self.tree_file
 
 
 class AnonTree(IdCounter, PrettyString, SerializedTree):
     def __init__(self, anon_tree: ast.AST, rate: float, file_path: str, code_info: Optional[CodeInfo] = None,
-                 to_create_file: bool = True):
+                 to_create_file: bool = True, ast_structure: Optional[AstStructure] = None):
         self._code_info_list = [] if code_info is None else [code_info]
+        # Unique users are needed for finding medians and for each measured tree with this candidate,
+        # so they are updated on adding a code info instead of going through all code info list
+        self._unique_users = set() if code_info is None else {code_info.user}
         self._age_median = None
         self._experience_median = None
         self._rate = rate
         IdCounter.__init__(self, to_store_items=True)
         PrettyString.__init__(self)
         SerializedTree.__init__(self, file_path, anon_tree, self.id, to_create_file)
-        self._ast_structure = AstStructure.get_ast_structure(anon_tree)
+        # The structure can be passed if it has been found already
+        self._ast_structure = AstStructure.get_ast_structure(anon_tree) if ast_structure is None else ast_structure
         self._next_anon_trees_ids = []
+        # The ids are kept in a set too, to check if the next anon tree is added already without searching the list
+        self._next_anon_trees_ids_set = set()
 
     @property
     def nodes_number(self) -> int:
@@ -147,43 +174,57 @@ class AnonTree(IdCounter, PrettyString, SerializedTree):
     # Returns True if all anon_trees have non-empty attribute
     @staticmethod
     def have_non_empty_attr(attr: str, anon_trees: List[AnonTree]) -> bool:
-        for anon_tree in anon_trees:
-            if getattr(anon_tree, attr) == EMPTY_MEDIAN:
-                return False
-        return True
+        get_attr = attrgetter(attr)
+        return not any(get_attr(anon_tree) == EMPTY_MEDIAN for anon_tree in anon_trees)
+
+    # Anon trees serialized before their structures, unique users and next anon trees ids set were kept do not have them
+    def __setstate__(self, state: dict) -> None:
+        SerializedTree.__setstate__(self, state)
+        if '_ast_structure' not in state:
+            self._ast_structure = AstStructure.get_ast_structure(self._tree)
+        if '_unique_users' not in state:
+            self._unique_users = {code_info.user for code_info in self._code_info_list}
+        if '_next_anon_trees_ids_set' not in state:
+            self._next_anon_trees_ids_set = set(self._next_anon_trees_ids)
 
     def add_next_anon_tree(self, next_anon_tree: AnonTree) -> bool:
-        if next_anon_tree.id in self._next_anon_trees_ids \
+        if next_anon_tree.id in self._next_anon_trees_ids_set \
                 or next_anon_tree.id == self.id:
             return False
         self._next_anon_trees_ids.append(next_anon_tree.id)
+        self._next_anon_trees_ids_set.add(next_anon_tree.id)
         return True
 
     def add_code_info(self, code_info: CodeInfo) -> None:
         self._code_info_list.append(code_info)
+        self._unique_users.add(code_info.user)
 
     def get_unique_users(self) -> Set[User]:
-        return set([code_info.user for code_info in self._code_info_list])
+        return set(self._unique_users)
 
-    @staticmethod
-    def __find_median(default_value: int, all_values: List[int]) -> int:
-        non_default_values = list(filter(lambda v: v != default_value, all_values))
-        return get_safety_median(non_default_values, EMPTY_MEDIAN)
+    @property
+    def unique_users_number(self) -> int:
+        return len(self._unique_users)
 
     def find_medians(self) -> None:
-        unique_users = self.get_unique_users()
-
-        ages: List[int] = [u.profile.age for u in unique_users]
-        self._age_median = self.__find_median(DEFAULT_VALUE.AGE.value, ages)
-
-        experiences: List[int] = [u.profile.experience.value for u in unique_users]
-        self._experience_median = self.__find_median(DEFAULT_VALUE.INT_EXPERIENCE.value, experiences)
-
-        log.info(f'Found medians for AnonTree {self.id}, unique users number is {len(unique_users)}, '
-                 f'age median is {self._age_median}, experience median is {self._experience_median}')
+        unique_users = self._unique_users
+
+        # Default values are not taken into account, so they are skipped while going through the users once
+        ages: List[int] = []
+        experiences: List[int] = []
+        for u in unique_users:
+            if u.profile.age != DEFAULT_VALUE.AGE.value:
+                ages.append(u.profile.age)
+            if u.profile.experience.value != DEFAULT_VALUE.INT_EXPERIENCE.value:
+                experiences.append(u.profile.experience.value)
+        self._age_median = get_safety_median(ages, EMPTY_MEDIAN)
+        self._experience_median = get_safety_median(experiences, EMPTY_MEDIAN)
+
+        log.info('Found medians for AnonTree %s, unique users number is %s, age median is %s, experience median is %s',
+                 self.id, len(unique_users), self._age_median, self._experience_median)
 
     def __str__(self):
-        return f'Anon_tree: {get_code_from_tree(self._tree)}\n' \
+        return f'Anon_tree: {self.code}\n' \
                f'Code info:\n{list(map(str, self._code_info_list))}\n' \
                f'Structure: {self._ast_structure}' \
 
@@ -232,21 +273,40 @@ class Code(PrettyString):
 
 class SerializedCode(IdCounter, PrettyString, ISerializedObject):
 
-    def __init__(self, code: Code, code_info: CodeInfo, folder_with_files: str, file_prefix: str):
+    # Files for anon trees can be not created if they are not needed (for example, in tests)
+    def __init__(self, code: Code, code_info: CodeInfo, folder_with_files: str, file_prefix: str,
+                 to_create_files: bool = True):
         PrettyString.__init__(self)
         IdCounter.__init__(self)
         ISerializedObject.__init__(self, folder_with_files=folder_with_files, file_prefix=file_prefix,
                                    language=code.language, to_delete_prev_folder=False)
+        self._to_create_files = to_create_files
         anon_tree = AnonTree(code.anon_tree, code.rate,
-                             self.get_file_path(f'{TREE_TYPE.ANON.value}', self.id), code_info)
+                             self.get_file_path(f'{TREE_TYPE.ANON.value}', self.id), code_info,
+                             to_create_file=self._to_create_files)
         self._anon_trees = [anon_tree]
+        # Indexes of anon trees by their hashes, so only anon trees, which can be equal, are compared in find_anon_tree
+        self._anon_tree_indexes_by_hash = defaultdict(list)
+        self._anon_tree_indexes_by_hash[anon_tree.tree_hash].append(0)
         self._canon_tree = code.canon_tree
+        self._canon_tree_hash = get_ast_hash(code.canon_tree)
+        self._canon_code = None
         self._rate = code.rate
 
     @property
     def canon_tree(self) -> ast.AST:
         return self._canon_tree
 
+    @property
+    def canon_tree_hash(self) -> Optional[int]:
+        return self._canon_tree_hash
+
+    @property
+    def canon_code(self) -> str:
+        if self._canon_code is None:
+            self._canon_code = get_code_from_tree(self._canon_tree)
+        return self._canon_code
+
     @property
     def anon_trees(self) -> List[AnonTree]:
         return self._anon_trees
@@ -255,29 +315,46 @@ class SerializedCode(IdCounter, PrettyString, ISerializedObject):
     def language(self) -> consts.LANGUAGE:
         return self._language
 
+    # Codes serialized before the canon tree hash, the canon code and the anon trees indexes were kept do not have them.
+    # Anon trees don't refer to the code, so they are already restored here
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        if '_canon_tree_hash' not in state:
+            self._canon_tree_hash = get_ast_hash(self._canon_tree)
+        self.__dict__.setdefault('_canon_code', None)
+        self.__dict__.setdefault('_to_create_files', True)
+        if '_anon_tree_indexes_by_hash' not in state:
+            self._anon_tree_indexes_by_hash = defaultdict(list)
+            for i, anon_tree in enumerate(self._anon_trees):
+                self._anon_tree_indexes_by_hash[anon_tree.tree_hash].append(i)
+
     def is_full(self) -> bool:
         return self._rate == consts.TEST_RESULT.FULL_SOLUTION.value
 
     def add_anon_tree(self, anon_tree: ast.AST, rate: float, code_info: CodeInfo) -> Optional[str]:
         if rate != self._rate:
             log_and_raise_error(f'Different rates in SerializedCode: {self._rate} and in new AnonTree: {rate}\n'
-                                f'canon_tree:\n{get_code_from_tree(self._canon_tree)}\n'
-                                f'first anon_tree:\n{get_code_from_tree(self.anon_trees[0].tree)}\n'
+                                f'canon_tree:\n{self.canon_code}\n'
+                                f'first anon_tree:\n{self.anon_trees[0].code}\n'
                                 f'new anon_tree:\n{get_code_from_tree(anon_tree)}\n', log)
-        found_anon_tree = self.find_anon_tree(anon_tree)
+        # The structure is needed both for finding the anon tree and for creating a new one, so it's found once
+        ast_structure = AstStructure.get_ast_structure(anon_tree)
+        found_anon_tree = self.find_anon_tree(anon_tree, ast_structure.nodes_number)
         if found_anon_tree:
             found_anon_tree.add_code_info(code_info)
             return None
 
-        new_anon_tree = AnonTree(anon_tree, rate, self.get_file_path(f'{TREE_TYPE.ANON.value}', self.id), code_info)
+        new_anon_tree = AnonTree(anon_tree, rate, self.get_file_path(f'{TREE_TYPE.ANON.value}', self.id), code_info,
+                                 to_create_file=self._to_create_files, ast_structure=ast_structure)
+        self._anon_tree_indexes_by_hash[new_anon_tree.tree_hash].append(len(self._anon_trees))
         self._anon_trees.append(new_anon_tree)
         return new_anon_tree.tree_file
 
-    def get_anon_files(self, filter_anon_trees: Callable[[AnonTree], bool] = (lambda tree: True)) -> List[str]:
-        anon_tree_files = []
-        for anon_tree in list(filter(filter_anon_trees, self._anon_trees)):
-            anon_tree_files.append(anon_tree.tree_file)
-        return anon_tree_files
+    # All anon trees are taken if filter_anon_trees is None
+    def get_anon_files(self, filter_anon_trees: Optional[Callable[[AnonTree], bool]] = None) -> List[str]:
+        if filter_anon_trees is None:
+            return [anon_tree.tree_file for anon_tree in self._anon_trees]
+        return [anon_tree.tree_file for anon_tree in self._anon_trees if filter_anon_trees(anon_tree)]
 
     # Todo: We don't use it anymore, but while we have Distance class, we have not to delete it
     def get_canon_file(self) -> str:
@@ -287,18 +364,29 @@ class SerializedCode(IdCounter, PrettyString, ISerializedObject):
         self._folder_with_files = new_folder_with_files
         self.__create_files_for_trees(to_overwrite=True)
 
+    # The same parts of the paths are found once instead of calling get_file_path for each tree
     def __create_files_for_trees(self, to_overwrite: bool = False) -> None:
+        extension = get_extension_by_language(self._language).value
+        file_prefix = os.path.join(self._folder_with_files, self._file_prefix)
         for i, anon_tree in enumerate(self._anon_trees):
-            anon_tree.tree_file = self.get_file_path(f'{TREE_TYPE.ANON.value}_{i}', anon_tree.id)
-            anon_tree._tree_file = anon_tree.create_file_for_tree(to_overwrite=to_overwrite)
-
-    def find_anon_tree(self, anon_tree: ast.AST) -> Optional[AnonTree]:
-        current_nodes_number = AstStructure.get_nodes_number_in_ast(anon_tree)
-        for a_t in self._anon_trees:
+            anon_tree.tree_file = f'{file_prefix}_{anon_tree.id}_{TREE_TYPE.ANON.value}_{i}{extension}'
+            anon_tree.create_file_for_tree(to_overwrite=to_overwrite)
+
+    # Nodes number of anon_tree can be passed if it's known already
+    def find_anon_tree(self, anon_tree: ast.AST, nodes_number: Optional[int] = None) -> Optional[AnonTree]:
+        current_hash = get_ast_hash(anon_tree)
+        # Equal trees have equal hashes, so only anon trees with the same hash or with the None hash can be equal
+        # (or all anon trees, if the hash is None). They are checked in the order of adding as all anon trees were
+        possibly_equal_anon_trees = [self._anon_trees[i] for i in
+                                     get_possibly_equal_indexes(self._anon_tree_indexes_by_hash, current_hash)]
+        if not possibly_equal_anon_trees:
+            return None
+        current_nodes_number = AstStructure.get_nodes_number_in_ast(anon_tree) if nodes_number is None else nodes_number
+        for a_t in possibly_equal_anon_trees:
             # It will work faster
             if current_nodes_number != a_t.nodes_number:
                 continue
-            elif are_asts_equal(a_t.tree, anon_tree):
+            elif are_hashed_asts_equal(a_t.tree, a_t.tree_hash, anon_tree, current_hash):
                 return a_t
         return None
 
@@ -306,5 +394,5 @@ class SerializedCode(IdCounter, PrettyString, ISerializedObject):
         return f'Id: {self._id}\n' \
                f'Rate: {self._rate}\n' \
                f'Language: {self._language.value}\n' \
-               f'Canon tree:\n{get_code_from_tree(self._canon_tree)}\n' \
+               f'Canon tree:\n{self.canon_code}\n' \
                f'Anon trees: \n{list(map(str, self._anon_trees))}\n'
@@ -5,7 +5,7 @@ import ast
 import logging
 import collections
 from collections import defaultdict
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, DefaultDict
 
 from src.main.solution_space.vertex import Vertex
 from src.main.util.math_util import get_safety_median
@@ -19,7 +19,7 @@ from src.main.util.helper_classes.pretty_string import PrettyString
 from src.main.solution_space import consts as solution_space_consts
 from src.main.util.file_util import remove_directory, create_directory
 from src.main.util.consts import LOGGER_NAME, TASK, LANGUAGE, TEST_RESULT
-from src.main.canonicalization.canonicalization import are_asts_equal, get_code_from_tree, AstStructure
+from src.main.canonicalization.canonicalization import AstStructure, get_ast_hash, are_hashed_asts_equal
 from src.main.solution_space.consts import GRAPH_FOLDER_PREFIX, SOLUTION_SPACE_FOLDER, FILE_PREFIX, EMPTY_MEDIAN
 
 log = logging.getLogger(LOGGER_NAME)
@@ -37,13 +37,16 @@ class GraphIterator(collections.abc.Iterator):
 
     def __bfs_traverse(self) -> List[Vertex]:
         visited = [self._root]
+        # The set is used for checking, and the list keeps the order of the traversal
+        visited_set = {self._root}
         vertices_queue = collections.deque(visited)
         while vertices_queue:
             vertex = vertices_queue.popleft()
             for child in vertex.children:
-                if child not in visited:
+                if child not in visited_set:
                     vertices_queue.append(child)
                     visited.append(child)
+                    visited_set.add(child)
         return visited
 
     def __next__(self):
@@ -57,7 +60,8 @@ class SolutionGraph(collections.abc.Iterable, IdCounter, PrettyString):
     solution_space_folder = SOLUTION_SPACE_FOLDER
 
     def __init__(self, task: TASK, language: LANGUAGE = LANGUAGE.PYTHON, to_delete_old_graph: bool = True,
-                 graph_folder_prefix: str = GRAPH_FOLDER_PREFIX, file_prefix: str = FILE_PREFIX):
+                 graph_folder_prefix: str = GRAPH_FOLDER_PREFIX, file_prefix: str = FILE_PREFIX,
+                 to_create_files: bool = True):
         super().__init__()
         if language == LANGUAGE.UNDEFINED:
             log_and_raise_error(f'Error during constructing a solution graph. Language is not defined', log)
@@ -66,14 +70,20 @@ class SolutionGraph(collections.abc.Iterable, IdCounter, PrettyString):
 
         self._graph_folder_prefix = graph_folder_prefix
         self._file_prefix = file_prefix
+        # Files for anon trees of vertices can be not created if they are not needed (for example, in tests)
+        self._to_create_files = to_create_files
         self._graph_directory = self.get_default_graph_directory()
 
         self.canon_nodes_number_dict = defaultdict(get_empty_list)
         self.anon_nodes_number_dict = defaultdict(get_empty_list)
         self.goals_nodes_number_dict = defaultdict(get_empty_list)
         self.anon_structure_dict = defaultdict(get_empty_list)
+        # Vertices by hashes of their canon trees, so a vertex is found without comparing all vertices, see find_vertex
+        self._canon_tree_hash_dict = defaultdict(get_empty_list)
 
         self._goals_median = None
+        # The traversal is cached until any edge is added, see get_traversal
+        self._traversal = None
 
         if to_delete_old_graph:
             remove_directory(self._graph_directory)
@@ -98,6 +108,20 @@ class SolutionGraph(collections.abc.Iterable, IdCounter, PrettyString):
     def file_prefix(self) -> str:
         return self._file_prefix
 
+    # Vertices of a deserialized graph can be not restored yet while the graph is restored,
+    # so vertices by hashes of their canon trees are collected again only when they are needed
+    @property
+    def canon_tree_hash_dict(self) -> DefaultDict[Optional[int], List[Vertex]]:
+        if self._canon_tree_hash_dict is None:
+            self._canon_tree_hash_dict = defaultdict(get_empty_list)
+            for vertex in self.get_traversal():
+                self._canon_tree_hash_dict[vertex.serialized_code.canon_tree_hash].append(vertex)
+        return self._canon_tree_hash_dict
+
+    @property
+    def to_create_files(self) -> bool:
+        return self._to_create_files
+
     @property
     def start_vertex(self) -> Vertex:
         return self._start_vertex
@@ -144,16 +168,30 @@ class SolutionGraph(collections.abc.Iterable, IdCounter, PrettyString):
     def is_empty_vertex(self, vertex: Vertex) -> bool:
         return vertex == self._empty_vertex
 
+    def reset_traversal(self) -> None:
+        self._traversal = None
+
+    # The traversal is gotten for each search of a vertex, but it changes only when an edge is added,
+    # so it is cached and a copy is returned to keep the cache safe from changes by callers
     def get_traversal(self, to_remove_start: bool = True, to_remove_end: bool = True) -> List[Vertex]:
-        traversal = self.__iter__().traversal
-        # Traversal always contains START_VERTEX, because it's a root for GraphIterator
-        if to_remove_start:
-            traversal.remove(self._start_vertex)
-        # However, it may not contain END_VERTEX if there is no path from the root to it:
-        if to_remove_end and self._end_vertex in traversal:
-            traversal.remove(self._end_vertex)
+        if self._traversal is None:
+            self._traversal = self.__iter__().traversal
+        # Traversal always contains START_VERTEX as the first vertex, because it's a root for GraphIterator,
+        # so it's removed by slicing. However, traversal may not contain END_VERTEX if there is no path from the root
+        # to it, so it's searched for
+        traversal = self._traversal[1:] if to_remove_start else list(self._traversal)
+        if to_remove_end:
+            return [vertex for vertex in traversal if vertex is not self._end_vertex]
         return traversal
 
+    # Graphs serialized before the traversal was cached do not have it. Also, old graphs do not have vertices by hashes
+    # of their canon trees, see canon_tree_hash_dict
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._traversal = None
+        self.__dict__.setdefault('_to_create_files', True)
+        self.__dict__.setdefault('_canon_tree_hash_dict', None)
+
     def get_default_graph_directory(self) -> str:
         return os.path.join(self.__class__.solution_space_folder, str(self._task.value),
                             f'{self._graph_folder_prefix}_{str(self._id)}')
@@ -174,12 +212,29 @@ class SolutionGraph(collections.abc.Iterable, IdCounter, PrettyString):
             self.goals_nodes_number_dict[AstStructure.get_nodes_number_in_ast(vertex.serialized_code.canon_tree)].append(vertex.id)
         return vertex
 
+    # Equal trees have equal hashes, so only vertices with the same hash or with the None hash are compared.
+    # A tree with the None hash can be equal to any tree (see hashAST), so all vertices are compared for it.
+    # Such trees can also be equal to several vertices, and then the first of them in the traversal is found,
+    # as if all vertices were compared
+    def __find_equal_vertex(self, canon_tree: ast.AST) -> Optional[Vertex]:
+        canon_tree_hash = get_ast_hash(canon_tree)
+        if canon_tree_hash is None:
+            candidates = self.get_traversal()
+        else:
+            candidates = self.canon_tree_hash_dict.get(canon_tree_hash, []) + \
+                         self.canon_tree_hash_dict.get(None, [])
+        equal_vertices = [v for v in candidates
+                          if are_hashed_asts_equal(v.canon_tree, v.canon_tree_hash, canon_tree, canon_tree_hash)]
+        if len(equal_vertices) <= 1:
+            return next(iter(equal_vertices), None)
+        return next((v for v in self.get_traversal() if v in equal_vertices), equal_vertices[0])
+
     def find_vertex(self, canon_tree: ast.AST) -> Optional[Vertex]:
-        for vertex in self.get_traversal():
-            if are_asts_equal(vertex.canon_tree, canon_tree):
-                log.info(f'Found an existing vertex {vertex.id} for canon_tree: {str(get_code_from_tree(canon_tree))}')
-                return vertex
-        return None
+        vertex = self.__find_equal_vertex(canon_tree)
+        if vertex is not None:
+            # Equal trees have the same code, and the canon code of the vertex is cached
+            log.info('Found an existing vertex %s for canon_tree: %s', vertex.id, vertex.serialized_code.canon_code)
+        return vertex
 
     def find_or_create_vertex(self, code: Optional[Code], code_info: CodeInfo) -> Vertex:
         if code is None:
@@ -229,11 +284,9 @@ class SolutionGraph(collections.abc.Iterable, IdCounter, PrettyString):
                 anon_tree.find_medians()
 
     def __str__(self) -> str:
-        vertices_str = ''
-        vertices_str += f'Start vertex:\n{str(self.start_vertex)}\n'
-        for vertex in self.get_traversal():
-            vertices_str += str(vertex) + '\n'
-        vertices_str += f'End vertex:\n{str(self.start_vertex)}\n'
+        vertices_str = f'Start vertex:\n{str(self.start_vertex)}\n' \
+                       + ''.join(str(vertex) + '\n' for vertex in self.get_traversal()) \
+                       + f'End vertex:\n{str(self.start_vertex)}\n'
         return f'Task: {self._task.value}\n' \
                f'Language: {self._language.value}\n' \
                f'Vertices:\n{vertices_str}\n'
@@ -3,27 +3,52 @@
 import ast
 import enum
 import logging
-from typing import Tuple, List, Union, Any
+from datetime import datetime
+from multiprocessing import Pool
+from functools import lru_cache, partial
+from collections import defaultdict
+from typing import Tuple, List, Union, Any, Dict, Optional
 
 import pandas as pd
 
 from src.main.util import consts
 from src.main.util.data_util import Column
 from src.main.canonicalization.consts import TREE_TYPE
-from src.main.util.log_util import log_and_raise_error
+from src.main.util.log_util import log_and_raise_error, configure_pool_process_logger, get_log_file
 from src.main.solution_space.serialized_code import Code
-from src.main.splitting.splitting import unpack_tests_results
+from src.main.splitting.splitting import unpack_tests_results, TASKS
 from src.main.solution_space.solution_graph import SolutionGraph
-from src.main.canonicalization.canonicalization import are_asts_equal, get_trees
+from src.main.canonicalization.canonicalization import are_asts_equal, get_trees, get_ast_hash, \
+    get_possibly_equal_indexes
 from src.main.solution_space.data_classes import AtiItem, Profile, User, CodeInfo
 from src.main.util.file_util import get_all_file_system_items, extension_file_condition
 from src.main.util.consts import DEFAULT_VALUE, TASK, LANGUAGE, EXTENSION, INT_EXPERIENCE, TEST_RESULT
 
 log = logging.getLogger(consts.LOGGER_NAME)
 
+# Only these columns are used for creating the solution space, so other columns are not read from the files
+SOLUTIONS_COLUMNS = [consts.CODE_TRACKER_COLUMN.DATE, consts.CODE_TRACKER_COLUMN.TIMESTAMP,
+                     consts.CODE_TRACKER_COLUMN.FRAGMENT, consts.CODE_TRACKER_COLUMN.TESTS_RESULTS,
+                     consts.CODE_TRACKER_COLUMN.AGE, consts.CODE_TRACKER_COLUMN.INT_EXPERIENCE,
+                     consts.ACTIVITY_TRACKER_COLUMN.TIMESTAMP_ATI, consts.ACTIVITY_TRACKER_COLUMN.EVENT_TYPE,
+                     consts.ACTIVITY_TRACKER_COLUMN.EVENT_DATA]
 
-def __get_column_value(solutions: pd.DataFrame, index: int, column: Column) -> Any:
-    return solutions[column.value].iloc[index]
+
+# Values are gotten from solutions row by row, and getting a value from a pandas column takes much more time than
+# from a list, so the columns are converted to lists once
+SolutionsColumns = Dict[str, List[Any]]
+
+
+def __get_solutions_columns(solutions: pd.DataFrame) -> SolutionsColumns:
+    return {column: solutions[column].tolist() for column in solutions.columns}
+
+
+def __get_rows_number(solutions: SolutionsColumns) -> int:
+    return len(solutions[consts.CODE_TRACKER_COLUMN.FRAGMENT.value])
+
+
+def __get_column_value(solutions: SolutionsColumns, index: int, column: Column) -> Any:
+    return solutions[column.value][index]
 
 
 def __get_column_unique_value(solutions: pd.DataFrame, column: Column, default: Any) -> Any:
@@ -42,7 +67,7 @@ def get_enum_or_default(enum_meta: enum.EnumMeta, value: str, default: DEFAULT_V
     return enum_meta._value2member_map_.get(value, default)
 
 
-def __get_ati_data(solutions: pd.DataFrame, index: int) -> AtiItem:
+def __get_ati_data(solutions: SolutionsColumns, index: int) -> AtiItem:
     timestamp = __get_column_value(solutions, index, consts.ACTIVITY_TRACKER_COLUMN.TIMESTAMP_ATI)
     str_event_type = __get_column_value(solutions, index, consts.ACTIVITY_TRACKER_COLUMN.EVENT_TYPE)
     event_type = get_enum_or_default(consts.ACTIVITY_TRACKER_EVENTS, str_event_type, DEFAULT_VALUE.EVENT_TYPE)
@@ -50,28 +75,34 @@ def __get_ati_data(solutions: pd.DataFrame, index: int) -> AtiItem:
     return AtiItem(timestamp=timestamp, event_type=event_type, event_data=event_data)
 
 
-def __are_same_fragments(current_anon_tree: ast.AST, solutions: pd.DataFrame, next_index: int) -> bool:
+# Usually the next fragment is the same string as the current one, so it's not parsed in this case
+def __are_same_fragments(current_fragment: str, current_anon_tree: ast.AST, solutions: SolutionsColumns,
+                         next_index: int) -> bool:
     fragment = __get_column_value(solutions, next_index, consts.CODE_TRACKER_COLUMN.FRAGMENT)
+    if fragment == current_fragment:
+        return True
     next_anon_tree, = get_trees(fragment, {TREE_TYPE.ANON})
     return are_asts_equal(current_anon_tree, next_anon_tree)
 
 
 # Get ati data and add it to the ati_elements list if it is not empty
-def __handle_current_ati(ati_elements: List[AtiItem], solutions: pd.DataFrame, index: int) -> None:
+def __handle_current_ati(ati_elements: List[AtiItem], solutions: SolutionsColumns, index: int) -> None:
     ati_element = __get_ati_data(solutions, index)
     if not ati_element.is_empty():
-        log.info(f'Find not empty ati element: {ati_element}')
+        log.info('Find not empty ati element: %s', ati_element)
         ati_elements.append(ati_element)
 
 
 # Find the same code fragments in data and construct list of ati items for this fragment
-def __find_same_fragments(solutions: pd.DataFrame, start_index: int) -> Tuple[int, List[AtiItem], ast.AST, ast.AST]:
+def __find_same_fragments(solutions: SolutionsColumns,
+                          start_index: int) -> Tuple[int, List[AtiItem], ast.AST, ast.AST]:
     i, ati_elements = start_index + 1, []
     __handle_current_ati(ati_elements, solutions, start_index)
     current_fragment = __get_column_value(solutions, start_index, consts.CODE_TRACKER_COLUMN.FRAGMENT)
     current_anon_tree, current_canon_tree = get_trees(current_fragment, {TREE_TYPE.ANON, TREE_TYPE.CANON})
 
-    while i < solutions.shape[0] and __are_same_fragments(current_anon_tree, solutions, i):
+    rows_number = __get_rows_number(solutions)
+    while i < rows_number and __are_same_fragments(current_fragment, current_anon_tree, solutions, i):
         __handle_current_ati(ati_elements, solutions, i)
         i += 1
     return i, ati_elements, current_anon_tree, current_canon_tree
@@ -86,52 +117,76 @@ def __get_profile(solutions: pd.DataFrame) -> Profile:
     return Profile(age=age, experience=experience)
 
 
-def __get_user(solutions: pd.DataFrame) -> User:
-    return User(__get_profile(solutions))
+# A code with the timestamp, the date and the ati actions of its code info
+CodeChainItem = Tuple[Code, int, datetime, List[AtiItem]]
 
 
-def __get_code_info(solutions: pd.DataFrame, user: User, index: int,
-                    ati_actions: List[AtiItem]) -> CodeInfo:
+def __get_timestamp_and_date(solutions: SolutionsColumns, index: int) -> Tuple[int, datetime]:
     date = __get_column_value(solutions, index, consts.CODE_TRACKER_COLUMN.DATE)
     timestamp = __get_column_value(solutions, index, consts.CODE_TRACKER_COLUMN.TIMESTAMP)
-    return CodeInfo(user, timestamp, date, ati_actions)
+    return timestamp, date
 
 
 def __is_compiled(test_result: float) -> bool:
     return test_result != consts.TEST_RESULT.INCORRECT_CODE.value
 
 
+# There are only a few different tests results, but they are unpacked for each fragment, so the results are cached.
+# A tuple is returned to keep the cached value unchanged
+@lru_cache(maxsize=1024)
+def __unpack_tests_results(tests_results: str) -> Tuple[float, ...]:
+    return tuple(unpack_tests_results(tests_results, TASKS))
+
+
 def __is_correct_fragment(tests_results: str) -> bool:
-    tasks = consts.TASK.tasks()
-    tests_results = unpack_tests_results(tests_results, tasks)
-    compiled_task_count = len([t for i, t in enumerate(tasks) if __is_compiled(tests_results[i])])
+    tests_results = __unpack_tests_results(tests_results)
+    compiled_task_count = sum(map(__is_compiled, tests_results))
     # It is an error, if a part of the tasks is incorrect, but another part is correct.
     # For example: [-1,1,0.5,0.5,-1,-1]
-    if 0 < compiled_task_count < len(tasks):
+    if 0 < compiled_task_count < len(TASKS):
         log_and_raise_error(f'A part of the tasks is incorrect, but another part is correct: {tests_results}', log)
-    return compiled_task_count == len(tasks)
+    return compiled_task_count == len(TASKS)
 
 
+# There are only a few different tests results in the solutions, so each of them is checked once
 def __filter_incorrect_fragments(solutions: pd.DataFrame) -> pd.DataFrame:
-    return solutions.loc[solutions[consts.CODE_TRACKER_COLUMN.TESTS_RESULTS.value].apply(__is_correct_fragment)]
+    tests_results = solutions[consts.CODE_TRACKER_COLUMN.TESTS_RESULTS.value]
+    is_correct_dict = {t_r: __is_correct_fragment(t_r) for t_r in tests_results.unique()}
+    return solutions.loc[tests_results.map(is_correct_dict).astype(bool)]
 
 
 def get_task_index(task: TASK) -> int:
-    return consts.TASK.tasks().index(task)
+    return TASKS.index(task)
 
 
 def get_rate(tests_results: str, task_index: int) -> float:
-    tasks = TASK.tasks()
-    tests_results = unpack_tests_results(tests_results, tasks)
-    if task_index >= len(tasks) or task_index >= len(tests_results):
+    tests_results = __unpack_tests_results(tests_results)
+    if task_index >= len(TASKS) or task_index >= len(tests_results):
         log_and_raise_error(f'Task index {task_index} is more than length of tasks list', log)
     return tests_results[task_index]
 
 
-def __get_code(solutions: pd.DataFrame, index: int, task_index: int, canon_tree: ast.AST, anon_tree: ast.AST) -> Code:
+# Different anon trees often have the same canon tree, so only one object of equal canon trees is kept in a chain.
+# It reduces memory, and equal trees are compared as the same object.
+# A tree with the None hash can be equal to a different tree (see hashAST), and it should not replace such a tree
+# or be replaced by it, so trees with the None hash are kept as they are
+def __intern_canon_tree(canon_tree: ast.AST, canon_trees_by_hash: Dict[int, List[ast.AST]]) -> ast.AST:
+    canon_tree_hash = get_ast_hash(canon_tree)
+    if canon_tree_hash is None:
+        return canon_tree
+    same_hash_canon_trees = canon_trees_by_hash[canon_tree_hash]
+    for same_hash_canon_tree in same_hash_canon_trees:
+        if are_asts_equal(same_hash_canon_tree, canon_tree):
+            return same_hash_canon_tree
+    same_hash_canon_trees.append(canon_tree)
+    return canon_tree
+
+
+def __get_code(solutions: SolutionsColumns, index: int, task_index: int, canon_tree: ast.AST,
+               anon_tree: ast.AST) -> Code:
     tests_results = __get_column_value(solutions, index, consts.CODE_TRACKER_COLUMN.TESTS_RESULTS)
     rate = get_rate(tests_results, task_index)
-    log.info(f'Task index is :{task_index}, rate is: {rate}')
+    log.info('Task index is :%s, rate is: %s', task_index, rate)
     return Code(anon_tree, canon_tree, rate)
 
 
@@ -140,25 +195,37 @@ def __convert_to_datetime(df: pd.DataFrame) -> None:
         df[column.value] = pd.to_datetime(df[column.value], errors='ignore')
 
 
-def __create_code_info_chain(file: str, task: TASK) -> List[Tuple[Code, CodeInfo]]:
+# Codes and data of code infos are found from one file, so they can be found in another process.
+# Users are IdCounter objects, so only the profile is returned, and the user is created in the main process
+def __get_profile_and_code_chain(file: str, task: TASK) -> Tuple[Profile, List[CodeChainItem]]:
     log.info(f'Start solution space creating for file {file} for task {task}')
-    data = pd.read_csv(file, encoding=consts.ISO_ENCODING)
+    data = pd.read_csv(file, encoding=consts.ISO_ENCODING, usecols=[column.value for column in SOLUTIONS_COLUMNS])
     __convert_to_datetime(data)
     solutions = __filter_incorrect_fragments(data)
     log.info(f'Size of solutions after filtering incorrect fragments is {solutions.shape[0]}')
     task_index = get_task_index(task)
-    i, code_info_chain = 0, []
-    user = __get_user(solutions)
-    while i < solutions.shape[0]:
+    i, code_chain = 0, []
+    profile = __get_profile(solutions)
+    solutions_columns = __get_solutions_columns(solutions)
+    canon_trees_by_hash = defaultdict(list)
+    while i < __get_rows_number(solutions_columns):
         old_index = i
-        i, ati_actions, anon_tree, canon_tree = __find_same_fragments(solutions, i)
-        code = __get_code(solutions, old_index, task_index, canon_tree, anon_tree)
-        code_info = __get_code_info(solutions, user, old_index, ati_actions)
-        code_info_chain.append((code, code_info))
+        i, ati_actions, anon_tree, canon_tree = __find_same_fragments(solutions_columns, i)
+        canon_tree = __intern_canon_tree(canon_tree, canon_trees_by_hash)
+        code = __get_code(solutions_columns, old_index, task_index, canon_tree, anon_tree)
+        timestamp, date = __get_timestamp_and_date(solutions_columns, old_index)
+        code_chain.append((code, timestamp, date, ati_actions))
+    log.info(f'Finish solution space creating for file {file} for task {task}')
+    return profile, code_chain
+
+
+def __create_code_info_chain(profile: Profile, code_chain: List[CodeChainItem]) -> List[Tuple[Code, CodeInfo]]:
+    user = User(profile)
+    code_info_chain = [(code, CodeInfo(user, timestamp, date, ati_actions))
+                       for code, timestamp, date, ati_actions in code_chain]
     log.info(f'Size of code info chain before removing loops is {len(code_info_chain)}')
     code_info_chain = __remove_loops(code_info_chain, user)
     log.info(f'Size of code info chain after removing loops is {len(code_info_chain)}')
-    log.info(f'Finish solution space creating for file {file} for task {task}')
     return code_info_chain
 
 
@@ -176,28 +243,49 @@ def __remove_loops(code_info_chain: List[Tuple[Code, CodeInfo]], user: User) ->
     # and we will get after loops removing: Empty Tree -> Tree5
     code_info_chain = [(Code.from_source('', TEST_RESULT.CORRECT_CODE.value), CodeInfo(user))] + code_info_chain
 
+    # The states between a tree and its last occurrence are a loop, so the last occurrence of each tree is found.
+    # Only trees with the same hash or with the None hash can be equal, so indexes of trees are grouped by their hashes
+    anon_trees = [code.anon_tree for code, _ in code_info_chain]
+    anon_tree_hashes = [get_ast_hash(anon_tree) for anon_tree in anon_trees]
+    indexes_by_hash = defaultdict(list)
+    for index, anon_tree_hash in enumerate(anon_tree_hashes):
+        indexes_by_hash[anon_tree_hash].append(index)
+
+    kept_indexes = []
     current_tree_index = 0
     while current_tree_index < len(code_info_chain):
-        current_anon_tree = code_info_chain[current_tree_index][0].anon_tree
-        same_tree_indexes = []
-        for next_tree_index in range(current_tree_index + 1, len(code_info_chain)):
-            next_anon_tree = code_info_chain[next_tree_index][0].anon_tree
-            if are_asts_equal(current_anon_tree, next_anon_tree):
-                same_tree_indexes.append(next_tree_index)
-        if len(same_tree_indexes) > 0:
-            del code_info_chain[current_tree_index:max(same_tree_indexes)]
-        current_tree_index += 1
-    return code_info_chain
-
-
-def construct_solution_graph(path: str, task: TASK, language: LANGUAGE = LANGUAGE.PYTHON) -> SolutionGraph:
+        last_tree_index = current_tree_index
+        for next_tree_index in get_possibly_equal_indexes(indexes_by_hash, anon_tree_hashes[current_tree_index],
+                                                          to_reverse=True):
+            if next_tree_index <= current_tree_index:
+                break
+            if are_asts_equal(anon_trees[current_tree_index], anon_trees[next_tree_index]):
+                last_tree_index = next_tree_index
+                break
+        kept_indexes.append(last_tree_index)
+        current_tree_index = last_tree_index + 1
+    return [code_info_chain[index] for index in kept_indexes]
+
+
+# Codes of different files are independent, so they can be found in parallel by a pool of processes.
+# The pool is opt-in, and it is not bigger than the number of files. Code info chains are created and added to the graph
+# in the order of the files, so users get the same ids as in the sequential run
+def construct_solution_graph(path: str, task: TASK, language: LANGUAGE = LANGUAGE.PYTHON,
+                             processes: int = 1) -> SolutionGraph:
     files = get_all_file_system_items(path, extension_file_condition(EXTENSION.CSV))
     sg = SolutionGraph(task, language)
     log.info(f'Start creating solution space from path {path}')
-    for file in files:
-        log.info(f'Start handling file {file}')
-        code_info_chain = __create_code_info_chain(file, task)
-        sg.add_code_info_chain(code_info_chain)
+    get_profile_and_code_chain = partial(__get_profile_and_code_chain, task=task)
+    processes = min(processes, len(files))
+    if processes <= 1:
+        for file in files:
+            log.info(f'Start handling file {file}')
+            sg.add_code_info_chain(__create_code_info_chain(*get_profile_and_code_chain(file)))
+    else:
+        with Pool(processes=processes, initializer=configure_pool_process_logger, initargs=(get_log_file(),)) as pool:
+            for file, profile_and_code_chain in zip(files, pool.imap(get_profile_and_code_chain, files)):
+                log.info(f'Start adding code info chain from file {file}')
+                sg.add_code_info_chain(__create_code_info_chain(*profile_and_code_chain))
     log.info(f'Finish creating solution space from path {path}')
     log.info('Start finding medians')
     sg.find_all_medians()
@@ -7,7 +7,6 @@ from src.main.util import consts
 from src.main.splitting.task_checker import check_call_safely
 from src.main.util.file_util import create_file, remove_directory
 from src.main.solution_space.solution_graph import SolutionGraph, Vertex
-from src.main.canonicalization.canonicalization import get_code_from_tree
 
 
 # It is the class for creating a solution graph representation by using graphviz library
@@ -17,22 +16,21 @@ class SolutionSpaceVisualizer:
 
     @staticmethod
     def __get_vertex_info(vertex: Vertex) -> str:
-        info = ''
-        info += f'Canon code:\n{get_code_from_tree(vertex.serialized_code.canon_tree)}\n\n'
-        for i, a_t in enumerate(vertex.serialized_code.anon_trees):
-            info += f'Anon code {i}:\n{get_code_from_tree(a_t.tree)}\n'
-        return info
+        info = [f'Canon code:\n{vertex.serialized_code.canon_code}\n\n']
+        info += [f'Anon code {i}:\n{a_t.code}\n'
+                 for i, a_t in enumerate(vertex.serialized_code.anon_trees)]
+        return ''.join(info)
 
     def __get_labels(self) -> str:
-        labels = ''
+        labels = []
         for vertex in self._graph.get_traversal():
             if self._graph.is_empty_vertex(vertex):
-                labels += f'{vertex.id} [label="Vertex {vertex.id}. Empty vertex"]\n'
+                labels.append(f'{vertex.id} [label="Vertex {vertex.id}. Empty vertex"]\n')
             else:
-                labels += f'{vertex.id} [label="Vertex {vertex.id}"]\n'
+                labels.append(f'{vertex.id} [label="Vertex {vertex.id}"]\n')
 
-        labels += f'{self._graph.end_vertex.id} [label="Vertex {self._graph.end_vertex.id}. End vertex"]\n'
-        return labels
+        labels.append(f'{self._graph.end_vertex.id} [label="Vertex {self._graph.end_vertex.id}. End vertex"]\n')
+        return ''.join(labels)
 
     def __create_vertices_content(self, folder_path: str) -> None:
         for vertex in self._graph.get_traversal():
@@ -47,11 +45,8 @@ class SolutionSpaceVisualizer:
         return ', '.join(list(map(str, vertices)))
 
     def __get_graph_structure(self) -> str:
-        structure = ''
-        for vertex in self._graph.get_traversal():
-            if vertex.children:
-                structure += f'{vertex.id} -> {self.__class__.__get_vertices_list(vertex.children)}\n'
-        return structure
+        return ''.join(f'{vertex.id} -> {self.__class__.__get_vertices_list(vertex.children)}\n'
+                       for vertex in self._graph.get_traversal() if vertex.children)
 
     # We want to get a graph representation in the dot format for the graphviz library
     #
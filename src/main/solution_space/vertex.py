@@ -22,7 +22,7 @@ class Vertex(IdCounter, PrettyString):
         self._children = []
         self._graph = graph
         self._serialized_code = None if code is None \
-            else SerializedCode(code, code_info, graph.graph_directory, graph.file_prefix)
+            else SerializedCode(code, code_info, graph.graph_directory, graph.file_prefix, graph.to_create_files)
         self._vertex_type = vertex_type
         super().__init__(to_store_items=True)
         self.__init_nodes_numbers_and_structure()
@@ -31,6 +31,7 @@ class Vertex(IdCounter, PrettyString):
         if self._serialized_code is not None:
             canon_nodes_number = AstStructure.get_nodes_number_in_ast(self._serialized_code.canon_tree)
             self._graph.canon_nodes_number_dict[canon_nodes_number].append(self.id)
+            self._graph.canon_tree_hash_dict[self._serialized_code.canon_tree_hash].append(self)
             for i, a_t in enumerate(self._serialized_code.anon_trees):
                 self._graph.anon_nodes_number_dict[a_t.nodes_number].append((self.id, i))
                 self._graph.anon_structure_dict[a_t.ast_structure].append(a_t.id)
@@ -58,6 +59,10 @@ class Vertex(IdCounter, PrettyString):
     def canon_tree(self) -> ast.AST:
         return self._serialized_code.canon_tree
 
+    @property
+    def canon_tree_hash(self) -> Optional[int]:
+        return self._serialized_code.canon_tree_hash
+
     @property
     def serialized_code(self) -> SerializedCode:
         return self._serialized_code
@@ -75,10 +80,12 @@ class Vertex(IdCounter, PrettyString):
     def add_child(self, child: Vertex) -> None:
         self.__add_child_to_list(child)
         child.__add_parent_to_list(self)
+        self._graph.reset_traversal()
 
     def add_parent(self, parent: Vertex) -> None:
         self.__add_parent_to_list(parent)
         parent.__add_child_to_list(self)
+        self._graph.reset_traversal()
 
     def get_dist(self, vertex: Vertex) -> int:
         return self._graph.dist.get_dist(self, vertex)
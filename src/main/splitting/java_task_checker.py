@@ -1,5 +1,6 @@
 # Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
 
+import re
 import logging
 from typing import List
 
@@ -16,6 +17,9 @@ from src.main.splitting.task_checker import ITaskChecker, check_call_safely, che
 
 log = logging.getLogger(consts.LOGGER_NAME)
 
+# The main class cannot be found without a class declaration, so there is no need to parse such sources
+CLASS_KEYWORD_REGEX = re.compile(r'\bclass\b')
+
 
 class JavaTaskChecker(ITaskChecker):
     def __init__(self):
@@ -40,6 +44,9 @@ class JavaTaskChecker(ITaskChecker):
 
     # https://github.com/c2nes/javalang
     def get_java_class_name(self, source_code: str) -> str:
+        if CLASS_KEYWORD_REGEX.search(source_code) is None:
+            log.info('Java source code does not have any class declarations')
+            return SOURCE_OBJECT_NAME
         try:
             tree = javalang.parse.parse(source_code)
             name = next(clazz.name for clazz in tree.types
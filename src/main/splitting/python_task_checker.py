@@ -1,15 +1,94 @@
 # Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
 
+import os
 import sys
+import json
+import queue
+import atexit
 import logging
-from typing import List
+from subprocess import Popen, PIPE
+from typing import List, Optional, Tuple
 
 from src.main.util import consts
-from src.main.util.consts import LANGUAGE
+from src.main.util.consts import LANGUAGE, TIMEOUT
+from src.main.splitting import python_test_worker
 from src.main.splitting.task_checker import ITaskChecker, check_call_safely, check_output_safely, SOURCE_OBJECT_NAME
 
 log = logging.getLogger(consts.LOGGER_NAME)
 
+# Interpreter startup takes more time than most of the tests, so the tests are run by long-lived workers, which fork
+# a new process for each test (see python_test_worker). Where fork is not available, each test is run in a new
+# interpreter as before
+IS_FORK_AVAILABLE = hasattr(os, 'fork')
+
+__idle_workers: queue.Queue = queue.Queue()
+
+
+def __start_worker() -> Popen:
+    return Popen([sys.executable, python_test_worker.__file__], stdin=PIPE, stdout=PIPE, universal_newlines=True,
+                 encoding=consts.UTF_ENCODING)
+
+
+@atexit.register
+def __stop_idle_workers() -> None:
+    while not __idle_workers.empty():
+        worker = __idle_workers.get_nowait()
+        worker.stdin.close()
+        worker.wait()
+
+
+# Returns the output (None if the script has failed) and is time out.
+# None is returned instead of them if the worker has crashed
+def run_in_worker(source_file: str, input: str) -> Optional[Tuple[Optional[str], bool]]:
+    try:
+        worker = __idle_workers.get_nowait()
+    except queue.Empty:
+        worker = __start_worker()
+    try:
+        worker.stdin.write(json.dumps({'source_file': source_file, 'input': input, 'timeout': TIMEOUT}) + '\n')
+        worker.stdin.flush()
+        response = json.loads(worker.stdout.readline())
+    # BrokenPipeError is raised if the worker has died, and ValueError if it has not written a response
+    except (OSError, ValueError) as e:
+        log.exception(e)
+        worker.kill()
+        worker.wait()
+        return None
+    __idle_workers.put(worker)
+    return response['output'], response['is_timeout']
+
+
+# Returns False if time is out, because it means that the output cannot be gotten and thus
+# the expected output doesn't match the real one (the same as check_output_safely does)
+def check_output_in_worker_safely(input: str, expected_output: str, source_file: str,
+                                  timeout_return: bool = False) -> bool:
+    result = run_in_worker(source_file, input)
+    if result is None:
+        log.info('Python test worker has crashed, so the test is run in a new interpreter')
+        return check_output_safely(input, expected_output, [sys.executable, source_file], timeout_return)
+
+    actual_out, is_timeout = result
+    if is_timeout:
+        log.info(f'Time is out for the test of the source file {source_file}')
+        return timeout_return
+    if actual_out is None:
+        log.info(f'Running of the source file {source_file} has failed')
+        return False
+    actual_out = actual_out.rstrip('\n')
+    log.info(f'Expected out: {expected_output}, actual out: {actual_out}')
+    return actual_out == expected_output
+
+
+# The source is read as bytes to decode it in the same way as the interpreter does
+def is_source_file_compiled(source_file: str) -> bool:
+    try:
+        with open(source_file, 'rb') as f:
+            compile(f.read(), source_file, 'exec')
+        return True
+    except (SyntaxError, ValueError) as e:
+        log.exception(e)
+        return False
+
 
 class PythonTaskChecker(ITaskChecker):
 
@@ -30,12 +109,15 @@ class PythonTaskChecker(ITaskChecker):
     def create_source_file(self, source_code: str) -> str:
         return self.create_source_file_with_name(source_code, SOURCE_OBJECT_NAME)
 
+    # The source file is compiled in the current process, which is much faster than running a new interpreter,
+    # and mypy is run only for the compiled files
     def is_source_file_correct(self, source_file: str) -> bool:
-        is_correct = check_call_safely(['mypy', source_file]) and check_call_safely([sys.executable, source_file],
-                                                                                    shell=True)
+        is_correct = is_source_file_compiled(source_file) and check_call_safely(['mypy', source_file])
         log.info(f'Source code is correct: {is_correct}')
         return is_correct
 
     def run_test(self, input: str, expected_output: str, source_file: str) -> bool:
+        if IS_FORK_AVAILABLE:
+            return check_output_in_worker_safely(input, expected_output, source_file)
         args = [sys.executable, source_file]
         return check_output_safely(input, expected_output, args)
@@ -0,0 +1,123 @@
+# Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
+
+import io
+import os
+import sys
+import json
+import time
+import runpy
+import signal
+import selectors
+import traceback
+from typing import Optional, Tuple
+
+'''
+A long-lived worker for running python tests. Starting of a new interpreter takes more time than running of most
+tests, so the worker is started once and runs each test in a process forked from itself.
+
+The worker reads requests from stdin and writes responses to stdout, one json object per line:
+>>> request: {"source_file": "path/to/source.py", "input": "1\\n2", "timeout": 5}
+>>> response: {"output": "3\\n", "is_timeout": false}
+The output is null if the script has failed, as a non-zero exit code of the interpreter would mean.
+
+Only the standard library is imported here to make the worker start quickly.
+'''
+
+READ_CHUNK_SIZE = 65536
+ENCODING = 'utf-8'
+
+
+def __run_script_in_child(source_file: str, in_fd: int, out_fd: int) -> None:
+    os.dup2(in_fd, sys.__stdin__.fileno())
+    os.dup2(out_fd, sys.__stdout__.fileno())
+    os.close(in_fd)
+    os.close(out_fd)
+    sys.stdin = io.TextIOWrapper(io.FileIO(sys.__stdin__.fileno(), 'r', closefd=False), encoding=ENCODING)
+    sys.stdout = io.TextIOWrapper(io.FileIO(sys.__stdout__.fileno(), 'w', closefd=False), encoding=ENCODING)
+    sys.argv = [source_file]
+    code = 0
+    try:
+        runpy.run_path(source_file, run_name='__main__')
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else int(e.code is not None)
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+        except BaseException:
+            code = code or 1
+    os._exit(code)
+
+
+# Writes input to the child and reads its output until the child closes stdout or time is out.
+# The child gets EOF after all input is written, so in_fd is always closed here
+def __communicate(in_fd: int, out_fd: int, input: bytes, timeout: float) -> Tuple[bytes, bool]:
+    output = []
+    deadline = time.monotonic() + timeout
+    is_in_fd_closed = False
+    try:
+        with selectors.DefaultSelector() as selector:
+            os.set_blocking(in_fd, False)
+            selector.register(in_fd, selectors.EVENT_WRITE)
+            selector.register(out_fd, selectors.EVENT_READ)
+            while len(selector.get_map()) > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return b''.join(output), True
+                for key, _ in selector.select(remaining):
+                    if key.fd == in_fd:
+                        try:
+                            input = input[os.write(in_fd, input):]
+                        except BrokenPipeError:
+                            input = b''
+                        if not input:
+                            selector.unregister(in_fd)
+                            os.close(in_fd)
+                            is_in_fd_closed = True
+                    else:
+                        chunk = os.read(out_fd, READ_CHUNK_SIZE)
+                        if chunk:
+                            output.append(chunk)
+                        else:
+                            selector.unregister(out_fd)
+    finally:
+        if not is_in_fd_closed:
+            os.close(in_fd)
+    return b''.join(output), False
+
+
+def run_script(source_file: str, input: str, timeout: float) -> Tuple[Optional[str], bool]:
+    child_in_fd, in_fd = os.pipe()
+    out_fd, child_out_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(in_fd)
+        os.close(out_fd)
+        __run_script_in_child(source_file, child_in_fd, child_out_fd)
+    os.close(child_in_fd)
+    os.close(child_out_fd)
+    try:
+        output, is_timeout = __communicate(in_fd, out_fd, input.encode(ENCODING), timeout)
+    finally:
+        os.close(out_fd)
+    if is_timeout:
+        os.kill(pid, signal.SIGKILL)
+    _, status = os.waitpid(pid, 0)
+    if is_timeout or status != 0:
+        return None, is_timeout
+    # Translate newlines in the same way as universal_newlines mode of subprocess does
+    return output.decode(ENCODING, errors='replace').replace('\r\n', '\n').replace('\r', '\n'), False
+
+
+def main() -> None:
+    for request_line in sys.stdin:
+        request = json.loads(request_line)
+        output, is_timeout = run_script(request['source_file'], request['input'], request['timeout'])
+        sys.stdout.write(json.dumps({'output': output, 'is_timeout': is_timeout}) + '\n')
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
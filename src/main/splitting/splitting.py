@@ -1,9 +1,11 @@
 # Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
 
 import ast
+import json
 import logging
-from typing import List, Union
+from typing import Dict, List, Union
 
+import numpy as np
 import pandas as pd
 
 from src.main.util import consts
@@ -18,10 +20,17 @@ log = logging.getLogger(consts.LOGGER_NAME)
 CHOSEN_TASK = consts.CODE_TRACKER_COLUMN.CHOSEN_TASK.value
 TASK_STATUS = consts.CODE_TRACKER_COLUMN.TASK_STATUS.value
 TESTS_RESULTS = consts.CODE_TRACKER_COLUMN.TESTS_RESULTS.value
+# Tests results are unpacked for each row, so the list of tasks is built once
+TASKS = consts.TASK.tasks()
 
 
+# Tests results are lists of numbers, so they are parsed by json, which is much faster than ast.literal_eval.
+# Other literals, which are not json (for example, with single quotes), are still parsed by ast.literal_eval
 def unpack_tests_results(tests_results: str, tasks: List[TASK]) -> List[float]:
-    tests_results = ast.literal_eval(tests_results)
+    try:
+        tests_results = json.loads(tests_results)
+    except ValueError:
+        tests_results = ast.literal_eval(tests_results)
     if len(tests_results) != len(tasks):
         log_and_raise_error(f'Cannot identify tasks because of'
                             f' unexpected tests_results length: {len(tests_results)}', log)
@@ -29,9 +38,8 @@ def unpack_tests_results(tests_results: str, tasks: List[TASK]) -> List[float]:
 
 
 def get_solved_task(tests_results: str) -> Union[TASK, consts.DEFAULT_VALUE]:
-    tasks = consts.TASK.tasks()
-    tests_results = unpack_tests_results(tests_results, tasks)
-    solved_tasks = [t for i, t in enumerate(tasks) if tests_results[i] == 1]
+    tests_results = unpack_tests_results(tests_results, TASKS)
+    solved_tasks = [t for i, t in enumerate(TASKS) if tests_results[i] == 1]
     if len(solved_tasks) == 0:
         log.info(f'No solved tasks found, tests results: {tests_results}')
         return consts.DEFAULT_VALUE.TASK
@@ -55,20 +63,75 @@ def find_splits(ct_df: pd.DataFrame) -> pd.DataFrame:
     return ct_df
 
 
+def __is_categorical(df: pd.DataFrame) -> bool:
+    return isinstance(df[CHOSEN_TASK].dtype, pd.CategoricalDtype)
+
+
+# If CHOSEN_TASK is categorical and the task is not one of its categories, there are no rows with the task,
+# so the column does not need to be scanned
+def __is_task_absent(df: pd.DataFrame, task: consts.TASK) -> bool:
+    return __is_categorical(df) and task.value not in df[CHOSEN_TASK].cat.categories
+
+
+# If CHOSEN_TASK is categorical, the codes are compared instead of the strings.
+# The task should be one of the categories in this case (see __is_task_absent)
+def __get_task_mask(df: pd.DataFrame, task: consts.TASK) -> np.ndarray:
+    chosen_tasks = df[CHOSEN_TASK]
+    if not __is_categorical(df):
+        return (chosen_tasks == task.value).to_numpy()
+    return chosen_tasks.cat.codes.to_numpy() == chosen_tasks.cat.categories.get_loc(task.value)
+
+
+# An index is the start index for some task, if CHOSEN_TASK at this index equals task, but at index-1 -- doesn't,
+# So we should compare the mask with the shifted one. The mask is shifted as a numpy array to avoid shifting
+# and aligning of pandas series. For booleans, is_task > is_prev_task means is_task and not is_prev_task,
+# so the starts are found by one comparison written into one array without any temporary ones
+def __find_task_start_indices(df: pd.DataFrame, is_task: np.ndarray) -> List[int]:
+    is_start = np.empty_like(is_task)
+    is_start[:1] = is_task[:1]
+    np.greater(is_task[1:], is_task[:-1], out=is_start[1:])
+    return df.index[is_start].tolist()
+
+
 # To find start index for each group of rows with the same task
 def find_task_start_indices(df: pd.DataFrame, task: consts.TASK) -> List[int]:
-    # An index is the start index for some task, if CHOSEN_TASK at this index equals task, but at index-1 -- doesn't,
-    # So we should compare it with shifted dataframe
-    return df.index[(df[CHOSEN_TASK] == task.value) & (df[CHOSEN_TASK].shift(1) != task.value)].tolist()
+    if __is_task_absent(df, task):
+        return []
+    return __find_task_start_indices(df, __get_task_mask(df, task))
 
 
 def find_task_dfs(df: pd.DataFrame, task: consts.TASK) -> List[pd.DataFrame]:
-    start_indices = find_task_start_indices(df, task)
+    if __is_task_absent(df, task):
+        return []
+    # The same mask is used for finding start indices and rows of the task, so the column is compared only once
+    is_task = __get_task_mask(df, task)
+    start_indices = __find_task_start_indices(df, is_task)
     split_indices = zip(start_indices, start_indices[1:] + [df.shape[0]])
     # Split df into several dfs with only one group of rows with the same task
-    split_dfs = [df[start_index:end_index] for start_index, end_index in split_indices]
-    # In each df find this group of rows with the same task
-    return [split_df[split_df[CHOSEN_TASK] == task.value] for split_df in split_dfs]
+    # and in each df find this group of rows with the same task
+    return [df[start_index:end_index][is_task[start_index:end_index]]
+            for start_index, end_index in split_indices]
+
+
+# Finds task dfs for all tasks at once (the same as find_task_dfs for each task does), but CHOSEN_TASK is scanned
+# only once. Each task df is a group of consecutive rows with the same task, so the groups are found by comparing
+# each task code with the previous one
+def find_all_task_dfs(df: pd.DataFrame) -> Dict[TASK, List[pd.DataFrame]]:
+    codes, chosen_tasks = pd.factorize(df[CHOSEN_TASK])
+    is_start = np.empty(codes.shape[0], dtype=bool)
+    is_start[:1] = True
+    np.not_equal(codes[1:], codes[:-1], out=is_start[1:])
+    start_indices = np.flatnonzero(is_start).tolist()
+
+    task_by_value = {task.value: task for task in TASK}
+    task_dfs: Dict[TASK, List[pd.DataFrame]] = {task: [] for task in TASK}
+    for start_index, end_index in zip(start_indices, start_indices[1:] + [codes.shape[0]]):
+        # Code -1 means that the task is nan
+        code = codes[start_index]
+        task = task_by_value.get(chosen_tasks[code]) if code != -1 else None
+        if task is not None:
+            task_dfs[task].append(df.iloc[start_index:end_index])
+    return task_dfs
 
 
 # 2.0 version with a different task_df extraction
@@ -80,12 +143,17 @@ def split_tasks_into_separate_files(path: str, output_directory_suffix: str = 's
         ct_df = pd.read_csv(file, encoding=consts.ISO_ENCODING)
         language = get_ct_language(ct_df)
         split_df = find_splits(ct_df)
+        # CHOSEN_TASK is factorized to find task dfs, which is faster for categorical codes than for strings
+        split_df[CHOSEN_TASK] = split_df[CHOSEN_TASK].astype('category')
+        all_task_dfs = find_all_task_dfs(split_df)
+        # The name parts depend only on the file, so they are got once for all task dfs
+        file_name = get_parent_folder_name(file) + '_' + get_name_from_path(file, False)
+        extension = get_extension_from_file(file).value
         for task in consts.TASK:
-            task_dfs = find_task_dfs(split_df, task)
+            task_dfs = all_task_dfs[task]
             for i, task_df in enumerate(task_dfs):
                 if not task_df.empty:
                     # Change name to get something like pies/ati_207_test_5894859_i.csv
-                    filename = task.value + '/' + get_parent_folder_name(file) + '_' + get_name_from_path(file, False) \
-                               + f'_{i}' + get_extension_from_file(file).value
+                    filename = f'{task.value}/{file_name}_{i}{extension}'
                     write_based_on_language(output_directory, filename, task_df, language)
     return output_directory
@@ -2,7 +2,9 @@
 
 import os
 import logging
+from functools import lru_cache
 from abc import ABCMeta, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, Executor, Future
 from typing import List, Tuple, Dict, Optional
 from subprocess import check_output, CalledProcessError, check_call, TimeoutExpired
 
@@ -53,6 +55,17 @@ def check_call_safely(call_args: List[str], timeout: Optional[int] = TIMEOUT, ti
         return timeout_return
 
 
+# The same in and out files are read for each checked fragment, so their content is cached
+# until the files are changed
+@lru_cache(maxsize=8192)
+def __get_test_file_content(file: str, mtime_ns: int) -> str:
+    return get_content_from_file(file)
+
+
+def get_test_file_content(file: str) -> str:
+    return __get_test_file_content(file, os.stat(file).st_mtime_ns)
+
+
 def remove_compiled_files() -> None:
     remove_directory(SOURCE_FOLDER)
     create_directory(SOURCE_FOLDER)
@@ -123,22 +136,32 @@ class ITaskChecker(object, metaclass=ABCMeta):
 
         return need_to_run_tests, test_results, rate
 
-    def check_task(self, task: TASK, in_and_out_files_dict:  FilesDict, source_file: str,
-                   stop_after_first_false = True) -> float:
-        log.info(f'Start checking task {task.value}')
+    def __run_task_test(self, task: TASK, in_file: str, out_file: str, source_file: str) -> bool:
+        is_passed = self.run_test(get_test_file_content(in_file), get_test_file_content(out_file), source_file)
+        log.info(f'Test {in_file} for task {task.value} is passed: {str(is_passed)}')
+        return is_passed
+
+    # Tests are independent, so all of them are submitted to the executor at once
+    def __submit_task_tests(self, task: TASK, in_and_out_files_dict: FilesDict, source_file: str,
+                            executor: Executor) -> List[Future]:
         in_and_out_files = in_and_out_files_dict.get(task)
         if not in_and_out_files:
             log_and_raise_error(f'Task data for the {task.value} does not exist', log)
+        return [executor.submit(self.__run_task_test, task, in_file, out_file, source_file)
+                for in_file, out_file in in_and_out_files]
 
-        counted_tests, passed_tests = len(in_and_out_files), 0
-        for in_file, out_file in in_and_out_files:
-            is_passed = self.run_test(get_content_from_file(in_file), get_content_from_file(out_file), source_file)
-            log.info(f'Test {in_file} for task {task.value} is passed: {str(is_passed)}')
-            if is_passed:
+    # Results are handled in the tests order, so the rate is the same as in the case of running tests one by one
+    @staticmethod
+    def __get_task_rate(task: TASK, tests_futures: List[Future], stop_after_first_false: bool = True) -> float:
+        counted_tests, passed_tests = len(tests_futures), 0
+        for i, future in enumerate(tests_futures):
+            if future.result():
                 passed_tests += 1
             elif stop_after_first_false:
                 # keep existing rate, even if it's not 0, to save the information about partly passed tests
                 log.info('Stop after first false')
+                for next_future in tests_futures[i + 1:]:
+                    next_future.cancel()
                 break
 
         rate = passed_tests / counted_tests
@@ -157,8 +180,14 @@ class ITaskChecker(object, metaclass=ABCMeta):
             log.info(f'Finish checking tasks, test results: {str(test_results)}')
             return test_results
 
-        for task in tasks:
-            test_results.append(self.check_task(task, in_and_out_files_dict, source_file, stop_after_first_false))
+        # Each test is run in a separate subprocess, so threads are enough to run them in parallel
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            tasks_futures = []
+            for task in tasks:
+                log.info(f'Start checking task {task.value}')
+                tasks_futures.append(self.__submit_task_tests(task, in_and_out_files_dict, source_file, executor))
+            for task, tests_futures in zip(tasks, tasks_futures):
+                test_results.append(self.__get_task_rate(task, tests_futures, stop_after_first_false))
 
         log.info(f'Finish checking tasks, test results: {str(test_results)}')
         return test_results
@@ -18,23 +18,33 @@ from src.main.preprocessing.code_tracker_handler import get_ct_language
 from src.main.splitting.task_checker import TASKS_TESTS_PATH, FilesDict
 from src.main.splitting.undefined_task_checker import UndefinedTaskChecker
 from src.main.util.file_util import get_all_file_system_items, ct_file_condition, get_output_directory, \
-    write_based_on_language, get_file_and_parent_folder_names, pair_in_and_out_files, match_condition
+    write_based_on_language, get_file_and_parent_folder_names, get_name_from_path, pair_in_and_out_files
 
 log = logging.getLogger(consts.LOGGER_NAME)
 
 FRAGMENT = consts.CODE_TRACKER_COLUMN.FRAGMENT.value
 TESTS_RESULTS = consts.CODE_TRACKER_COLUMN.TESTS_RESULTS.value
+TESTS_FILE_REGEX = re.compile(r'(in|out)_(\d+)\.txt')
+IN_FILE_TYPE = 'in'
 
 
 def create_in_and_out_dict(tasks: List[TASK]) -> FilesDict:
     in_and_out_files_dict = {}
     for task in tasks:
         root = os.path.join(TASKS_TESTS_PATH, task.value)
-        in_files = get_all_file_system_items(root, match_condition(r'in_\d+.txt'))
-        out_files = get_all_file_system_items(root, match_condition(r'out_\d+.txt'))
-        if len(out_files) != len(in_files):
+        # Get all tests files at once and join in and out files by their folders and numbers
+        # to walk through the root only once
+        files = get_all_file_system_items(root, TESTS_FILE_REGEX.fullmatch)
+        in_files, out_files_dict = [], {}
+        for file in files:
+            file_type, number = TESTS_FILE_REGEX.fullmatch(get_name_from_path(file)).groups()
+            if file_type == IN_FILE_TYPE:
+                in_files.append((file, (os.path.dirname(file), number)))
+            else:
+                out_files_dict[(os.path.dirname(file), number)] = file
+        if len(out_files_dict) != len(in_files):
             log_and_raise_error('Length of out files list does not equal in files list', log)
-        in_and_out_files_dict[task] = pair_in_and_out_files(in_files, out_files)
+        in_and_out_files_dict[task] = pair_in_and_out_files(in_files, out_files_dict)
     return in_and_out_files_dict
 
 
@@ -4,13 +4,15 @@ import os
 import re
 import pickle
 import shutil
-from typing import Callable, Any, List, Tuple, Type
+import logging
+from typing import Callable, Any, List, Tuple, Type, Dict, Hashable
 
 import pandas as pd
 
+from src.main.util.log_util import log_and_raise_error
 from src.main.util.strings_util import contains_any_of_substrings
 from src.main.util.consts import ACTIVITY_TRACKER_FILE_NAME, FILE_SYSTEM_ITEM, ATI_DATA_FOLDER, \
-    DI_DATA_FOLDER, ISO_ENCODING, LANGUAGE, UTF_ENCODING, EXTENSION
+    DI_DATA_FOLDER, ISO_ENCODING, LANGUAGE, UTF_ENCODING, EXTENSION, LOGGER_NAME
 
 '''
 To understand correctly these functions' behavior you can see examples in a corresponding test folder.
@@ -26,6 +28,8 @@ If extension is passed without any dots, a dot will be added (for example, see c
 >>> EXAMPLE: parent_folder for both 'path/data/file' and 'path/data/file/' is 'path/data'
 '''
 
+log = logging.getLogger(LOGGER_NAME)
+
 ItemCondition = Callable[[str], bool]
 
 
@@ -87,11 +91,10 @@ def add_suffix_to_file(file: str, suffix: str) -> str:
 
 # If need_to_rename, it works only for real files because os.rename is called
 def change_extension_to(file: str, new_extension: EXTENSION, need_to_rename: bool = False) -> str:
-    new_extension = add_dot_to_not_empty_extension(new_extension)
-    base, _ = os.path.splitext(file)
+    new_file = os.path.splitext(file)[0] + add_dot_to_not_empty_extension(new_extension)
     if need_to_rename:
-        os.rename(file, base + new_extension)
-    return base + new_extension
+        os.rename(file, new_file)
+    return new_file
 
 
 def get_parent_folder(path: str, to_add_slash: bool = False) -> str:
@@ -192,13 +195,35 @@ def language_item_condition(name: str) -> bool:
 def get_all_file_system_items(root: str, item_condition: ItemCondition = all_items_condition,
                               item_type: FILE_SYSTEM_ITEM = FILE_SYSTEM_ITEM.FILE) -> List[str]:
     items = []
-    for fs_tuple in os.walk(root):
-        for item in fs_tuple[item_type.value]:
-            if item_condition(item):
-                items.append(os.path.join(fs_tuple[FILE_SYSTEM_ITEM.PATH.value], item))
+    __add_file_system_items(root, item_condition, item_type, items)
     return items
 
 
+# Walks the directory tree in the same order as os.walk does, but uses the entries' paths and types from
+# os.scandir directly instead of joining the names and checking them again
+def __add_file_system_items(directory: str, item_condition: ItemCondition, item_type: FILE_SYSTEM_ITEM,
+                            items: List[str]) -> None:
+    subdirs = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    subdirs.append(entry)
+                if is_dir == (item_type == FILE_SYSTEM_ITEM.SUBDIR) and item_condition(entry.name):
+                    items.append(entry.path)
+    # os.walk skips directories that cannot be listed, so they are skipped here too
+    except OSError:
+        return
+    for subdir in subdirs:
+        # os.walk does not follow symlinks to directories by default
+        if not subdir.is_symlink():
+            __add_file_system_items(subdir.path, item_condition, item_type, items)
+
+
 def extension_file_condition(extension: EXTENSION) -> ItemCondition:
     def has_this_extension(name: str) -> bool:
         return get_extension_from_file(name) == extension
@@ -216,9 +241,12 @@ def contains_substrings_condition(substrings: List[str]) -> ItemCondition:
     return contains_these_substrings
 
 
+# The condition is checked for each item while walking, so the regex is compiled once
 def match_condition(regex: str) -> ItemCondition:
+    pattern = re.compile(regex)
+
     def does_name_match(name: str) -> bool:
-        return re.fullmatch(regex, name) is not None
+        return pattern.fullmatch(name) is not None
     return does_name_match
 
 
@@ -269,11 +297,14 @@ def write_based_on_language(output_directory: str, file: str, df: pd.DataFrame,
     create_folder_and_write_df_to_file(folder_to_write, file_to_write, df)
 
 
-def pair_in_and_out_files(in_files: list, out_files: list) -> List[Tuple[str, str]]:
+# In and out files are joined by their keys (for example, by numbers of tests), so the out file for each in file
+# is found in the dict instead of building its name
+def pair_in_and_out_files(in_files: List[Tuple[str, Hashable]],
+                          out_files_dict: Dict[Hashable, str]) -> List[Tuple[str, str]]:
     pairs = []
-    for in_file in in_files:
-        out_file = re.sub(r'in(?=[^in]*$)', 'out', in_file)
-        if out_file not in out_files:
-            raise ValueError(f'List of out files does not contain a file for {in_file}')
+    for in_file, key in in_files:
+        out_file = out_files_dict.get(key)
+        if out_file is None:
+            log_and_raise_error(f'List of out files does not contain a file for {in_file}', log)
         pairs.append((in_file, out_file))
     return pairs
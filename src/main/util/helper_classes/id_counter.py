@@ -16,10 +16,11 @@ class IdCounter:
     _last_id = 0
 
     def __init__(self, to_store_items: bool = False):
-        self._id = self._instances[self.__class__.__name__]
+        class_name = self.__class__.__name__
+        self._id = self._instances[class_name]
         if to_store_items:
-            self._id_item_dict_by_class[self.__class__.__name__][self._id] = self
-        self._instances[self.__class__.__name__] += 1
+            self._id_item_dict_by_class[class_name][self._id] = self
+        self._instances[class_name] = self._id + 1
 
     @property
     def id(self) -> int:
@@ -1,14 +1,18 @@
 # Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
 
+from typing import Dict
+
 from src.main.util import consts
 
+# Each language has only one extension, so the reversed dict can be built once instead of searching in the original one
+LANGUAGE_TO_EXTENSION_DICT: Dict[consts.LANGUAGE, consts.EXTENSION] = {
+    language: extension for extension, language in consts.EXTENSION_TO_LANGUAGE_DICT.items()
+}
+
 
 def get_language_by_extension(extension: consts.EXTENSION) -> consts.LANGUAGE:
     return consts.EXTENSION_TO_LANGUAGE_DICT.get(extension, consts.LANGUAGE.UNDEFINED)
 
 
 def get_extension_by_language(language: consts.LANGUAGE) -> consts.EXTENSION:
-    for extension, cur_language in consts.EXTENSION_TO_LANGUAGE_DICT.items():
-        if cur_language == language:
-            return extension
-    return consts.EXTENSION.EMPTY
+    return LANGUAGE_TO_EXTENSION_DICT.get(language, consts.EXTENSION.EMPTY)
@@ -2,7 +2,7 @@
 
 import sys
 import logging
-from typing import Type
+from typing import Type, Optional
 from logging import Logger
 
 from src.main.util.consts import LOGGER_FORMAT, LOGGER_FILE, LOGGER_TEST_FILE
@@ -21,3 +21,15 @@ def configure_logger(in_test_mode: bool = False, to_delete_previous_logs: bool =
 
 def add_console_stream(log: Logger) -> None:
     log.addHandler(logging.StreamHandler(sys.stdout))
+
+
+def get_log_file() -> Optional[str]:
+    file_handlers = [h for h in logging.getLogger().handlers if isinstance(h, logging.FileHandler)]
+    return file_handlers[0].baseFilename if file_handlers else None
+
+
+# Processes of a pool can be started without the logging configuration of the main process (for example, by spawn),
+# so they write to the same log file in the same format. If the configuration is inherited, nothing is changed
+def configure_pool_process_logger(log_file: Optional[str]) -> None:
+    if log_file is not None:
+        logging.basicConfig(filename=log_file, format=LOGGER_FORMAT, level=logging.INFO, filemode='a')
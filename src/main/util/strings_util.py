@@ -11,10 +11,7 @@ def add_symbol_to_begin(string: str, symbol: str) -> str:
 
 
 def contains_any_of_substrings(string: str, substrings: List[str]) -> bool:
-    for substring in substrings:
-        if substring in string:
-            return True
-    return False
+    return any(substring in string for substring in substrings)
 
 
 def convert_camel_case_to_snake_case(string: str) -> str:
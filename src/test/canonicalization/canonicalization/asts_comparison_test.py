@@ -6,7 +6,8 @@ from typing import List
 import pytest
 
 from src.test.test_config import to_skip, TEST_LEVEL
-from src.main.canonicalization.canonicalization import are_asts_equal, get_code_from_tree
+from src.main.canonicalization.canonicalization import are_asts_equal, get_code_from_tree, get_ast_hash, \
+    are_hashed_asts_equal, get_possibly_equal_indexes
 
 empty_source = ''
 
@@ -144,3 +145,25 @@ class TestASTsComparison:
             for j in range(i + 1, len(asts)):
                 assert are_asts_equal(asts[i], asts[j]), \
                     f'\nast {i}: \n{get_code_from_tree(asts[i])} \n\n\nast {j}: {get_code_from_tree(asts[j])}'
+
+    def test_equal_asts_hashes(self) -> None:
+        asts = get_asts_from_sources(equal_sources)
+        hashes = [get_ast_hash(ast) for ast in asts]
+        assert None not in hashes
+        assert len(set(hashes)) == 1
+
+    def test_hashed_asts_comparison(self) -> None:
+        asts = get_asts_from_sources(sources_with_empty)
+        for i in range(len(asts)):
+            for j in range(len(asts)):
+                hash_i, hash_j = get_ast_hash(asts[i]), get_ast_hash(asts[j])
+                assert are_hashed_asts_equal(asts[i], hash_i, asts[j], hash_j) == are_asts_equal(asts[i], asts[j])
+
+    # A tree with the None hash can be equal to trees with any hashes, so it is checked for any hash,
+    # and all trees are checked for the None hash
+    def test_possibly_equal_indexes(self) -> None:
+        indexes_by_hash = {1: [0, 3], 2: [1], None: [2]}
+        assert [0, 2, 3] == list(get_possibly_equal_indexes(indexes_by_hash, 1))
+        assert [3, 2, 0] == list(get_possibly_equal_indexes(indexes_by_hash, 1, to_reverse=True))
+        assert [0, 1, 2, 3] == list(get_possibly_equal_indexes(indexes_by_hash, None))
+        assert [2] == list(get_possibly_equal_indexes(indexes_by_hash, 3))
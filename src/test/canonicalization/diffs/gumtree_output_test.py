@@ -0,0 +1,54 @@
+# Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
+
+import os
+import stat
+
+import pytest
+
+from src.main.util import consts
+from src.test.test_config import to_skip, TEST_LEVEL
+from src.main.canonicalization.diffs.gumtree import get_gumtree_output
+
+# The output should depend only on the files, so instead of GumTreeDiff a script, which prints the src file, is run
+PRINTING_SRC_SCRIPT = '#!/bin/sh\ncat "$2"\n'
+
+
+def write_file(file: str, content: str) -> None:
+    with open(file, 'w') as f:
+        f.write(content)
+
+
+@pytest.mark.skipif(to_skip(current_module_level=TEST_LEVEL.CANONICALIZATION),
+                    reason=TEST_LEVEL.CANONICALIZATION.value)
+class TestGumTreeOutput:
+
+    @staticmethod
+    @pytest.fixture(scope='function')
+    def printing_src_gumtree(tmp_path: str, monkeypatch) -> None:
+        script = os.path.join(tmp_path, 'gumtree')
+        write_file(script, PRINTING_SRC_SCRIPT)
+        os.chmod(script, os.stat(script).st_mode | stat.S_IEXEC)
+        monkeypatch.setattr(consts, 'GUMTREE_PATH', script)
+
+    # A file rewritten at the same path can have the same modification time and size, so the cached output of the
+    # old file should not be returned for the new one
+    def test_rewritten_file(self, tmp_path: str, printing_src_gumtree: None) -> None:
+        src_file, dst_file = os.path.join(tmp_path, 'src.py'), os.path.join(tmp_path, 'dst.py')
+        write_file(dst_file, 'a = 5')
+        write_file(src_file, 'a = 5')
+        old_stat = os.stat(src_file)
+        assert get_gumtree_output('diffn', src_file, dst_file) == 'a = 5'
+
+        write_file(src_file, 'a = 6')
+        os.utime(src_file, ns=(old_stat.st_atime_ns, old_stat.st_mtime_ns))
+        assert get_gumtree_output('diffn', src_file, dst_file) == 'a = 6'
+
+    def test_same_file(self, tmp_path: str, printing_src_gumtree: None) -> None:
+        src_file, dst_file = os.path.join(tmp_path, 'src.py'), os.path.join(tmp_path, 'dst.py')
+        write_file(dst_file, 'a = 5')
+        write_file(src_file, 'a = 5')
+        assert get_gumtree_output('diffn', src_file, dst_file) == 'a = 5'
+
+        # The cached output is returned, even if GumTreeDiff is not available anymore
+        os.remove(consts.GUMTREE_PATH)
+        assert get_gumtree_output('diffn', src_file, dst_file) == 'a = 5'
@@ -3,12 +3,11 @@
 import os
 import logging
 from enum import Enum
-from typing import Callable, Union, Tuple, List, Optional
+from typing import Callable, Union, Tuple, List, Optional, Dict
 
-from src.main.util.consts import LOGGER_NAME, ROOT_DIR, TASK
+from src.main.util.consts import LOGGER_NAME, ROOT_DIR, TASK, EXTENSION
 from src.main.canonicalization.canonicalization import get_cleaned_code
-from src.main.util.file_util import get_all_file_system_items, pair_in_and_out_files, get_content_from_file, \
-    match_condition
+from src.main.util.file_util import get_content_from_file, pair_in_and_out_files
 from src.main.util.log_util import log_and_raise_error
 
 log = logging.getLogger(LOGGER_NAME)
@@ -32,31 +31,51 @@ class DIFF_HANDLER_TEST_TYPES(Enum):
     STUDENTS_CODE = 'students_code'
 
 
+# Test files are in the root folder without subfolders, and their names are in_<number>.py and out_<number>.py,
+# so they are found by one scandir of the root and string checks instead of walking with a regex
+def __get_in_files_and_out_files_dict(root: str) -> Tuple[List[Tuple[str, str]], Dict[str, str]]:
+    in_files, out_files_dict = [], {}
+    in_prefix = CANONICALIZATION_TESTS.INPUT_FILE_NAME.value + '_'
+    out_prefix = CANONICALIZATION_TESTS.OUTPUT_FILE_NAME.value + '_'
+    extension = EXTENSION.PY.value
+    with os.scandir(root) as entries:
+        for entry in entries:
+            name = entry.name
+            if not name.endswith(extension) or not entry.is_file():
+                continue
+            if name.startswith(in_prefix):
+                number = name[len(in_prefix):-len(extension)]
+                if number.isdigit():
+                    in_files.append((entry.path, number))
+            elif name.startswith(out_prefix):
+                number = name[len(out_prefix):-len(extension)]
+                if number.isdigit():
+                    out_files_dict[number] = entry.path
+    return in_files, out_files_dict
+
+
 def get_test_in_and_out_files(test_type: Union[CANONICALIZATION_TESTS_TYPES, DIFF_HANDLER_TEST_TYPES],
                               task: TASK = None, additional_folder_name: str = '') -> List[Tuple[str, str]]:
     root = os.path.join(CANONICALIZATION_TESTS.DATA_PATH.value, additional_folder_name, test_type.value)
     if task is not None:
         root = os.path.join(root, task.value)
-    in_files = get_all_file_system_items(root, match_condition(r'in_\d+.py'))
-    out_files = get_all_file_system_items(root, match_condition(r'out_\d+.py'))
-    if len(out_files) != len(in_files):
+    in_files, out_files_dict = __get_in_files_and_out_files_dict(root)
+    if len(out_files_dict) != len(in_files):
         log_and_raise_error('Length of out files list does not equal in files list', log)
     if len(in_files) == 0:
         log_and_raise_error(f'Number of test files is zero! Root for files is {root}', log)
-    return pair_in_and_out_files(in_files, out_files)
+    return pair_in_and_out_files(in_files, out_files_dict)
 
 
 def run_test(test_type:  Union[CANONICALIZATION_TESTS_TYPES, DIFF_HANDLER_TEST_TYPES],
              get_code: Callable[[str], str], task: Optional[TASK] = None, additional_folder_name: str = '',
              to_clear_out: bool = False) -> None:
     files = get_test_in_and_out_files(test_type, task, additional_folder_name=additional_folder_name)
-    count_tests = 1
-    for source_code, expected_code_path in files:
-        log.info(f'Test number {count_tests}\nSource code is: {source_code}\n')
+    for count_tests, (source_code, expected_code_path) in enumerate(files, 1):
+        log.info('Test number %s\nSource code is: %s\n', count_tests, source_code)
         actual_code = get_code(source_code)
         expected_code = get_content_from_file(expected_code_path)
         if to_clear_out:
             expected_code = get_cleaned_code(expected_code).rstrip('\n')
-        log.info(f'Actual code is:\n{actual_code}\nExpected code is:\n{expected_code}\n')
+        log.info('Actual code is:\n%s\nExpected code is:\n%s\n', actual_code, expected_code)
         assert expected_code == actual_code
-        count_tests += 1
@@ -0,0 +1,45 @@
+# Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
+
+import os
+import shutil
+from typing import List
+
+import pytest
+
+from src.main.util import consts
+from src.test.test_config import to_skip, TEST_LEVEL
+from src.main.preprocessing.preprocessing import preprocess_data
+
+DATA_FOLDER = os.path.join(consts.TEST_DATA_PATH, 'cli', 'preprocessing')
+
+
+def get_relative_files(folder: str) -> List[str]:
+    return sorted(os.path.relpath(os.path.join(root, file), folder)
+                  for root, _, files in os.walk(folder) for file in files)
+
+
+def read_file(file: str) -> str:
+    with open(file, encoding=consts.ISO_ENCODING) as f:
+        return f.read()
+
+
+# Each run writes the result near the data, so the result is moved to get the same output folder in the next run
+def preprocess_data_and_move(data_path: str, processes: int, result_path: str) -> str:
+    shutil.move(preprocess_data(data_path, processes), result_path)
+    return result_path
+
+
+@pytest.mark.skipif(to_skip(current_module_level=TEST_LEVEL.PREPROCESSING), reason=TEST_LEVEL.PREPROCESSING.value)
+class TestPreprocessData:
+
+    @pytest.mark.parametrize('processes', [2, 3])
+    def test_parallel_preprocessing(self, tmp_path: str, processes: int) -> None:
+        data_path = shutil.copytree(DATA_FOLDER, os.path.join(tmp_path, 'data'))
+        sequential_result = preprocess_data_and_move(data_path, 1, os.path.join(tmp_path, 'sequential'))
+        parallel_result = preprocess_data_and_move(data_path, processes, os.path.join(tmp_path, 'parallel'))
+
+        sequential_files = get_relative_files(sequential_result)
+        assert sequential_files
+        assert sequential_files == get_relative_files(parallel_result)
+        for file in sequential_files:
+            assert read_file(os.path.join(sequential_result, file)) == read_file(os.path.join(parallel_result, file))
@@ -1,9 +1,11 @@
 # Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
 
+import ast
 import logging
 import itertools
 import collections
 from enum import Enum
+from functools import lru_cache
 from typing import Dict, List, Tuple
 
 import pytest
@@ -12,7 +14,7 @@ import numpy as np
 from src.test.test_config import to_skip, TEST_LEVEL
 from src.main.canonicalization.consts import TREE_TYPE
 from src.main.solution_space.serialized_code import Code
-from src.main.canonicalization.diffs.gumtree import GumTreeDiff
+from src.test.solution_space.util import create_tmp_files_and_get_diffs_numbers_matrix
 from src.main.solution_space.data_classes import CodeInfo, User
 from src.main.util.consts import TASK, LOGGER_NAME, TEST_RESULT
 from src.main.solution_space.solution_graph import SolutionGraph
@@ -72,11 +74,14 @@ INDICES_BY_VERTEX = {VERTEX.VERTEX_0: vertex_0_indices,
                      VERTEX.VERTEX_2: vertex_2_indices}
 
 
-def get_vertex_by_index(index: 0) -> VERTEX:
-    for vertex in INDICES_BY_VERTEX.keys():
-        if index in INDICES_BY_VERTEX[vertex]:
-            return vertex
-    raise ValueError(f'No vertices found for given index {index}')
+VERTEX_BY_INDEX = {index: vertex for vertex, indices in INDICES_BY_VERTEX.items() for index in indices}
+
+
+def get_vertex_by_index(index: int) -> VERTEX:
+    vertex = VERTEX_BY_INDEX.get(index)
+    if vertex is None:
+        raise ValueError(f'No vertices found for given index {index}')
+    return vertex
 
 
 # Distances between all anon trees for all 6 fragments:
@@ -93,6 +98,11 @@ canon_distance = {VERTEX.VERTEX_0: {VERTEX.VERTEX_0: 0, VERTEX.VERTEX_1: 12, VER
                   VERTEX.VERTEX_1: {VERTEX.VERTEX_0: 12, VERTEX.VERTEX_1: 0, VERTEX.VERTEX_2: 14},
                   VERTEX.VERTEX_2: {VERTEX.VERTEX_0: 4, VERTEX.VERTEX_1: 14, VERTEX.VERTEX_2: 0}}
 
+# The same distances as arrays for finding minimums of their blocks
+ANON_DISTANCE_ARRAY = np.array(anon_distance)
+VERTEX_INDEX = {vertex: i for i, vertex in enumerate(VERTEX)}
+CANON_DISTANCE_ARRAY = np.array([[canon_distance[src][dst] for dst in VERTEX] for src in VERTEX])
+
 # If we add fragments to the solution graph in that order, vertices will be created or updated like this:
 #  *adding fragment_0*  vertex_0 created
 #  *adding fragment_3*  vertex_1 created
@@ -113,16 +123,45 @@ fragment_indices_to_add = [0, 3, 1, 5, 2, 4]
 #
 # It's useful for finding intermediate distance matrix while adding new fragments.
 def find_dist_matrix(added_indices_by_vertex: Dict[VERTEX, List[int]]) -> List[List[int]]:
-    dist_matrix = []
-    for i, src_vertex in enumerate(added_indices_by_vertex.keys()):
-        dist_matrix.append([])
-        src_indices = added_indices_by_vertex[src_vertex]
-        for j, dst_vertex in enumerate(added_indices_by_vertex.keys()):
-            dst_indices = added_indices_by_vertex[dst_vertex]
-            canon_dist = canon_distance[src_vertex][dst_vertex]
-            anon_dist = min([anon_distance[k][l] for k in src_indices for l in dst_indices])
-            dist_matrix[i].append(min(anon_dist, canon_dist))
-    return dist_matrix
+    vertices = list(added_indices_by_vertex.keys())
+    vertices_indices = [VERTEX_INDEX[vertex] for vertex in vertices]
+    dist_matrix = CANON_DISTANCE_ARRAY[np.ix_(vertices_indices, vertices_indices)]
+    for i, j in itertools.product(range(len(vertices)), repeat=2):
+        anon_dist = ANON_DISTANCE_ARRAY[np.ix_(added_indices_by_vertex[vertices[i]],
+                                               added_indices_by_vertex[vertices[j]])].min()
+        dist_matrix[i, j] = min(dist_matrix[i, j], anon_dist)
+    return dist_matrix.tolist()
+
+
+# Trees of the same fragments are needed in many tests, so they are built once for each fragment
+@lru_cache(maxsize=None)
+def get_anon_tree(index: int) -> ast.AST:
+    anon_tree, = get_trees(all_fragments[index], {TREE_TYPE.ANON})
+    return anon_tree
+
+
+@lru_cache(maxsize=None)
+def get_canon_tree(index: int) -> ast.AST:
+    canon_tree, = get_trees(all_fragments[index], {TREE_TYPE.CANON})
+    return canon_tree
+
+
+# Updates dist matrix (found by find_dist_matrix) after adding the fragment with the given index to the vertex,
+# which is already in added_indices_by_vertex. Only distances of the vertex are updated, and the fragment
+# is compared with the added fragments of each vertex, instead of finding all the matrix again
+def update_dist_matrix(dist_matrix: List[List[int]], added_indices_by_vertex: Dict[VERTEX, List[int]], vertex: VERTEX,
+                       index: int) -> None:
+    vertices = list(added_indices_by_vertex.keys())
+    v = vertices.index(vertex)
+    # A new vertex is the last one, and its distances are not greater than canon distances
+    if v == len(dist_matrix):
+        for u, row in enumerate(dist_matrix):
+            row.append(canon_distance[vertices[u]][vertex])
+        dist_matrix.append([canon_distance[vertex][other_vertex] for other_vertex in vertices])
+    for u, other_vertex in enumerate(vertices):
+        other_indices = added_indices_by_vertex[other_vertex]
+        dist_matrix[v][u] = min(dist_matrix[v][u], ANON_DISTANCE_ARRAY[index, other_indices].min())
+        dist_matrix[u][v] = min(dist_matrix[u][v], ANON_DISTANCE_ARRAY[other_indices, index].min())
 
 
 def get_code_info_chain(sources: List[str]) -> List[Tuple[Code, CodeInfo]]:
@@ -136,45 +175,41 @@ class TestDistBetweenVertices:
     # Check all fragments in same vertices have the same canon trees
     @pytest.mark.parametrize('vertex', [v for v in VERTEX])
     def test_same_canon_trees_in_same_vertices(self, vertex: VERTEX, subtests):
-        same_canon_fragments = [all_fragments[i] for i in INDICES_BY_VERTEX[vertex]]
-        canon_trees = [get_trees(f, {TREE_TYPE.CANON})[0] for f in same_canon_fragments]
-        for canon_tree_1, canon_tree_2 in itertools.product(canon_trees, repeat=2):
+        canon_trees = [get_canon_tree(i) for i in INDICES_BY_VERTEX[vertex]]
+        for canon_tree_1, canon_tree_2 in itertools.combinations(canon_trees, 2):
             with subtests.test():
                 assert are_asts_equal(canon_tree_1, canon_tree_2)
 
     # Check all fragments in different vertices have different canon trees
     def test_different_canon_trees_in_different_vertices(self, subtests):
         # Take the first fragment from each vertex to get all fragments with different canon trees
-        different_canon_fragments = [all_fragments[INDICES_BY_VERTEX[vertex][0]] for vertex in VERTEX]
-        canon_trees = [get_trees(f, {TREE_TYPE.CANON})[0] for f in different_canon_fragments]
-        for canon_tree_1, canon_tree_2 in zip(canon_trees, np.roll(canon_trees, 1)):
+        canon_trees = [get_canon_tree(INDICES_BY_VERTEX[vertex][0]) for vertex in VERTEX]
+        for canon_tree_1, canon_tree_2 in zip(canon_trees, canon_trees[-1:] + canon_trees[:-1]):
             with subtests.test():
                 assert not are_asts_equal(canon_tree_1, canon_tree_2)
 
     # Check anon distance matrix is filled right
     def test_anon_distance_correctness(self, subtests):
-        fragments = [fragment_0, fragment_1, fragment_2, fragment_3, fragment_4, fragment_5]
-        for i, src_fragment in enumerate(fragments):
-            src_anon_tree, = get_trees(src_fragment, {TREE_TYPE.ANON})
-            for j, dst_fragment in enumerate(fragments):
-                with subtests.test():
-                    dst_anon_tree, = get_trees(dst_fragment, {TREE_TYPE.ANON})
-                    real_dist = GumTreeDiff.create_tmp_files_and_get_diffs_number(src_anon_tree, dst_anon_tree)
-                    assert real_dist == anon_distance[i][j], f'Dists are not equal: {i}, {j}'
+        anon_trees = [get_anon_tree(i) for i in range(len(all_fragments))]
+        real_dists = create_tmp_files_and_get_diffs_numbers_matrix(anon_trees, anon_trees)
+        for i, j in itertools.product(range(len(all_fragments)), repeat=2):
+            with subtests.test():
+                assert real_dists[i][j] == anon_distance[i][j], f'Dists are not equal: {i}, {j}'
 
     # Check canon distance matrix is filled right
     @pytest.mark.parametrize('src_vertex', [v for v in VERTEX])
     def test_canon_distance_correctness(self, src_vertex, subtests):
-        src_canon_tree, = get_trees(all_fragments[INDICES_BY_VERTEX[src_vertex][0]], {TREE_TYPE.CANON})
-        for dst_vertex in VERTEX:
+        src_canon_tree = get_canon_tree(INDICES_BY_VERTEX[src_vertex][0])
+        dst_canon_trees = [get_canon_tree(INDICES_BY_VERTEX[dst_vertex][0]) for dst_vertex in VERTEX]
+        real_dists, = create_tmp_files_and_get_diffs_numbers_matrix([src_canon_tree], dst_canon_trees)
+        for dst_vertex, real_dist in zip(VERTEX, real_dists):
             with subtests.test():
-                dst_canon_tree, = get_trees(all_fragments[INDICES_BY_VERTEX[dst_vertex][0]], {TREE_TYPE.CANON})
-                real_dist = GumTreeDiff.create_tmp_files_and_get_diffs_number(src_canon_tree, dst_canon_tree)
                 assert real_dist == canon_distance[src_vertex][dst_vertex]
 
     def test_consequent_dist_updating(self, subtests):
         sg = SolutionGraph(TASK.PIES)
         added_indices_by_vertex = collections.defaultdict(list)
+        expected_dist_matrix = []
         for i in fragment_indices_to_add:
             with subtests.test():
                 # We should create code_info_chain for each fragment to emulate consequent fragments adding.
@@ -182,7 +217,10 @@ class TestDistBetweenVertices:
                 sg.add_code_info_chain(code_info_chain)
                 actual_dist_matrix = sg._dist._IDistanceMatrix__get_dist_matrix()
 
-                added_indices_by_vertex[get_vertex_by_index(i)].append(i)
-                expected_dist_matrix = find_dist_matrix(added_indices_by_vertex)
+                vertex = get_vertex_by_index(i)
+                added_indices_by_vertex[vertex].append(i)
+                update_dist_matrix(expected_dist_matrix, added_indices_by_vertex, vertex, i)
 
                 assert expected_dist_matrix == actual_dist_matrix
+        # The updated matrix should be the same as the matrix found from scratch
+        assert expected_dist_matrix == find_dist_matrix(added_indices_by_vertex)
@@ -0,0 +1,33 @@
+# Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
+
+import ast
+import logging
+
+import pytest
+
+from src.test.test_config import to_skip, TEST_LEVEL
+from src.main.util.consts import LOGGER_NAME, TASK, TEST_RESULT
+from src.main.solution_space.consts import USERS_NUMBER
+from src.main.solution_space.serialized_code import AnonTree
+from src.main.solution_space.data_classes import User, CodeInfo, Profile
+from src.main.solution_space.measured_tree.measured_tree_v_7 import MeasuredTreeV7
+
+log = logging.getLogger(LOGGER_NAME)
+
+
+def create_anon_tree(source: str) -> AnonTree:
+    anon_tree = AnonTree(ast.parse(source), TEST_RESULT.CORRECT_CODE.value, 'anon_tree.py', CodeInfo(User(Profile())),
+                         to_create_file=False)
+    anon_tree.find_medians()
+    return anon_tree
+
+
+@pytest.mark.skipif(to_skip(current_module_level=TEST_LEVEL.SOLUTION_SPACE), reason=TEST_LEVEL.SOLUTION_SPACE.value)
+class TestMeasuredTree:
+
+    # Equal trees are used to get the distance without running GumTree
+    @pytest.mark.parametrize('task', [TASK.PIES, TASK.BRACKETS])
+    def test_distance_with_task_users_number(self, task: TASK) -> None:
+        source = 'print(\'Hi\')'
+        measured_tree = MeasuredTreeV7(create_anon_tree(source), create_anon_tree(source), task)
+        assert f'/ {USERS_NUMBER[task]})' in measured_tree.distance_info
@@ -2,7 +2,6 @@
 
 import os
 import logging
-import unittest
 from typing import List, Tuple
 
 import pytest
@@ -11,8 +10,8 @@ from src.test.test_config import to_skip, TEST_LEVEL
 from src.main.canonicalization.consts import TREE_TYPE
 from src.main.util.language_util import get_extension_by_language
 from src.main.solution_space.solution_graph import SolutionGraph, Vertex
-from src.main.util.consts import LOGGER_NAME, TASK, FILE_SYSTEM_ITEM, LANGUAGE
-from src.main.util.file_util import get_all_file_system_items, remove_directory
+from src.main.util.consts import LOGGER_NAME, TASK, LANGUAGE
+from src.main.util.file_util import remove_directory
 from src.test.solution_space.solution_graph.util import get_two_vertices, init_default_ids
 from src.main.solution_space.consts import GRAPH_FOLDER_PREFIX, SOLUTION_SPACE_TEST_FOLDER, FILE_PREFIX
 
@@ -24,6 +23,8 @@ NOT_DEFAULT_FILE_PREFIX = 'test_code'
 SolutionGraph.solution_space_folder = SOLUTION_SPACE_TEST_FOLDER
 GRAPHS_PARENT_FOLDER = os.path.join(SOLUTION_SPACE_TEST_FOLDER, str(CURRENT_TASK.value))
 
+ThreeGraphs = Tuple[SolutionGraph, SolutionGraph, SolutionGraph]
+
 
 def get_full_paths(short_paths: List[str]) -> List[str]:
     return [os.path.join(GRAPHS_PARENT_FOLDER, s_p) for s_p in short_paths]
@@ -37,29 +38,24 @@ def create_three_graphs() -> Tuple[int, SolutionGraph, SolutionGraph, SolutionGr
     return 3, sg_0, sg_1, sg_2
 
 
-# Since {graph_n} graphs were created, several empty_vertices were created also,
-# so first {graph_n} code ids are already taken.
-# All next vertices will have code ids started from {graph_n}
-def get_range(graph_n: int, vertices: List[Vertex]) -> range:
-    return range(graph_n, len(vertices) + graph_n)
-
-
+# Graph folders are in the parent folder and contain only files, so one level is listed without walking deeper
 def get_actual_graph_folders() -> List[str]:
-    return get_all_file_system_items(GRAPHS_PARENT_FOLDER, item_type=FILE_SYSTEM_ITEM.SUBDIR)
+    with os.scandir(GRAPHS_PARENT_FOLDER) as entries:
+        return [entry.path for entry in entries if entry.is_dir(follow_symlinks=False)]
 
 
 def get_actual_code_files(graph_folder_name: str) -> List[str]:
-    return get_all_file_system_items(os.path.join(GRAPHS_PARENT_FOLDER, graph_folder_name))
+    with os.scandir(os.path.join(GRAPHS_PARENT_FOLDER, graph_folder_name)) as entries:
+        return [entry.path for entry in entries if entry.is_file(follow_symlinks=False)]
 
 
-def get_expected_files(graph_id: int, code_id: int, anon_tree_id: int, graph_prefix: str = GRAPH_FOLDER_PREFIX,
-                       file_prefix: str = FILE_PREFIX,
-                       language: LANGUAGE = LANGUAGE.PYTHON) -> List[str]:
+def get_expected_file(graph_id: int, code_id: int, anon_tree_id: int, graph_prefix: str = GRAPH_FOLDER_PREFIX,
+                      file_prefix: str = FILE_PREFIX, language: LANGUAGE = LANGUAGE.PYTHON) -> str:
     ext = get_extension_by_language(language).value
     graph_folder_name = f'{graph_prefix}_{graph_id}'
     code_file_prefix = f'{file_prefix}_{code_id}'
-    return [os.path.join(GRAPHS_PARENT_FOLDER, graph_folder_name,
-                         f'{code_file_prefix}_{TREE_TYPE.ANON.value}_{anon_tree_id}{ext}')]
+    return os.path.join(GRAPHS_PARENT_FOLDER, graph_folder_name,
+                        f'{code_file_prefix}_{TREE_TYPE.ANON.value}_{anon_tree_id}{ext}')
 
 
 def get_expected_empty_file(graph_id: int, graph_prefix: str = GRAPH_FOLDER_PREFIX, file_prefix: str = FILE_PREFIX,
@@ -71,56 +67,57 @@ def get_expected_empty_file(graph_id: int, graph_prefix: str = GRAPH_FOLDER_PREF
     # 2. Second graph (graph_id is 1) is created -> SerializedCode (code_id is 1) for empty vertex is created ->
     #    -> AnonTree (anon_tree_id is 1) for empty vertex is created
     # 3. ... and so on
-    return get_expected_files(graph_id, graph_id, graph_id, graph_prefix, file_prefix, language)[0]
+    return get_expected_file(graph_id, graph_id, graph_id, graph_prefix, file_prefix, language)
 
 
 def delete_graphs_parent_folder() -> None:
     remove_directory(GRAPHS_PARENT_FOLDER)
 
 
+def get_expected_vertices_files(sg: SolutionGraph, vertices: Tuple[Vertex, ...],
+                                graph_prefix: str = GRAPH_FOLDER_PREFIX, file_prefix: str = FILE_PREFIX) -> List[str]:
+    expected_files = [get_expected_file(sg.id, vertex.serialized_code.id, vertex.serialized_code.anon_trees[0].id,
+                                        graph_prefix, file_prefix) for vertex in vertices]
+    expected_files.append(get_expected_empty_file(sg.id, graph_prefix, file_prefix))
+    return expected_files
+
+
 @pytest.mark.skipif(to_skip(current_module_level=TEST_LEVEL.SOLUTION_SPACE), reason=TEST_LEVEL.SOLUTION_SPACE.value)
 class TestCodeToFile:
 
-    # Create three graphs and check all folders names which were created for each graph
-    def test_folders_names(self) -> None:
+    # The same graphs are checked by all tests, so they are created only once.
+    # Each test adds vertices only to its own graph, so the files of a graph don't depend on the tests order
+    @staticmethod
+    @pytest.fixture(scope='class')
+    def three_graphs() -> ThreeGraphs:
         delete_graphs_parent_folder()
         init_default_ids()
-        create_three_graphs()
+        _, sg_0, sg_1, sg_2 = create_three_graphs()
+        return sg_0, sg_1, sg_2
 
+    # Create three graphs and check all folders names which were created for each graph
+    def test_folders_names(self, three_graphs: ThreeGraphs) -> None:
         expected_folders_names = get_full_paths([f'{GRAPH_FOLDER_PREFIX}_0',
                                                  f'{GRAPH_FOLDER_PREFIX}_1',
                                                  f'{NOT_DEFAULT_GRAPH_PREFIX}_2'])
-        case = unittest.TestCase()
-        case.assertCountEqual(expected_folders_names, get_actual_graph_folders())
+        assert set(expected_folders_names) == set(get_actual_graph_folders())
 
-    def test_folder_structure_with_default_files_names(self) -> None:
-        init_default_ids()
-        graph_n, sg_0, _, _ = create_three_graphs()
-        vertices = get_two_vertices(sg_0)
-        expected_files = sum([get_expected_files(sg_0.id, i, i) for i in get_range(graph_n, vertices)], [])
-        expected_files.append(get_expected_empty_file(sg_0.id))
+    def test_folder_structure_with_default_files_names(self, three_graphs: ThreeGraphs) -> None:
+        sg_0, _, _ = three_graphs
+        expected_files = get_expected_vertices_files(sg_0, get_two_vertices(sg_0))
         actual_files = get_actual_code_files(f'{GRAPH_FOLDER_PREFIX}_{sg_0.id}')
-        case = unittest.TestCase()
-        case.assertCountEqual(expected_files, actual_files)
+        assert set(expected_files) == set(actual_files)
 
-    def test_folder_structure_with_not_default_files_names(self) -> None:
-        init_default_ids()
-        graph_n, _, sg_1, _ = create_three_graphs()
-        vertices = get_two_vertices(sg_1)
-        expected_files = sum([get_expected_files(sg_1.id, i, i, file_prefix=NOT_DEFAULT_FILE_PREFIX)
-                              for i in get_range(graph_n, vertices)], [])
-        expected_files.append(get_expected_empty_file(sg_1.id, file_prefix=NOT_DEFAULT_FILE_PREFIX))
+    def test_folder_structure_with_not_default_files_names(self, three_graphs: ThreeGraphs) -> None:
+        _, sg_1, _ = three_graphs
+        expected_files = get_expected_vertices_files(sg_1, get_two_vertices(sg_1),
+                                                     file_prefix=NOT_DEFAULT_FILE_PREFIX)
         actual_files = get_actual_code_files(f'{GRAPH_FOLDER_PREFIX}_{sg_1.id}')
-        case = unittest.TestCase()
-        case.assertCountEqual(expected_files, actual_files)
+        assert set(expected_files) == set(actual_files)
 
-    def test_folder_structure_with_all_not_default_names(self) -> None:
-        init_default_ids()
-        graph_n, _, _, sg_2 = create_three_graphs()
-        vertices = get_two_vertices(sg_2)
-        expected_files = sum([get_expected_files(sg_2.id, i, i, NOT_DEFAULT_GRAPH_PREFIX, NOT_DEFAULT_FILE_PREFIX)
-                              for i in get_range(graph_n, vertices)], [])
-        expected_files.append(get_expected_empty_file(sg_2.id, NOT_DEFAULT_GRAPH_PREFIX, NOT_DEFAULT_FILE_PREFIX))
+    def test_folder_structure_with_all_not_default_names(self, three_graphs: ThreeGraphs) -> None:
+        _, _, sg_2 = three_graphs
+        expected_files = get_expected_vertices_files(sg_2, get_two_vertices(sg_2), NOT_DEFAULT_GRAPH_PREFIX,
+                                                     NOT_DEFAULT_FILE_PREFIX)
         actual_files_names = get_actual_code_files(f'{NOT_DEFAULT_GRAPH_PREFIX}_{sg_2.id}')
-        case = unittest.TestCase()
-        case.assertCountEqual(expected_files, actual_files_names)
+        assert set(expected_files) == set(actual_files_names)
@@ -1,8 +1,10 @@
 # Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
 
+import ast
 import logging
 from enum import Enum
-from typing import List, Tuple, Dict, Union
+from collections import Counter
+from typing import List, Tuple, NamedTuple, Optional
 
 import pytest
 
@@ -20,6 +22,8 @@ log = logging.getLogger(LOGGER_NAME)
 
 CURRENT_TASK = TASK.PIES
 SolutionGraph.solution_space_folder = SOLUTION_SPACE_TEST_FOLDER
+# These tests don't check files of anon trees, so the files are not created
+TO_CREATE_FILES = False
 
 
 class ADJACENT_VERTEX_TYPE(Enum):
@@ -27,12 +31,10 @@ class ADJACENT_VERTEX_TYPE(Enum):
     PARENTS = 'parents'
 
 
-class VERTEX_STRUCTURE(Enum):
-    CODE_INFO_LIST_LEN = 'users_number'
-    SOURCE = 'source'
-
-
-VertexStructure = Dict[VERTEX_STRUCTURE, Union[str, int]]
+# Structures are hashable, so adjacent vertices structures are compared as multisets
+class VertexStructure(NamedTuple):
+    source: Optional[str]
+    users_number: int
 
 
 def create_graph_with_code() -> (SolutionGraph, List[Vertex], List[str], List[float]):
@@ -43,7 +45,7 @@ def create_graph_with_code() -> (SolutionGraph, List[Vertex], List[str], List[fl
 
     sources = [source_0, source_1, source_2]
 
-    sg = SolutionGraph(CURRENT_TASK)
+    sg = SolutionGraph(CURRENT_TASK, to_create_files=TO_CREATE_FILES)
     #           START_VERTEX
     #         /             \
     #  empty vertex       vertex_0
@@ -58,7 +60,8 @@ def create_graph_with_code() -> (SolutionGraph, List[Vertex], List[str], List[fl
     vertices = [Vertex(sg, code=Code.from_source(s, rates[i])) for i, s in enumerate(sources)]
 
     # Add code infos with different users
-    list(map(lambda v: v.serialized_code.anon_trees[0].add_code_info(CodeInfo(User())), vertices))
+    for vertex in vertices:
+        vertex.serialized_code.anon_trees[0].add_code_info(CodeInfo(User()))
 
     sg.connect_to_start_vertex(vertices[0])
 
@@ -101,24 +104,18 @@ def create_code_info_chain() -> (List[Tuple[Code, CodeInfo]], List[str]):
 
 
 def get_vertex_structure(vertex: Vertex) -> VertexStructure:
-    source = get_code_from_tree(vertex.serialized_code.canon_tree).strip('\n') if vertex.serialized_code else None
+    # Canon code is cached by serialized code, so the tree is printed only once for each vertex
+    source = vertex.serialized_code.canon_code.strip('\n') if vertex.serialized_code else None
     code_info_list_len = 0 if vertex.serialized_code is None \
         else sum([len(a_t.code_info_list) for a_t in vertex.serialized_code.anon_trees])
-    return {VERTEX_STRUCTURE.SOURCE: source, VERTEX_STRUCTURE.CODE_INFO_LIST_LEN: code_info_list_len}
+    return VertexStructure(source=source, users_number=code_info_list_len)
 
 
 def check_adjacent_vertices_structure(adjacent_vertex_type: ADJACENT_VERTEX_TYPE, vertex: Vertex,
                                       adjacent_vertices_structure: List[VertexStructure]) -> None:
     adjacent_vertices = getattr(vertex, adjacent_vertex_type.value, [])
     assert len(adjacent_vertices) == len(adjacent_vertices_structure)
-
-    for adjacent_vertex in adjacent_vertices:
-        real_structure = get_vertex_structure(adjacent_vertex)
-        assert real_structure in adjacent_vertices_structure
-        adjacent_vertices_structure.remove(real_structure)
-
-    # Check if empty
-    assert not adjacent_vertices_structure
+    assert Counter(map(get_vertex_structure, adjacent_vertices)) == Counter(adjacent_vertices_structure)
 
 
 @pytest.mark.skipif(to_skip(current_module_level=TEST_LEVEL.SOLUTION_SPACE), reason=TEST_LEVEL.SOLUTION_SPACE.value)
@@ -127,7 +124,7 @@ class TestGraph:
     def test_bfs_traversal(self) -> None:
         init_default_ids()
         # A simple graph without any code just to check bfs
-        sg = SolutionGraph(CURRENT_TASK)
+        sg = SolutionGraph(CURRENT_TASK, to_create_files=TO_CREATE_FILES)
         #               START_VERTEX
         #               |          \
         #            vertex_1     empty_vertex
@@ -164,6 +161,29 @@ class TestGraph:
             found_vertex = find_or_create_vertex_with_code_info_and_rate_check(sg, sources[i], rates[i])
             assert found_vertex == vertex
 
+    # An annotated assignment is unknown to the trees comparison, so its tree has the None hash, but it is equal
+    # to a tree with a simple assignment at its place (see hashAST). Thus, each of the vertices should be found
+    # by the tree of the other one
+    @pytest.mark.parametrize('vertex_source, other_source', [('x: int = 2', 'x = 2'), ('x = 2', 'x: int = 2')])
+    def test_finding_vertex_with_none_hash(self, vertex_source: str, other_source: str) -> None:
+        init_default_ids()
+        sg = SolutionGraph(CURRENT_TASK, to_create_files=TO_CREATE_FILES)
+        vertex_tree, other_tree = ast.parse(vertex_source), ast.parse(other_source)
+        vertex = sg.create_vertex(Code(vertex_tree, vertex_tree, TEST_RESULT.CORRECT_CODE.value), CodeInfo(User()))
+        sg.connect_to_start_vertex(vertex)
+        assert sg.find_vertex(other_tree) is vertex
+
+    # A nonlocal statement has the None hash too, and it has the same nodes number as a global one, so the other tree
+    # should be found as the anon tree of the vertex instead of being added as a new one
+    @pytest.mark.parametrize('vertex_source, other_source', [('nonlocal x', 'global x'), ('global x', 'nonlocal x')])
+    def test_finding_anon_tree_with_none_hash(self, vertex_source: str, other_source: str) -> None:
+        init_default_ids()
+        sg = SolutionGraph(CURRENT_TASK, to_create_files=TO_CREATE_FILES)
+        vertex_tree, other_tree = ast.parse(vertex_source), ast.parse(other_source)
+        vertex = sg.create_vertex(Code(vertex_tree, vertex_tree, TEST_RESULT.CORRECT_CODE.value), CodeInfo(User()))
+        assert vertex.serialized_code.add_anon_tree(other_tree, TEST_RESULT.CORRECT_CODE.value, CodeInfo(User())) is None
+        assert len(vertex.serialized_code.anon_trees) == 1
+
     def test_creating_vertex(self) -> None:
         init_default_ids()
         sg, vertices, sources, _ = create_graph_with_code()
@@ -221,14 +241,10 @@ class TestGraph:
         end_vertex_structure = get_vertex_structure(sg.end_vertex)
 
         # Also, the structure of the new chain vertices should be like that:
-        chain_0_structure = {VERTEX_STRUCTURE.SOURCE: chain_sources[0],
-                             VERTEX_STRUCTURE.CODE_INFO_LIST_LEN: 1}
-        chain_1_structure = {VERTEX_STRUCTURE.SOURCE: chain_sources[1],
-                             VERTEX_STRUCTURE.CODE_INFO_LIST_LEN: 2}
-        chain_2_structure = {VERTEX_STRUCTURE.SOURCE: chain_sources[2],
-                             VERTEX_STRUCTURE.CODE_INFO_LIST_LEN: 1}
-        chain_3_structure = {VERTEX_STRUCTURE.SOURCE: chain_sources[3],
-                             VERTEX_STRUCTURE.CODE_INFO_LIST_LEN: 1}
+        chain_0_structure = VertexStructure(source=chain_sources[0], users_number=1)
+        chain_1_structure = VertexStructure(source=chain_sources[1], users_number=2)
+        chain_2_structure = VertexStructure(source=chain_sources[2], users_number=1)
+        chain_3_structure = VertexStructure(source=chain_sources[3], users_number=1)
 
         # We should have 1 joined vertex: [chain_1, vertex_2] with the same structure:
         assert chain_1_structure == vertex_2_structure
@@ -1,6 +1,8 @@
 # Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
 
-from typing import Tuple, List
+import ast
+from functools import lru_cache
+from typing import Tuple
 
 from src.main.util.consts import TEST_RESULT
 from src.main.canonicalization.consts import TREE_TYPE
@@ -10,17 +12,30 @@ from src.main.canonicalization.canonicalization import get_trees
 from src.main.solution_space.solution_graph import SolutionGraph, Vertex
 
 
+# The same sources are used in many tests, so the trees are got only once for each source.
+# The trees are not changed after getting, so they can be shared between codes
+@lru_cache(maxsize=256)
+def __get_anon_and_canon_trees(source: str) -> Tuple[ast.AST, ...]:
+    return get_trees(source, {TREE_TYPE.ANON, TREE_TYPE.CANON})
+
+
 def create_code_from_source(source: str, rate: float = TEST_RESULT.CORRECT_CODE.value) -> Code:
-    anon_tree, canon_tree = get_trees(source, {TREE_TYPE.ANON, TREE_TYPE.CANON})
+    anon_tree, canon_tree = __get_anon_and_canon_trees(source)
     return Code(anon_tree, canon_tree, rate)
 
 
-def get_two_vertices(sg: SolutionGraph) -> List[Vertex]:
-    source_0 = 'print(\'Hi\')'
-    source_1 = 'x = 6\nif x > 5:\n    x = 5\nprint(x)'
-    sources = [source_0, source_1]
-    rates = [TEST_RESULT.CORRECT_CODE.value] * len(sources)
-    return [Vertex(sg, code=Code.from_source(s, rates[i])) for i, s in enumerate(sources)]
+TWO_VERTICES_SOURCES = ('print(\'Hi\')', 'x = 6\nif x > 5:\n    x = 5\nprint(x)')
+
+
+# All vertices have correct code. Codes are not changed after creating, so the same codes are shared between
+# vertices of different graphs, and only the vertices are created for each graph
+@lru_cache(maxsize=1)
+def __get_two_vertices_codes() -> Tuple[Code, ...]:
+    return tuple(create_code_from_source(source) for source in TWO_VERTICES_SOURCES)
+
+
+def get_two_vertices(sg: SolutionGraph) -> Tuple[Vertex, ...]:
+    return tuple(Vertex(sg, code=code) for code in __get_two_vertices_codes())
 
 
 # Reset graph, vertex and code last ids to avoid different ids in one-by-one test running and running them all at once
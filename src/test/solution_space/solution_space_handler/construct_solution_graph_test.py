@@ -0,0 +1,41 @@
+# Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
+
+import os
+import shutil
+
+import pytest
+
+from src.main.util.consts import TASK, TEST_DATA_PATH
+from src.test.test_config import to_skip, TEST_LEVEL
+from src.main.solution_space.solution_graph import SolutionGraph
+from src.main.solution_space.consts import SOLUTION_SPACE_TEST_FOLDER
+from src.test.solution_space.solution_graph.util import init_default_ids
+from src.main.solution_space.solution_space_handler import construct_solution_graph
+
+CURRENT_TASK = TASK.PIES
+DATA_PATH = os.path.join(TEST_DATA_PATH, 'cli', 'algo', CURRENT_TASK.value)
+FILES_NUMBER = 3
+SolutionGraph.solution_space_folder = SOLUTION_SPACE_TEST_FOLDER
+
+
+# Graphs are compared by their string representations, so ids are reset to get the same ids in both graphs
+def construct_graph_str(path: str, processes: int) -> str:
+    init_default_ids()
+    return str(construct_solution_graph(path, CURRENT_TASK, processes=processes))
+
+
+@pytest.mark.skipif(to_skip(current_module_level=TEST_LEVEL.SOLUTION_SPACE), reason=TEST_LEVEL.SOLUTION_SPACE.value)
+class TestConstructSolutionGraph:
+
+    # The same data is copied into several files, so users of different files have the same codes
+    @staticmethod
+    @pytest.fixture(scope='function')
+    def data_path(tmp_path: str) -> str:
+        for file in os.listdir(DATA_PATH):
+            for i in range(FILES_NUMBER):
+                shutil.copy(os.path.join(DATA_PATH, file), os.path.join(tmp_path, f'{i}_{file}'))
+        return str(tmp_path)
+
+    @pytest.mark.parametrize('processes', [2, FILES_NUMBER + 1])
+    def test_parallel_construction(self, data_path: str, processes: int) -> None:
+        assert construct_graph_str(data_path, 1) == construct_graph_str(data_path, processes)
@@ -12,7 +12,8 @@ from src.main.canonicalization.consts import TREE_TYPE
 from src.main.solution_space.data_classes import AtiItem
 from src.main.canonicalization.canonicalization import get_trees, are_asts_equal
 from src.main.util.consts import LOGGER_NAME, CODE_TRACKER_COLUMN, ACTIVITY_TRACKER_COLUMN, ACTIVITY_TRACKER_EVENTS
-from src.main.solution_space.solution_space_handler import __find_same_fragments, __get_ati_data, __get_column_value
+from src.main.solution_space.solution_space_handler import __find_same_fragments, __get_ati_data, __get_column_value, \
+    __get_solutions_columns, SolutionsColumns
 
 log = logging.getLogger(LOGGER_NAME)
 
@@ -53,15 +54,16 @@ def __get_fragments() -> List[str]:
 # 9          24  print('Hello')\nprint('Hello')            24    Action       Run
 # 10         25  print('Hello')\nprint('Hello')            25    Action       Run
 # 11         26  print('Hello')\nprint('Hello')            26    Action       Run
-def create_solutions() -> pd.DataFrame:
-    return pd.DataFrame({CODE_TRACKER_COLUMN.TIMESTAMP.value: __get_timestamps(),
-                         CODE_TRACKER_COLUMN.FRAGMENT.value: __get_fragments(),
-                         ACTIVITY_TRACKER_COLUMN.TIMESTAMP_ATI.value: __get_timestamps(),
-                         ACTIVITY_TRACKER_COLUMN.EVENT_DATA.value: __get_ati_action_events(),
-                         ACTIVITY_TRACKER_COLUMN.EVENT_TYPE.value: __get_ati_event_types()})
+def create_solutions() -> SolutionsColumns:
+    return __get_solutions_columns(pd.DataFrame({CODE_TRACKER_COLUMN.TIMESTAMP.value: __get_timestamps(),
+                                                 CODE_TRACKER_COLUMN.FRAGMENT.value: __get_fragments(),
+                                                 ACTIVITY_TRACKER_COLUMN.TIMESTAMP_ATI.value: __get_timestamps(),
+                                                 ACTIVITY_TRACKER_COLUMN.EVENT_DATA.value: __get_ati_action_events(),
+                                                 ACTIVITY_TRACKER_COLUMN.EVENT_TYPE.value: __get_ati_event_types()}))
 
 
-def get_expected_out(solutions: pd.DataFrame, start_index: int, end_index: int) -> Tuple[int, List[AtiItem], ast.AST, ast.AST]:
+def get_expected_out(solutions: SolutionsColumns, start_index: int,
+                     end_index: int) -> Tuple[int, List[AtiItem], ast.AST, ast.AST]:
     ati_elements = []
     fragment = __get_column_value(solutions, start_index, CODE_TRACKER_COLUMN.FRAGMENT)
     anon_tree, canon_tree = get_trees(fragment, {TREE_TYPE.ANON, TREE_TYPE.CANON})
@@ -90,7 +92,7 @@ def are_equal(expected_out: Tuple[int, List[AtiItem], ast.AST, ast.AST],
 
 
 # Todo: do we need an additional function for that?
-def get_actual_out(solutions: pd.DataFrame, index: int) -> Tuple[int, List[AtiItem], ast.AST, ast.AST]:
+def get_actual_out(solutions: SolutionsColumns, index: int) -> Tuple[int, List[AtiItem], ast.AST, ast.AST]:
     return __find_same_fragments(solutions, index)
 
 
@@ -0,0 +1,41 @@
+# Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
+
+import ast
+from typing import Dict, List
+from collections import defaultdict
+
+import pytest
+
+from src.test.test_config import to_skip, TEST_LEVEL
+from src.main.solution_space.solution_space_handler import __intern_canon_tree
+
+
+def intern_canon_tree(canon_tree: ast.AST, canon_trees_by_hash: Dict[int, List[ast.AST]]) -> ast.AST:
+    return __intern_canon_tree(canon_tree, canon_trees_by_hash)
+
+
+@pytest.mark.skipif(to_skip(current_module_level=TEST_LEVEL.SOLUTION_SPACE), reason=TEST_LEVEL.SOLUTION_SPACE.value)
+class TestInternCanonTree:
+
+    def test_interning_equal_trees(self) -> None:
+        canon_trees_by_hash = defaultdict(list)
+        first_tree, second_tree = ast.parse('print(1)'), ast.parse('print(1)')
+        assert intern_canon_tree(first_tree, canon_trees_by_hash) is first_tree
+        assert intern_canon_tree(second_tree, canon_trees_by_hash) is first_tree
+
+    def test_interning_different_trees(self) -> None:
+        canon_trees_by_hash = defaultdict(list)
+        first_tree, second_tree = ast.parse('print(1)'), ast.parse('print(2)')
+        assert intern_canon_tree(first_tree, canon_trees_by_hash) is first_tree
+        assert intern_canon_tree(second_tree, canon_trees_by_hash) is second_tree
+
+    # Global and nonlocal statements are equal, but trees with nonlocal statements have the None hash (see hashAST),
+    # so such trees are not interned, even if they are equal to other trees
+    @pytest.mark.parametrize('first_source, second_source', [('global x', 'nonlocal x'),
+                                                             ('nonlocal x', 'global x'),
+                                                             ('nonlocal x\nglobal y', 'global x\nnonlocal y')])
+    def test_interning_trees_with_none_hash(self, first_source: str, second_source: str) -> None:
+        canon_trees_by_hash = defaultdict(list)
+        first_tree, second_tree = ast.parse(first_source), ast.parse(second_source)
+        assert intern_canon_tree(first_tree, canon_trees_by_hash) is first_tree
+        assert intern_canon_tree(second_tree, canon_trees_by_hash) is second_tree
@@ -1,5 +1,6 @@
 # Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
 
+import ast
 import logging
 from typing import List, Tuple, Callable
 
@@ -64,6 +65,18 @@ def get_code_chain_with_empty_fragment() -> List[Tuple[Code, CodeInfo]]:
     return get_code_chain_from_sources(1, 3) + get_code_chain_from_sources(0, 1) + get_code_chain_from_sources(3, 4)
 
 
+# Trees of global and nonlocal statements are equal, but only the first one has a hash (see hashAST)
+def get_code_chain_with_none_hash_fragment(source: str) -> List[Tuple[Code, CodeInfo]]:
+    tree = ast.parse(source)
+    return [(Code(tree, tree, TEST_RESULT.CORRECT_CODE.value), code_info)]
+
+
+# [global x, source_2, nonlocal x, source_3]
+def get_code_chain_with_none_hash_loop() -> List[Tuple[Code, CodeInfo]]:
+    return get_code_chain_with_none_hash_fragment('global x') + get_code_chain_from_sources(1, 2) + \
+           get_code_chain_with_none_hash_fragment('nonlocal x') + get_code_chain_from_sources(2, 3)
+
+
 def get_chain_without_loops(chain: List[Tuple[Code, CodeInfo]]) -> List[Tuple[Code, CodeInfo]]:
     return __remove_loops(chain, user)
 
@@ -99,6 +112,9 @@ class TestRemoveLoops:
                         # [source_2, source_3, source_1, source_4] -> [source_1, source_4],
                         # because source_1 is empty fragment
                         (get_code_chain_with_empty_fragment(), get_code_chain_from_sources(0, 1) + get_code_chain_from_sources(3, 4)),
+                        # [global x, source_2, nonlocal x, source_3] -> [source_1, nonlocal x, source_3]
+                        (get_code_chain_with_none_hash_loop(), get_code_chain_from_sources(0, 1)
+                         + get_code_chain_with_none_hash_fragment('nonlocal x') + get_code_chain_from_sources(2, 3)),
                     ],
                     ids=[
                         'test_code_chain_without_loops',
@@ -107,7 +123,8 @@ class TestRemoveLoops:
                         'test_code_chain_with_nested_loop',
                         'test_code_chain_with_several_loops',
                         'test_code_chain_with_same_elements',
-                        'test_code_chain_with_empty_fragment'
+                        'test_code_chain_with_empty_fragment',
+                        'test_code_chain_with_none_hash_loop'
                     ])
     def param_remove_loops_test(request) -> Tuple[List[Tuple[Code, CodeInfo]], List[Tuple[Code, CodeInfo]]]:
         return request.param
@@ -9,6 +9,8 @@ from src.main.util.consts import TASK, TEST_DATA_PATH
 from src.test.solution_space.util import get_solution_graph
 from src.main.util.file_util import get_all_file_system_items
 from src.main.util.helper_classes.id_counter import IdCounter
+from src.main.canonicalization.canonicalization import get_ast_hash
+from src.main.solution_space.serialized_code import AnonTree
 from src.main.solution_space.solution_graph import SolutionGraph, Vertex
 from src.main.solution_space.solution_space_serializer import SolutionSpaceSerializer
 
@@ -55,3 +57,19 @@ class TestSolutionSpaceSerializer:
         deserialized_graph = SolutionSpaceSerializer.deserialize(TEST_SERIALIZED_GRAPH)
         for vertex in deserialized_graph.get_traversal(to_remove_start=False, to_remove_end=False):
             assert vertex == Vertex.get_item_by_id(vertex.id)
+
+    # The serialized graph was created before tree hashes and other cached attributes were added, so they are restored
+    def test_old_graph_deserialization(self) -> None:
+        IdCounter.reset_all()
+        deserialized_graph = SolutionSpaceSerializer.deserialize(TEST_SERIALIZED_GRAPH)
+        for vertex in deserialized_graph.get_traversal():
+            serialized_code = vertex.serialized_code
+            assert deserialized_graph.find_vertex(serialized_code.canon_tree) is vertex
+            assert serialized_code.canon_tree_hash == get_ast_hash(serialized_code.canon_tree)
+            for anon_tree in serialized_code.anon_trees:
+                assert serialized_code.find_anon_tree(anon_tree.tree) is anon_tree
+                assert anon_tree.tree_hash == get_ast_hash(anon_tree.tree)
+                assert anon_tree.get_unique_users() == {c_i.user for c_i in anon_tree.code_info_list}
+                assert not anon_tree.add_next_anon_tree(anon_tree)
+                for next_id in anon_tree.next_anon_trees_ids:
+                    assert not anon_tree.add_next_anon_tree(AnonTree.get_item_by_id(next_id))
@@ -1,13 +1,17 @@
 # Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
 
 import os
+import ast
 import logging
+import tempfile
 from typing import List, Tuple
 
 from src.main.util.log_util import log_and_raise_error
+from src.main.canonicalization.diffs.gumtree import GumTreeDiff
+from src.main.canonicalization.canonicalization import get_code_from_tree
 from src.main.solution_space.data_classes import CodeInfo, User
 from src.main.solution_space.solution_graph import SolutionGraph
-from src.main.util.consts import TEST_DATA_PATH, TASK, FILE_SYSTEM_ITEM,LOGGER_NAME
+from src.main.util.consts import TEST_DATA_PATH, TASK, FILE_SYSTEM_ITEM,LOGGER_NAME, UTF_ENCODING, EXTENSION
 from src.test.canonicalization.diffs.diff_handler.util import __get_code_by_source, __plot_graph
 from src.main.util.file_util import get_all_file_system_items, match_condition, get_content_from_file
 
@@ -55,3 +59,23 @@ def get_solution_graph(task: TASK, to_plot_graph: bool = True,
         path = __plot_graph(task, sg, plot_prefix)
         log.info(f'Graph path for solution space for task {task.value} is {path}')
     return sg
+
+
+def __create_tree_files(trees: List[ast.AST], folder: str, prefix: str) -> List[str]:
+    files = [os.path.join(folder, f'{prefix}_{i}{EXTENSION.PY.value}') for i in range(len(trees))]
+    for file, tree in zip(files, trees):
+        with open(file, 'w', encoding=UTF_ENCODING) as f:
+            f.write(get_code_from_tree(tree))
+    return files
+
+
+# Each tree is written to a file once, and diffs numbers for all pairs of the files are found together.
+# Returns the matrix, where result[i][j] is the diffs number from src_trees[i] to dst_trees[j]
+def create_tmp_files_and_get_diffs_numbers_matrix(src_trees: List[ast.AST],
+                                                  dst_trees: List[ast.AST]) -> List[List[int]]:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        src_files = __create_tree_files(src_trees, tmp_dir, 'src')
+        dst_files = __create_tree_files(dst_trees, tmp_dir, 'dst')
+        diffs_numbers = GumTreeDiff.get_diffs_numbers_for_pairs([(src_file, dst_file) for src_file in src_files
+                                                                 for dst_file in dst_files])
+    return [diffs_numbers[i * len(dst_files):(i + 1) * len(dst_files)] for i in range(len(src_files))]
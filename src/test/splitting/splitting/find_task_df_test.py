@@ -8,7 +8,7 @@ import pandas as pd
 
 from src.main.util import consts
 from src.test.test_config import to_skip, TEST_LEVEL
-from src.main.splitting.splitting import find_task_dfs
+from src.main.splitting.splitting import find_task_dfs, find_all_task_dfs, CHOSEN_TASK
 from src.main.util.file_util import get_all_file_system_items
 
 TEST_DATA_FOLDER = path.join(consts.TEST_DATA_PATH, 'splitting/splitting/')
@@ -20,13 +20,32 @@ def get_expected_task_dfs(task: consts.TASK) -> List[pd.DataFrame]:
     return [pd.read_csv(df_file, encoding=consts.ISO_ENCODING) for df_file in df_files]
 
 
+def read_df_to_split(to_categorize: bool) -> pd.DataFrame:
+    df = pd.read_csv(DF_FILE, encoding=consts.ISO_ENCODING)
+    if to_categorize:
+        df[CHOSEN_TASK] = df[CHOSEN_TASK].astype('category')
+    return df
+
+
+# Task dfs keep indices of the split df, but expected task dfs are read from files, so indices are not compared.
+# Also, CHOSEN_TASK can be categorical, so it is compared with the same type as in the expected task df
+def assert_task_dfs(actual_task_dfs: List[pd.DataFrame], expected_task_dfs: List[pd.DataFrame]) -> None:
+    assert len(actual_task_dfs) == len(expected_task_dfs)
+    for actual_task_df, expected_task_df in zip(actual_task_dfs, expected_task_dfs):
+        chosen_task_type = expected_task_df[CHOSEN_TASK].dtype
+        actual_task_df = actual_task_df.reset_index(drop=True).astype({CHOSEN_TASK: chosen_task_type})
+        assert actual_task_df.equals(expected_task_df)
+
+
 @pytest.mark.skipif(to_skip(current_module_level=TEST_LEVEL.SPLITTING), reason=TEST_LEVEL.SPLITTING.value)
 class TestFindingTaskDfs:
 
     @pytest.mark.parametrize('task', consts.TASK)
     def test_finding_task_dfs(self, task: consts.TASK) -> None:
-        df = pd.read_csv(DF_FILE, encoding=consts.ISO_ENCODING)
-        actual_task_dfs = list(map(lambda task_df: task_df.sort_index(inplace=True), find_task_dfs(df, task)))
-        expected_tasks_dfs = list(map(lambda task_df: task_df.sort_index(inplace=True), get_expected_task_dfs(task)))
-        assert actual_task_dfs == expected_tasks_dfs
+        assert_task_dfs(find_task_dfs(read_df_to_split(False), task), get_expected_task_dfs(task))
 
+    # Task dfs for all tasks are found at once in CHOSEN_TASK, which is categorical in split_tasks_into_separate_files
+    @pytest.mark.parametrize('to_categorize', [False, True])
+    @pytest.mark.parametrize('task', consts.TASK)
+    def test_finding_all_task_dfs(self, task: consts.TASK, to_categorize: bool) -> None:
+        assert_task_dfs(find_all_task_dfs(read_df_to_split(to_categorize))[task], get_expected_task_dfs(task))
@@ -1,6 +1,6 @@
 # Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
 
-from typing import List
+from typing import Callable, List, Tuple
 
 import pytest
 import pandas as pd
@@ -26,8 +26,12 @@ def __get_chosen_tasks() -> List[str]:
            [consts.TASK.PIES.value] * PIES_COUNT_3
 
 
+# The tests only slice the df and do not change it, so it is created once for all of them
+CHOSEN_TASKS_DF = pd.DataFrame({consts.CODE_TRACKER_COLUMN.CHOSEN_TASK.value: __get_chosen_tasks()})
+
+
 def get_df() -> pd.DataFrame:
-    return pd.DataFrame({consts.CODE_TRACKER_COLUMN.CHOSEN_TASK.value: __get_chosen_tasks()})
+    return CHOSEN_TASKS_DF
 
 
 def crop_first_pies(df: pd.DataFrame, n: int = PIES_COUNT_1) -> pd.DataFrame:
@@ -38,49 +42,18 @@ def crop_last_pies(df: pd.DataFrame, n: int = PIES_COUNT_3) -> pd.DataFrame:
     return df[:-n]
 
 
-@pytest.mark.skipif(to_skip(current_module_level=TEST_LEVEL.SPLITTING), reason=TEST_LEVEL.SPLITTING.value)
-class TestStartIndexFinding:
+def to_categorical(df: pd.DataFrame) -> pd.DataFrame:
+    chosen_task = consts.CODE_TRACKER_COLUMN.CHOSEN_TASK.value
+    return df.assign(**{chosen_task: pd.Categorical(df[chosen_task])})
 
-    @staticmethod
-    def find_and_check_start_indices(df: pd.DataFrame, expected_indices: List[int]) -> None:
-        actual_indices = find_task_start_indices(df, consts.TASK.PIES)
-        assert expected_indices == actual_indices
 
-    # Finding start indices in:
-    #
-    #   chosenTask
-    # 0     pies
-    # 1     pies
-    # 2     is_zero
-    # 3     is_zero
-    # 4     pies
-    # 5     pies
-    # 6     pies
-    # 7     is_zero
-    # 8     is_zero
-    # 9     is_zero
-    # 10    is_zero
-    # 11    pies
-    # 12    pies
-    def test_finding_start_indices_everywhere(self) -> None:
-        self.__class__.find_and_check_start_indices(get_df(), [START_INDEX_1, START_INDEX_2, START_INDEX_3])
+ONLY_ZERO_DF = crop_last_pies(crop_first_pies(get_df(), PIES_COUNT_1 + IS_ZERO_COUNT_1 + PIES_COUNT_2))
 
-    # Finding start indices in:
-    #
-    #   chosenTask
-    # 2     is_zero
-    # 3     is_zero
-    # 4     pies
-    # 5     pies
-    # 6     pies
-    # 7     is_zero
-    # 8     is_zero
-    # 9     is_zero
-    # 10    is_zero
-    def test_finding_start_indices_in_the_middle(self) -> None:
-        self.__class__.find_and_check_start_indices(crop_last_pies(crop_first_pies(get_df())), [START_INDEX_2])
 
-    # Finding start indices in:
+@pytest.mark.skipif(to_skip(current_module_level=TEST_LEVEL.SPLITTING), reason=TEST_LEVEL.SPLITTING.value)
+class TestStartIndexFinding:
+
+    # Start indices of pies are found in parts of the df:
     #
     #   chosenTask
     # 0     pies
@@ -94,41 +67,39 @@ class TestStartIndexFinding:
     # 8     is_zero
     # 9     is_zero
     # 10    is_zero
-    def test_finding_start_indices_at_the_beginning(self) -> None:
-        self.__class__.find_and_check_start_indices(crop_last_pies(get_df()), [START_INDEX_1, START_INDEX_2])
-
-    # Finding start indices in:
-    #
-    #   chosenTask
-    # 2     is_zero
-    # 3     is_zero
-    # 4     pies
-    # 5     pies
-    # 6     pies
-    # 7     is_zero
-    # 8     is_zero
-    # 9     is_zero
-    # 10    is_zero
     # 11    pies
     # 12    pies
-    def test_finding_start_indices_at_the_end(self) -> None:
-        self.__class__.find_and_check_start_indices(crop_first_pies(get_df()), [START_INDEX_2, START_INDEX_3])
-
-    # Finding start indices in:
-    #
-    #   chosenTask
-    # 0     pies
-    # 1     pies
-    def test_finding_start_indices_in_full_df(self) -> None:
-        self.__class__.find_and_check_start_indices(crop_last_pies(get_df(), -PIES_COUNT_1), [START_INDEX_1])
-
-    # Finding start indices in:
-    #
-    #   chosenTask
-    # 7     is_zero
-    # 8     is_zero
-    # 9     is_zero
-    # 10    is_zero
-    def test_finding_start_indices_in_empty_df(self) -> None:
-        self.__class__.find_and_check_start_indices(crop_last_pies(crop_first_pies(get_df(),
-                                                                                   PIES_COUNT_1 + IS_ZERO_COUNT_1 + PIES_COUNT_2)), [])
+    @staticmethod
+    @pytest.fixture(scope="function",
+                    params=[
+                        # Rows 0-12
+                        (get_df(), [START_INDEX_1, START_INDEX_2, START_INDEX_3]),
+                        # Rows 2-10
+                        (crop_last_pies(crop_first_pies(get_df())), [START_INDEX_2]),
+                        # Rows 0-10
+                        (crop_last_pies(get_df()), [START_INDEX_1, START_INDEX_2]),
+                        # Rows 2-12
+                        (crop_first_pies(get_df()), [START_INDEX_2, START_INDEX_3]),
+                        # Rows 0-1
+                        (crop_last_pies(get_df(), -PIES_COUNT_1), [START_INDEX_1]),
+                        # Rows 7-10
+                        (ONLY_ZERO_DF, []),
+                        # Rows 7-10 with categorical chosenTask, which does not have pies in its categories
+                        (to_categorical(ONLY_ZERO_DF), []),
+                    ],
+                    ids=[
+                        'finding_start_indices_everywhere',
+                        'finding_start_indices_in_the_middle',
+                        'finding_start_indices_at_the_beginning',
+                        'finding_start_indices_at_the_end',
+                        'finding_start_indices_in_full_df',
+                        'finding_start_indices_in_empty_df',
+                        'finding_start_indices_in_categorical_df_without_task'
+                    ]
+                    )
+    def param_finding_start_indices_test(request) -> Tuple[pd.DataFrame, List[int]]:
+        return request.param
+
+    def test_finding_start_indices(self, param_finding_start_indices_test: Callable) -> None:
+        (df, expected_indices) = param_finding_start_indices_test
+        assert expected_indices == find_task_start_indices(df, consts.TASK.PIES)
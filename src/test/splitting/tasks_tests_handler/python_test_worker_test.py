@@ -0,0 +1,64 @@
+# Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
+
+import sys
+import logging
+from typing import Tuple
+
+import pytest
+
+from src.main.util import consts
+from src.main.util.consts import TASK, LANGUAGE
+from src.test.test_config import to_skip, TEST_LEVEL
+from src.main.splitting.tasks_tests_handler import create_in_and_out_dict
+from src.test.splitting.tasks_tests_handler.util import get_source_code, SOLUTION
+from src.main.splitting.task_checker import check_output_safely, get_test_file_content
+from src.main.splitting.python_task_checker import PythonTaskChecker, check_output_in_worker_safely, \
+    IS_FORK_AVAILABLE
+
+log = logging.getLogger(consts.LOGGER_NAME)
+
+# Each source prints '1' and then behaves differently, so the worker should handle exit codes, exceptions
+# and end of input in the same way as a new interpreter does
+ADDITIONAL_SOURCES = [
+    'print(1)\nimport sys\nsys.exit(0)',
+    'print(1)\nimport sys\nsys.exit(1)',
+    'print(1)\nimport sys\nsys.exit(\'error\')',
+    'print(1)\nraise ValueError()',
+    'print(1)\ninput()\ninput()',
+    'print(1, end=\'\')',
+    'import sys\nsys.stdout.write(\'1\\r\\n\')',
+    'print(__name__ == \'__main__\' and 1)'
+]
+
+
+def check_verdicts(source_code: str, input: str, expected_output: str) -> None:
+    source_file = PythonTaskChecker().create_source_file(source_code)
+    expected_verdict = check_output_safely(input, expected_output, [sys.executable, source_file])
+    actual_verdict = check_output_in_worker_safely(input, expected_output, source_file)
+    assert expected_verdict == actual_verdict, \
+        f'Verdicts for code:\n{source_code}\nwith input:\n{input}\nare different. ' \
+        f'Expected verdict = {expected_verdict}. Actual verdict = {actual_verdict}'
+
+
+@pytest.mark.skipif(to_skip(current_module_level=TEST_LEVEL.SPLITTING) or not IS_FORK_AVAILABLE,
+                    reason=TEST_LEVEL.SPLITTING.value)
+class TestPythonTestWorker:
+
+    @staticmethod
+    @pytest.fixture(scope="function",
+                    params=[(task, solution) for task in TASK.tasks() for solution in SOLUTION],
+                    ids=[f'test_{task.value}_{solution.value}' for task in TASK.tasks() for solution in SOLUTION])
+    def param_task_solution_test(request) -> Tuple[TASK, SOLUTION]:
+        return request.param
+
+    # The worker should give the same verdicts as running each test in a new interpreter
+    def test_tasks_verdicts(self, param_task_solution_test: Tuple[TASK, SOLUTION]) -> None:
+        task, solution = param_task_solution_test
+        source_code = get_source_code(task, LANGUAGE.PYTHON, solution.value)
+        for in_file, out_file in create_in_and_out_dict([task])[task]:
+            check_verdicts(source_code, get_test_file_content(in_file), get_test_file_content(out_file))
+
+    @pytest.mark.parametrize('source_code', ADDITIONAL_SOURCES)
+    def test_additional_verdicts(self, source_code: str) -> None:
+        for expected_output in ['1', '']:
+            check_verdicts(source_code, '', expected_output)
@@ -1,29 +1,28 @@
 # Copyright (c) 2020 Anastasiia Birillo, Elena Lyulina
 
 import os
+from pathlib import Path
 from typing import Callable, Tuple
 
 import pytest
 
 from src.test.test_config import to_skip, TEST_LEVEL
 from src.main.util.consts import TEST_DATA_PATH, EXTENSION
-from src.main.util.file_util import get_extension_from_file, change_extension_to, create_file, remove_file, \
-    remove_directory, create_directory
+from src.main.util.file_util import get_extension_from_file, change_extension_to, create_file
 
 # Assuming there cannot be any slashes at the end of the file, because path 'home/data/file.txt/ is incorrect
 
 file_with_txt_extension = os.path.join(TEST_DATA_PATH, 'util/file_util/extension_tests/file.txt')
-file_with_csv_extension = os.path.join(TEST_DATA_PATH, 'util/file_util/extension_tests/file.csv')
 file_without_extension = os.path.join(TEST_DATA_PATH, 'util/file_util/extension_tests/file')
 folder_with_slash = os.path.join(TEST_DATA_PATH, 'util/file_util/extension_tests/')
 
 extension_with_dot = EXTENSION.TXT
 empty_extension = EXTENSION.EMPTY
 
-
-def clear_folder(folder) -> None:
-    remove_directory(folder)
-    create_directory(folder)
+# Files for changing extension are created in a new temporary folder for each test, so only their names are used
+file_name_with_txt_extension = 'file.txt'
+file_name_with_csv_extension = 'file.csv'
+file_name_without_extension = 'file'
 
 
 @pytest.mark.skipif(to_skip(current_module_level=TEST_LEVEL.UTIL), reason=TEST_LEVEL.UTIL.value)
@@ -52,9 +51,9 @@ class TestExtensionMethods:
     @staticmethod
     @pytest.fixture(scope="function",
                     params=[
-                        (file_with_csv_extension, EXTENSION.TXT, file_with_txt_extension),
-                        (file_with_csv_extension, EXTENSION.EMPTY, file_without_extension),
-                        (file_without_extension, EXTENSION.TXT, file_with_txt_extension),
+                        (file_name_with_csv_extension, EXTENSION.TXT, file_name_with_txt_extension),
+                        (file_name_with_csv_extension, EXTENSION.EMPTY, file_name_without_extension),
+                        (file_name_without_extension, EXTENSION.TXT, file_name_with_txt_extension),
                     ],
                     ids=[
                         'changing_extension',
@@ -65,10 +64,9 @@ class TestExtensionMethods:
     def param_changing_extension_test(request) -> Tuple[str, EXTENSION, str]:
         return request.param
 
-    def test_changing_extension(self, param_changing_extension_test: Callable) -> None:
-        (in_data, new_extension, expected_name) = param_changing_extension_test
-        clear_folder(folder_with_slash)
+    def test_changing_extension(self, param_changing_extension_test: Callable, tmp_path: Path) -> None:
+        (in_file_name, new_extension, expected_file_name) = param_changing_extension_test
+        in_data = os.path.join(tmp_path, in_file_name)
         create_file('', in_data)
         change_extension_to(in_data, new_extension, True)
-        assert os.path.isfile(expected_name)
-        remove_file(expected_name)
+        assert os.path.isfile(os.path.join(tmp_path, expected_file_name))